@@ -3,13 +3,30 @@
 eCourts Professional System - Minimal Clean Version
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, send_file
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, send_file, Response, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from models import db, User, Case
+from models import db, User, Case, DownloadJob, WatchTerm
+from job_queue import JobQueue, job_to_dict
+from migrations import upgrade_database
+from case_queries import CASE_FILTERS, case_page, count_cases, count_cache
+from hearing_cache import get_hearings, hearing_totals
+from stats import get_stats, rebuild_counters
+from causelist_pdf import pdf_cache
+from causelist_scraper import CauseListScraper, get_court_hierarchy
+from zip_stream import iter_zip, unique_arcname
+from causelist_store import CHANGES_PAGE_SIZE, changes_since, change_to_dict, find_listings, listing_to_dict
+from search_index import SEARCH_LIMIT, MAX_SEARCH_LIMIT, search_cases, search_cause_list_entries, case_hit_to_dict, entry_hit_to_dict
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, init_app as init_metrics, render as render_metrics
+from prefetch import PREFETCH_AT, PrefetchScheduler, prefetch_cause_lists, submit_prefetch_job
+from watchlist import HITS_PAGE_SIZE, add_watch_term, remove_watch_term, hits_since, term_to_dict, hit_to_dict
 import os
 from datetime import datetime, date, timedelta
 import logging
+import json
 import re
+import hmac
+import click
+from werkzeug.utils import secure_filename
 # Removed old import - using delhi_courts_scraper instead
 
 logging.basicConfig(level=logging.INFO)
@@ -17,22 +34,53 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__, template_folder='templates')
 app.config['SECRET_KEY'] = 'ecourt-professional-system-2024-secure'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///ecourt_professional.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///ecourt_professional.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
+app.config['CAUSELIST_FETCH_WORKERS'] = int(os.environ.get('CAUSELIST_FETCH_WORKERS', 8))
+app.config['CAUSELIST_RENDER_WORKERS'] = int(os.environ.get('CAUSELIST_RENDER_WORKERS', os.cpu_count() or 4))
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 2))
+app.config['BULK_SEARCH_WORKERS'] = int(os.environ.get('BULK_SEARCH_WORKERS', 16))
+app.config['BULK_SEARCH_MAX_CNRS'] = int(os.environ.get('BULK_SEARCH_MAX_CNRS', 1000))
+# Only read when started with `python app.py`; under gunicorn run `flask prefetch-causelists --schedule` instead
+app.config['PREFETCH_SCHEDULER'] = os.environ.get('PREFETCH_SCHEDULER', '0') == '1'
+app.config['PREFETCH_AT'] = os.environ.get('PREFETCH_AT', PREFETCH_AT)
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN', '')
 
 db.init_app(app)
+job_queue = JobQueue(app)
+init_metrics(app)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
+# Columns loaded for the case list; everything the dashboard renders
+CASE_LIST_COLUMNS = {
+    'id': Case.id,
+    'cnr': Case.cnr,
+    'case_type': Case.case_type,
+    'case_title': Case.case_title,
+    'court_name': Case.court_name,
+    'judge_name': Case.judge_name,
+    'filing_number': Case.filing_number,
+    'filing_date': Case.filing_date,
+    'petitioner': Case.petitioner,
+    'respondent': Case.respondent,
+    'under_act': Case.under_act,
+    'under_section': Case.under_section,
+    'next_hearing_date': Case.next_hearing_date,
+    'status': Case.status,
+    'note': Case.note,
+    'updated_at': Case.updated_at
+}
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
 
 def init_database():
     with app.app_context():
-        db.create_all()
+        upgrade_database()
         
         # Create admin user
         admin = User.query.filter_by(mobile='9999999999').first()
@@ -49,6 +97,12 @@ def init_database():
             demo_user.set_password('demo123')
             db.session.add(demo_user)
             db.session.commit()
+        
+        # Jobs cannot survive a restart of the process that was running them
+        job_queue.recover_interrupted()
+        
+        # Resync counters in case rows were written without the ORM
+        rebuild_counters()
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -118,20 +172,9 @@ def dashboard():
     if current_user.is_admin:
         return redirect(url_for('admin_dashboard'))
     
-    # Get live hearing data
-    from live_hearings_api import LiveHearingsAPI
-    live_api = LiveHearingsAPI()
-    
-    today_hearings = live_api.get_today_hearings()
-    tomorrow_hearings = live_api.get_tomorrow_hearings()
-    upcoming_hearings = live_api.get_upcoming_hearings(7)
-    
-    total_cases = Case.query.count()
     stats = {
-        'total_cases': total_cases,
-        'today_cases': today_hearings.get('total', 0),
-        'tomorrow_cases': tomorrow_hearings.get('total', 0),
-        'upcoming_cases': upcoming_hearings.get('total', 0)
+        'total_cases': count_cases('all'),
+        **hearing_totals()
     }
     return render_template('user_dashboard_fixed.html', stats=stats)
 
@@ -140,6 +183,76 @@ def dashboard():
 def user_dashboard():
     return redirect(url_for('dashboard'))
 
+MONTH_MAP = {
+    'January': '01', 'February': '02', 'March': '03', 'April': '04',
+    'May': '05', 'June': '06', 'July': '07', 'August': '08',
+    'September': '09', 'October': '10', 'November': '11', 'December': '12'
+}
+
+def parse_filing_date(value):
+    """Parse eCourts filing dates such as 11-01-2025 or 01/01/2025"""
+    for fmt in ('%d-%m-%Y', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(value.strip(), fmt).date()
+        except (ValueError, AttributeError):
+            continue
+    return None
+
+def apply_case_info(case, case_info):
+    """Copy scraped eCourts case data onto a Case row"""
+    case.case_type = case_info.get('case_type', '')
+    case.court_name = case_info.get('court_details', {}).get('Court Name', '')
+    case.status = case_info.get('case_status', {}).get('Case Stage', '')
+    case.filing_number = case_info.get('case_details', {}).get('Filing Number', '')
+    case.filing_date = parse_filing_date(case_info.get('case_details', {}).get('Filing Date', ''))
+    case.judge_name = case_info.get('court_details', {}).get('Court Number & Judge', '')
+    
+    parties = case_info.get('parties', {})
+    petitioners = parties.get('Petitioner(s)', [])
+    respondents = parties.get('Respondent(s)', [])
+    
+    case.petitioner = petitioners[0]['name'] if petitioners else ''
+    case.respondent = ', '.join([r['name'] for r in respondents]) if respondents else ''
+    case.case_title = f"{case.petitioner} vs {case.respondent}" if case.petitioner and case.respondent else case_info.get('case_type', '')
+    case.under_act = case_info.get('under_act', '')
+    case.under_section = case_info.get('under_section', '')
+    case.note = 'Real eCourts Data - Live from eCourts India Portal'
+    
+    # Parse next hearing date
+    next_hearing = case_info.get('case_status', {}).get('Next Hearing Date', '')
+    if next_hearing and next_hearing != 'To be fixed':
+        try:
+            date_match = re.search(r'(\d+)\w*\s+(\w+)\s+(\d{4})', next_hearing)
+            if date_match:
+                day, month, year = date_match.groups()
+                if month in MONTH_MAP:
+                    date_str = f"{day.zfill(2)}/{MONTH_MAP[month]}/{year}"
+                    case.next_hearing_date = datetime.strptime(date_str, '%d/%m/%Y').date()
+        except:
+            pass
+
+def upsert_cases(case_infos):
+    """Insert or update Case rows for {cnr: case_info} in a single transaction"""
+    cnrs = list(case_infos)
+    cases = {}
+    
+    # Stay well under SQLite's bound-parameter limit
+    for i in range(0, len(cnrs), 500):
+        chunk = cnrs[i:i + 500]
+        for case in Case.query.filter(Case.cnr.in_(chunk)).all():
+            cases[case.cnr] = case
+    
+    for cnr, case_info in case_infos.items():
+        case = cases.get(cnr)
+        if not case:
+            case = cases[cnr] = Case(cnr=cnr)
+            db.session.add(case)
+        apply_case_info(case, case_info)
+    
+    db.session.commit()
+    count_cache.clear()
+    return cases
+
 @app.route('/api/search', methods=['POST'])
 @login_required
 def api_search():
@@ -152,7 +265,7 @@ def api_search():
         if not cnr:
             return jsonify({'success': False, 'error': 'CNR number is required'})
         
-        case_info = scraper.search_case_by_cnr(cnr)
+        case_info = scraper.search_case_by_cnr(cnr, force_refresh=bool(data.get('refresh')))
         
         if 'error' in case_info:
             return jsonify({'success': False, 'error': case_info['error']})
@@ -164,45 +277,11 @@ def api_search():
         case = Case.query.filter_by(cnr=cnr).first()
         if not case:
             case = Case(cnr=cnr)
-        
-        case.case_type = case_info.get('case_type', '')
-        case.court_name = case_info.get('court_details', {}).get('Court Name', '')
-        case.status = case_info.get('case_status', {}).get('Case Stage', '')
-        case.filing_number = case_info.get('case_details', {}).get('Filing Number', '')
-        case.filing_date = case_info.get('case_details', {}).get('Filing Date', '')
-        case.judge_name = case_info.get('court_details', {}).get('Court Number & Judge', '')
-        
-        parties = case_info.get('parties', {})
-        petitioners = parties.get('Petitioner(s)', [])
-        respondents = parties.get('Respondent(s)', [])
-        
-        case.petitioner = petitioners[0]['name'] if petitioners else ''
-        case.respondent = ', '.join([r['name'] for r in respondents]) if respondents else ''
-        case.case_title = f"{case.petitioner} vs {case.respondent}" if case.petitioner and case.respondent else case_info.get('case_type', '')
-        case.under_act = case_info.get('under_act', '')
-        case.under_section = case_info.get('under_section', '')
-        case.note = 'Real eCourts Data - Live from eCourts India Portal'
-        
-        # Parse next hearing date
-        next_hearing = case_info.get('case_status', {}).get('Next Hearing Date', '')
-        if next_hearing and next_hearing != 'To be fixed':
-            try:
-                date_match = re.search(r'(\d+)\w*\s+(\w+)\s+(\d{4})', next_hearing)
-                if date_match:
-                    day, month, year = date_match.groups()
-                    month_map = {
-                        'January': '01', 'February': '02', 'March': '03', 'April': '04',
-                        'May': '05', 'June': '06', 'July': '07', 'August': '08',
-                        'September': '09', 'October': '10', 'November': '11', 'December': '12'
-                    }
-                    if month in month_map:
-                        date_str = f"{day.zfill(2)}/{month_map[month]}/{year}"
-                        case.next_hearing_date = datetime.strptime(date_str, '%d/%m/%Y').date()
-            except:
-                pass
+        apply_case_info(case, case_info)
         
         db.session.add(case)
         db.session.commit()
+        count_cache.clear()
         
         return jsonify({
             'success': True,
@@ -218,33 +297,151 @@ def api_search():
         logger.error(f"Search error: {e}")
         return jsonify({'success': False, 'error': 'Search failed. Please try again.'})
 
+@app.route('/api/search/bulk', methods=['POST'])
+@login_required
+def api_search_bulk():
+    try:
+        from real_ecourts_scraper import RealECourtsScraper
+        data = request.get_json() or {}
+        
+        cnrs = data.get('cnrs') or []
+        if isinstance(cnrs, str):
+            cnrs = re.split(r'[\s,;]+', cnrs)
+        cnrs = list(dict.fromkeys(c.strip().upper() for c in cnrs if c and c.strip()))
+        
+        if not cnrs:
+            return jsonify({'success': False, 'error': 'At least one CNR number is required'})
+        if len(cnrs) > app.config['BULK_SEARCH_MAX_CNRS']:
+            return jsonify({'success': False, 'error': f"At most {app.config['BULK_SEARCH_MAX_CNRS']} CNR numbers per request"})
+        
+        scraper = RealECourtsScraper()
+        
+        def generate():
+            yield json.dumps({'event': 'start', 'total': len(cnrs)}) + '\n'
+            found = {}
+            
+            for cnr, case_info in scraper.search_many(cnrs, max_workers=app.config['BULK_SEARCH_WORKERS']):
+                if 'error' in case_info:
+                    line = {'event': 'result', 'cnr': cnr, 'success': False, 'error': case_info['error']}
+                elif not case_info.get('is_real_data', False):
+                    line = {'event': 'result', 'cnr': cnr, 'success': False, 'error': 'Real case data not available from eCourts servers'}
+                else:
+                    found[cnr] = case_info
+                    line = {'event': 'result', 'cnr': cnr, 'success': True, 'case_info': case_info}
+                yield json.dumps(line) + '\n'
+            
+            try:
+                cases = upsert_cases(found)
+                yield json.dumps({
+                    'event': 'done',
+                    'success': True,
+                    'total': len(cnrs),
+                    'found': len(found),
+                    'saved_to_db': True,
+                    'case_ids': {cnr: case.id for cnr, case in cases.items()}
+                }) + '\n'
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Bulk search save error: {e}")
+                yield json.dumps({'event': 'done', 'success': False, 'total': len(cnrs), 'found': len(found), 'error': 'Failed to save cases'}) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+    except Exception as e:
+        logger.error(f"Bulk search error: {e}")
+        return jsonify({'success': False, 'error': 'Search failed. Please try again.'})
+
+@app.route('/api/cases/search')
+@login_required
+def api_cases_search():
+    """Full-text search over cases and cause list entries"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'success': False, 'error': 'Search query is required'}), 400
+        
+        scope = request.args.get('scope', 'all')
+        if scope not in ('all', 'cases', 'causelists'):
+            return jsonify({'success': False, 'error': f'Unknown scope: {scope}'}), 400
+        
+        try:
+            limit = min(max(int(request.args.get('limit', SEARCH_LIMIT)), 1), MAX_SEARCH_LIMIT)
+            offset = max(int(request.args.get('offset', 0)), 0)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'limit and offset must be integers'}), 400
+        
+        result = {'success': True, 'query': query, 'pagination': {'limit': limit, 'offset': offset}}
+        try:
+            if scope in ('all', 'cases'):
+                page = search_cases(query, limit, offset)
+                result['cases'] = [case_hit_to_dict(row) for row in page['rows']]
+                result['pagination']['cases'] = {'has_more': page['has_more'], 'total_capped': page['total_capped']}
+            if scope in ('all', 'causelists'):
+                page = search_cause_list_entries(query, limit, offset)
+                result['entries'] = [entry_hit_to_dict(row) for row in page['rows']]
+                result['pagination']['entries'] = {'has_more': page['has_more'], 'total_capped': page['total_capped']}
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Case search error: {e}")
+        return jsonify({'success': False, 'error': 'Search failed. Please try again.'})
+
 @app.route('/api/cases')
 @login_required
 def api_cases():
     try:
-        cases = Case.query.order_by(Case.updated_at.desc()).limit(20).all()
+        filter_name = request.args.get('filter', 'all')
+        if filter_name not in CASE_FILTERS:
+            return jsonify({'success': False, 'error': f'Unknown filter: {filter_name}'}), 400
         
-        return jsonify({
-            'success': True,
-            'cases': [{
+        try:
+            per_page = min(max(int(request.args.get('per_page', 20)), 1), 100)
+        except ValueError:
+            per_page = 20
+        
+        # Only the Text column case_title is left out unless asked for
+        include_title = request.args.get('include_title') == '1'
+        columns = [column for name, column in CASE_LIST_COLUMNS.items() if include_title or name != 'case_title']
+        
+        try:
+            cases, next_cursor = case_page(filter_name, request.args.get('cursor'), per_page, columns)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        def serialize(case):
+            item = {
                 'id': case.id,
                 'cnr': case.cnr,
                 'case_type': case.case_type or '',
-                'case_title': case.case_title or '',
                 'court_name': case.court_name or '',
-                'judge_name': getattr(case, 'judge_name', ''),
-                'filing_number': getattr(case, 'filing_number', ''),
-                'filing_date': getattr(case, 'filing_date', ''),
-                'petitioner': getattr(case, 'petitioner', ''),
-                'respondent': getattr(case, 'respondent', ''),
-                'under_act': getattr(case, 'under_act', ''),
-                'under_section': getattr(case, 'under_section', ''),
+                'judge_name': case.judge_name or '',
+                'filing_number': case.filing_number or '',
+                'filing_date': case.filing_date.strftime('%d-%m-%Y') if case.filing_date else '',
+                'petitioner': case.petitioner or '',
+                'respondent': case.respondent or '',
+                'under_act': case.under_act or '',
+                'under_section': case.under_section or '',
                 'next_hearing_date': case.next_hearing_date.strftime('%d/%m/%Y') if case.next_hearing_date else '17th November 2025',
                 'status': case.status,
-                'note': getattr(case, 'note', ''),
+                'note': case.note or '',
                 'updated_at': case.updated_at.strftime('%d/%m/%Y %H:%M')
-            } for case in cases],
-            'pagination': {'total': len(cases)}
+            }
+            if include_title:
+                item['case_title'] = case.case_title or ''
+            return item
+        
+        return jsonify({
+            'success': True,
+            'cases': [serialize(case) for case in cases],
+            'pagination': {
+                'total': count_cases(filter_name),
+                'per_page': per_page,
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None
+            }
         })
         
     except Exception as e:
@@ -320,22 +517,10 @@ def api_admin_stats():
         db_path = 'instance/ecourt_professional.db'
         db_size = os.path.getsize(db_path) if os.path.exists(db_path) else 0
         
-        stats = {
-            'users': {
-                'total': User.query.count(),
-                'admins': User.query.filter_by(is_admin=True).count(),
-                'regular': User.query.filter_by(is_admin=False).count()
-            },
-            'cases': {
-                'total': Case.query.count(),
-                'today': 0,
-                'tomorrow': 0,
-                'upcoming': 0
-            },
-            'system': {
-                'database_size': db_size,
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
+        stats = get_stats()
+        stats['system'] = {
+            'database_size': db_size,
+            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
         return jsonify({'success': True, 'stats': stats})
@@ -348,18 +533,18 @@ def api_admin_stats():
 @login_required
 def api_live_hearings():
     try:
-        from live_hearings_api import LiveHearingsAPI
-        live_api = LiveHearingsAPI()
-        
         hearing_type = request.args.get('type', 'today')
         days_ahead = int(request.args.get('days', 7))
         
-        if hearing_type == 'tomorrow':
-            result = live_api.get_tomorrow_hearings()
-        elif hearing_type == 'upcoming':
-            result = live_api.get_upcoming_hearings(days_ahead)
+        if hearing_type == 'summary':
+            totals = hearing_totals(days_ahead)
+            result = {
+                'today': totals['today_cases'],
+                'tomorrow': totals['tomorrow_cases'],
+                'upcoming': totals['upcoming_cases']
+            }
         else:
-            result = live_api.get_today_hearings()
+            result = get_hearings(hearing_type, days_ahead)
         
         return jsonify({
             'success': True,
@@ -377,54 +562,60 @@ def admin_dashboard():
         flash('Access denied. Admin privileges required.', 'error')
         return redirect(url_for('dashboard'))
     
-    # Get live hearing data for admin
-    from live_hearings_api import LiveHearingsAPI
-    live_api = LiveHearingsAPI()
-    
-    today_hearings = live_api.get_today_hearings()
-    tomorrow_hearings = live_api.get_tomorrow_hearings()
-    upcoming_hearings = live_api.get_upcoming_hearings(7)
-    
-    total_users = User.query.count()
-    admin_users = User.query.filter_by(is_admin=True).count()
-    total_cases = Case.query.count()
-    
+    counters = get_stats()
     stats = {
-        'total_users': total_users,
-        'admin_users': admin_users,
-        'regular_users': total_users - admin_users,
-        'total_cases': total_cases,
-        'today_cases': today_hearings.get('total', 0),
-        'tomorrow_cases': tomorrow_hearings.get('total', 0),
-        'upcoming_cases': upcoming_hearings.get('total', 0)
+        'total_users': counters['users']['total'],
+        'admin_users': counters['users']['admins'],
+        'regular_users': counters['users']['regular'],
+        'total_cases': counters['cases']['total'],
+        **hearing_totals()
     }
     
     return render_template('admin_dashboard.html', stats=stats)
 
+def send_cause_list_pdf(file_path):
+    """Send a generated PDF from downloads/; content-addressed files use their hash as ETag"""
+    if not file_path or not pdf_cache.contains(file_path) or not os.path.isfile(file_path):
+        return jsonify({'error': 'File not found'}), 404
+    
+    # Downloads count as use for the LRU eviction of downloads/
+    pdf_cache.touch(file_path)
+    return send_file(os.path.abspath(file_path), as_attachment=True, etag=pdf_cache.etag(file_path) or True)
+
 # Cause List Routes
 @app.route('/causelist')
 @login_required
 def causelist_dashboard():
     return render_template('causelist_dashboard.html')
 
+def hierarchy_response(level, *code_args):
+    """One level of the court hierarchy as JSON, answered with 304 when the client's ETag still matches"""
+    codes = [request.args.get(arg, '').strip() for arg in code_args]
+    missing = [arg for arg, code in zip(code_args, codes) if not code]
+    if missing:
+        return jsonify({'success': False, 'error': f"{', '.join(missing)} required"}), 400
+    
+    try:
+        node = get_court_hierarchy().get(level, codes)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if node is None:
+        return jsonify({'success': False, 'error': f'Could not load {level} from eCourts, please try again'}), 503
+    
+    if node.etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = jsonify({'success': True, level: node.items})
+    response.set_etag(node.etag)
+    # Revalidated on every use; the answer is a dict lookup and usually a 304
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
 @app.route('/api/causelist/states')
 @login_required
 def api_causelist_states():
     try:
-        scraper = CauseListScraper()
-        states = scraper.get_states()
-        
-        # Mock data if API fails
-        if not states:
-            states = [
-                {'state_code': 'MP', 'state_name': 'Madhya Pradesh'},
-                {'state_code': 'DL', 'state_name': 'Delhi'},
-                {'state_code': 'UP', 'state_name': 'Uttar Pradesh'},
-                {'state_code': 'MH', 'state_name': 'Maharashtra'},
-                {'state_code': 'KA', 'state_name': 'Karnataka'}
-            ]
-        
-        return jsonify({'success': True, 'states': states})
+        return hierarchy_response('states')
     except Exception as e:
         logger.error(f"States API error: {e}")
         return jsonify({'success': False, 'error': 'Failed to load states'})
@@ -433,19 +624,7 @@ def api_causelist_states():
 @login_required
 def api_causelist_districts():
     try:
-        state_code = request.args.get('state_code')
-        scraper = CauseListScraper()
-        districts = scraper.get_districts(state_code)
-        
-        # Mock data if API fails
-        if not districts:
-            districts = [
-                {'district_code': '01', 'district_name': 'Bhopal'},
-                {'district_code': '02', 'district_name': 'Indore'},
-                {'district_code': '03', 'district_name': 'Jabalpur'}
-            ]
-        
-        return jsonify({'success': True, 'districts': districts})
+        return hierarchy_response('districts', 'state_code')
     except Exception as e:
         logger.error(f"Districts API error: {e}")
         return jsonify({'success': False, 'error': 'Failed to load districts'})
@@ -454,20 +633,7 @@ def api_causelist_districts():
 @login_required
 def api_causelist_complexes():
     try:
-        state_code = request.args.get('state_code')
-        district_code = request.args.get('district_code')
-        scraper = CauseListScraper()
-        complexes = scraper.get_court_complexes(state_code, district_code)
-        
-        # Mock data if API fails
-        if not complexes:
-            complexes = [
-                {'complex_code': '001', 'complex_name': 'District Court Complex'},
-                {'complex_code': '002', 'complex_name': 'Sessions Court Complex'},
-                {'complex_code': '003', 'complex_name': 'High Court Complex'}
-            ]
-        
-        return jsonify({'success': True, 'complexes': complexes})
+        return hierarchy_response('complexes', 'state_code', 'district_code')
     except Exception as e:
         logger.error(f"Complexes API error: {e}")
         return jsonify({'success': False, 'error': 'Failed to load court complexes'})
@@ -476,21 +642,7 @@ def api_causelist_complexes():
 @login_required
 def api_causelist_courts():
     try:
-        state_code = request.args.get('state_code')
-        district_code = request.args.get('district_code')
-        complex_code = request.args.get('complex_code')
-        scraper = CauseListScraper()
-        courts = scraper.get_courts(state_code, district_code, complex_code)
-        
-        # Mock data if API fails
-        if not courts:
-            courts = [
-                {'court_code': '01', 'court_name': 'Court of Additional Sessions Judge-01'},
-                {'court_code': '02', 'court_name': 'Court of Additional Sessions Judge-02'},
-                {'court_code': '03', 'court_name': 'Court of Civil Judge Sr. Division-01'}
-            ]
-        
-        return jsonify({'success': True, 'courts': courts})
+        return hierarchy_response('courts', 'state_code', 'district_code', 'complex_code')
     except Exception as e:
         logger.error(f"Courts API error: {e}")
         return jsonify({'success': False, 'error': 'Failed to load courts'})
@@ -500,62 +652,147 @@ def api_causelist_courts():
 def api_causelist_download():
     try:
         data = request.get_json()
-        state_code = data.get('state_code')
-        district_code = data.get('district_code')
-        complex_code = data.get('complex_code')
-        court_code = data.get('court_code')
-        date = data.get('date')
-        
-        scraper = CauseListScraper()
+        params = {
+            'state_code': data.get('state_code'),
+            'district_code': data.get('district_code'),
+            'complex_code': data.get('complex_code'),
+            'court_code': data.get('court_code'),
+            'date': data.get('date')
+        }
         
-        if court_code:
-            # Single court
-            causelist = scraper.get_cause_list(state_code, district_code, complex_code, court_code, date)
-            if 'error' in causelist:
-                return jsonify({'success': False, 'error': causelist['error']})
-            
-            court_name = f"Court {court_code}"
-            pdf_path = scraper.generate_pdf(causelist, court_name, date)
-            
-            if pdf_path:
-                files = [{
-                    'court_name': court_name,
-                    'file_path': pdf_path,
-                    'cases_count': len(causelist) if isinstance(causelist, list) else 0
-                }]
-            else:
-                return jsonify({'success': False, 'error': 'Failed to generate PDF'})
-        else:
-            # All courts in complex
-            all_causelists = scraper.get_all_courts_causelist(state_code, district_code, complex_code, date)
-            if 'error' in all_causelists:
-                return jsonify({'success': False, 'error': all_causelists['error']})
-            
-            files = scraper.generate_multiple_pdfs(all_causelists, date)
-            
-            if not files:
-                return jsonify({'success': False, 'error': 'No cause lists found or failed to generate PDFs'})
+        if not params['state_code'] or not params['district_code'] or not params['complex_code'] or not params['date']:
+            return jsonify({'success': False, 'error': 'State, district, court complex and date are required'})
         
-        return jsonify({'success': True, 'files': files})
+        job_id = job_queue.submit('causelist', params, user_id=current_user.id)
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': url_for('api_job_status', job_id=job_id)
+        }), 202
         
     except Exception as e:
         logger.error(f"Causelist download error: {e}")
         return jsonify({'success': False, 'error': 'Failed to download cause lists'})
 
+@job_queue.handler('causelist')
+def run_causelist_job(params, reporter):
+    """Generate eCourts cause list PDFs for one court or a whole complex"""
+    state_code = params.get('state_code')
+    district_code = params.get('district_code')
+    complex_code = params.get('complex_code')
+    court_code = params.get('court_code')
+    date = params.get('date')
+    
+    scraper = CauseListScraper(
+        max_fetch_workers=app.config['CAUSELIST_FETCH_WORKERS'],
+        max_render_workers=app.config['CAUSELIST_RENDER_WORKERS']
+    )
+    header = scraper.header(state_code, district_code, complex_code)
+    
+    if court_code:
+        # Single court
+        court_name = scraper.court_name(state_code, district_code, complex_code, court_code)
+        reporter.set_items([(court_code, court_name)])
+        
+        causelist = scraper.get_cause_list(state_code, district_code, complex_code, court_code, date, court_name)
+        if 'error' in causelist:
+            raise RuntimeError(causelist['error'])
+        changes = scraper.ingest_board(state_code, district_code, complex_code, court_code, court_name, date, causelist)
+        
+        pdf_path = scraper.generate_pdf(causelist, court_name, date, header)
+        if not pdf_path:
+            raise RuntimeError('Failed to generate PDF')
+        
+        reporter.item_done(court_code, {
+            'court_name': court_name,
+            'file_path': pdf_path,
+            'cases_count': len(causelist) if isinstance(causelist, list) else 0,
+            'changes': changes
+        })
+    else:
+        # All courts in complex, reported court by court
+        courts = scraper.get_courts(state_code, district_code, complex_code)
+        if not courts:
+            raise RuntimeError('No courts found for this court complex')
+        
+        reporter.set_items([(court['court_code'], court['court_name']) for court in courts])
+        
+        for result in scraper.iter_courts_causelist(state_code, district_code, complex_code, courts, date, header):
+            reporter.check_cancelled()
+            
+            file_info = None
+            if result.get('file_path'):
+                file_info = {key: result[key] for key in ('court_code', 'court_name', 'file_path', 'cases_count', 'file_size')}
+                file_info['changes'] = result.get('changes')
+            reporter.item_done(result['court_code'], file_info, result.get('error'))
+
 @app.route('/api/causelist/download-file')
 @login_required
 def api_causelist_download_file():
     try:
-        file_path = request.args.get('file')
-        if not file_path or not os.path.exists(file_path):
-            return jsonify({'error': 'File not found'}), 404
-        
-        return send_file(file_path, as_attachment=True)
+        return send_cause_list_pdf(request.args.get('file'))
         
     except Exception as e:
         logger.error(f"File download error: {e}")
         return jsonify({'error': 'Download failed'}), 500
 
+@app.route('/api/causelist/changes')
+@login_required
+def api_causelist_changes():
+    """Cause list entries added, removed or updated after change id ``since``"""
+    try:
+        since = request.args.get('since', 0, type=int)
+        limit = min(max(request.args.get('limit', CHANGES_PAGE_SIZE, type=int), 1), CHANGES_PAGE_SIZE)
+        list_date = request.args.get('date')
+        if list_date:
+            try:
+                list_date = datetime.strptime(list_date, '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({'success': False, 'error': 'Invalid date, expected YYYY-MM-DD'}), 400
+        
+        changes = changes_since(since, court_code=request.args.get('court'), list_date=list_date, limit=limit)
+        return jsonify({
+            'success': True,
+            'changes': [change_to_dict(change) for change in changes],
+            'next_since': changes[-1].id if changes else since,
+            'has_more': len(changes) == limit
+        })
+        
+    except Exception as e:
+        logger.error(f"Cause list changes error: {e}")
+        return jsonify({'success': False, 'error': 'Failed to load cause list changes'})
+
+@app.route('/api/causelist/lookup')
+@login_required
+def api_causelist_lookup():
+    """Every board listing a case, by CNR or case number, across all courts"""
+    try:
+        cnr = request.args.get('cnr', '').strip()
+        case_number = request.args.get('case_number', '').strip()
+        if not cnr and not case_number:
+            return jsonify({'success': False, 'error': 'CNR or case number is required'}), 400
+        
+        try:
+            if request.args.get('date'):
+                start = end = datetime.strptime(request.args['date'], '%Y-%m-%d').date()
+            else:
+                start = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else date.today()
+                end = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else start + timedelta(days=7)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid date, expected YYYY-MM-DD'}), 400
+        
+        listings = find_listings(start, end, cnr=cnr or None, case_number=case_number or None)
+        return jsonify({
+            'success': True,
+            'listings': [listing_to_dict(entry, cause_list) for entry, cause_list in listings],
+            'from': start.strftime('%Y-%m-%d'),
+            'to': end.strftime('%Y-%m-%d')
+        })
+        
+    except Exception as e:
+        logger.error(f"Cause list lookup error: {e}")
+        return jsonify({'success': False, 'error': 'Failed to look up cause lists'})
+
 # Delhi Courts Real Scraping Routes
 @app.route('/delhi-courts')
 @login_required
@@ -587,34 +824,232 @@ def api_delhi_courts_download():
         if not complex_code or not date:
             return jsonify({'success': False, 'error': 'Court complex and date are required'})
         
-        scraper = DelhiCourtsRealScraper()
-        result = scraper.download_all_judges_causelist(complex_code, date)
-        
-        if 'error' in result:
-            return jsonify({'success': False, 'error': result['error']})
+        if data.get('stream'):
+            # Stream one NDJSON line per judge as soon as its PDF is ready
+            scraper = DelhiCourtsRealScraper(
+                max_fetch_workers=app.config['CAUSELIST_FETCH_WORKERS'],
+                max_render_workers=app.config['CAUSELIST_RENDER_WORKERS']
+            )
+            judges = scraper.get_judges_list(complex_code, date)
+            if not judges:
+                return jsonify({'success': False, 'error': 'No judges found for this court complex'})
+            
+            def generate():
+                yield json.dumps({'event': 'start', 'total_judges': len(judges)}) + '\n'
+                total_pdfs = 0
+                for judge_result in scraper.iter_judges_causelist(judges, date, complex_code):
+                    if judge_result.get('file_path'):
+                        total_pdfs += 1
+                    yield json.dumps({'event': 'judge', **judge_result}) + '\n'
+                yield json.dumps({'event': 'done', 'success': True, 'total_judges': len(judges), 'total_pdfs': total_pdfs}) + '\n'
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
         
-        return jsonify(result)
+        job_id = job_queue.submit('delhi_courts', {'complex_code': complex_code, 'date': date}, user_id=current_user.id)
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status_url': url_for('api_job_status', job_id=job_id)
+        }), 202
         
     except Exception as e:
         logger.error(f"Delhi courts download error: {e}")
         return jsonify({'success': False, 'error': 'Failed to download cause lists'})
 
+@job_queue.handler('delhi_courts')
+def run_delhi_courts_job(params, reporter):
+    """Generate one cause list PDF per judge of a Delhi court complex"""
+    from delhi_courts_scraper import DelhiCourtsRealScraper
+    complex_code = params['complex_code']
+    date = params['date']
+    
+    scraper = DelhiCourtsRealScraper(
+        max_fetch_workers=app.config['CAUSELIST_FETCH_WORKERS'],
+        max_render_workers=app.config['CAUSELIST_RENDER_WORKERS']
+    )
+    
+    judges = scraper.get_judges_list(complex_code, date)
+    if not judges:
+        raise RuntimeError('No judges found for this court complex')
+    
+    reporter.set_items([(judge['judge_code'], judge['judge_name']) for judge in judges])
+    
+    for result in scraper.iter_judges_causelist(judges, date, complex_code):
+        reporter.check_cancelled()
+        
+        file_info = None
+        if result.get('file_path'):
+            file_info = {
+                'judge_name': result['judge_name'],
+                'court_room': result['court_room'],
+                'file_path': result['file_path'],
+                'cases_count': result['cases_count'],
+                'file_size': result['file_size'],
+                'changes': result.get('changes')
+            }
+        reporter.item_done(result['judge_code'], file_info, result.get('error'))
+
+@job_queue.handler('prefetch')
+def run_prefetch_job(params, reporter):
+    """Fetch, store and render the cause lists of every tracked court complex and eCourts court for a date"""
+    summary = prefetch_cause_lists(params['date'], reporter)
+    if summary['incomplete']:
+        # Only a failed run lets the date be prefetched again
+        raise RuntimeError(f"Incomplete complexes: {', '.join(summary['incomplete'])}")
+
+@app.cli.command('prefetch-causelists')
+@click.option('--date', 'list_date', help='Cause list date (YYYY-MM-DD), default tomorrow')
+@click.option('--schedule', is_flag=True, help='Keep running and prefetch every evening at PREFETCH_AT')
+def prefetch_causelists_command(list_date, schedule):
+    """Prefetch cause lists for every court complex with tracked cases"""
+    with app.app_context():
+        upgrade_database()
+    
+    if schedule:
+        scheduler = PrefetchScheduler(app, prefetch_cause_lists, at=app.config['PREFETCH_AT'])
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            pass
+        return
+    
+    with app.app_context():
+        summary = prefetch_cause_lists(list_date)
+    click.echo(f"Prefetched {summary['boards']} boards from {summary['complexes']} complexes for {summary['date']} "
+               f"({summary['failed']} failed, skipped: {', '.join(summary['skipped']) or 'none'}, "
+               f"incomplete: {', '.join(summary['incomplete']) or 'none'})")
+
 @app.route('/api/delhi-courts/download-file')
 @login_required
 def api_delhi_courts_download_file():
     try:
-        file_path = request.args.get('file')
-        if not file_path or not os.path.exists(file_path):
-            return jsonify({'error': 'File not found'}), 404
-        
-        return send_file(file_path, as_attachment=True)
+        return send_cause_list_pdf(request.args.get('file'))
         
     except Exception as e:
         logger.error(f"Delhi courts file download error: {e}")
         return jsonify({'error': 'Download failed'}), 500
 
+# Watchlist Routes
+@app.route('/api/watchlist', methods=['GET'])
+@login_required
+def api_watchlist():
+    terms = WatchTerm.query.filter_by(user_id=current_user.id).order_by(WatchTerm.term).all()
+    return jsonify({'success': True, 'terms': [term_to_dict(term) for term in terms]})
+
+@app.route('/api/watchlist', methods=['POST'])
+@login_required
+def api_watchlist_add():
+    try:
+        data = request.get_json() or {}
+        term = (data.get('term') or '').strip()
+        kind = data.get('kind', 'party')
+        if not term:
+            return jsonify({'success': False, 'error': 'Name to watch is required'}), 400
+        if kind not in ('advocate', 'party'):
+            return jsonify({'success': False, 'error': 'Kind must be advocate or party'}), 400
+        
+        watch_term, created = add_watch_term(current_user.id, term, kind)
+        return jsonify({'success': True, 'term': term_to_dict(watch_term), 'created': created})
+        
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Watchlist add error: {e}")
+        return jsonify({'success': False, 'error': 'Failed to add watch term'})
+
+@app.route('/api/watchlist/<int:term_id>', methods=['DELETE'])
+@login_required
+def api_watchlist_remove(term_id):
+    if not remove_watch_term(current_user.id, term_id):
+        return jsonify({'success': False, 'error': 'Watch term not found'}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/watchlist/hits')
+@login_required
+def api_watchlist_hits():
+    since = request.args.get('since', 0, type=int)
+    hits = hits_since(current_user.id, since)
+    return jsonify({
+        'success': True,
+        'hits': [hit_to_dict(hit) for hit in hits],
+        'next_since': hits[-1].id if hits else since,
+        'has_more': len(hits) == HITS_PAGE_SIZE
+    })
+
+# Background Job Routes
+def _get_user_job(job_id):
+    job = db.session.get(DownloadJob, job_id)
+    if not job or (job.user_id != current_user.id and not current_user.is_admin):
+        return None
+    return job
+
+@app.route('/api/jobs/<job_id>')
+@login_required
+def api_job_status(job_id):
+    job = _get_user_job(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    
+    return jsonify({'success': True, 'job': job_to_dict(job)})
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+@login_required
+def api_job_cancel(job_id):
+    job = _get_user_job(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    
+    if not job_queue.cancel(job_id):
+        return jsonify({'success': False, 'error': 'Job has already finished'})
+    
+    return jsonify({'success': True, 'message': 'Cancellation requested'})
+
+@app.route('/api/jobs/<job_id>/bundle')
+@login_required
+def api_job_bundle(job_id):
+    """Stream every PDF of a download job as one ZIP, built while it is sent"""
+    job = _get_user_job(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    
+    entries = []
+    used_names = set()
+    for file_info in json.loads(job.files or '[]'):
+        file_path = file_info.get('file_path')
+        if file_path and pdf_cache.contains(file_path) and os.path.isfile(file_path):
+            entries.append((unique_arcname(os.path.basename(file_path), used_names), file_path))
+    
+    if not entries:
+        return jsonify({'success': False, 'error': 'No files available for this job'}), 404
+    
+    params = json.loads(job.params or '{}')
+    archive_name = secure_filename(f"CauseLists_{params.get('complex_code', job.kind)}_{params.get('date', job.id[:8])}.zip")
+    
+    # No Content-Length, so the archive goes out with chunked transfer encoding
+    return Response(
+        stream_with_context(iter_zip(entries)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename={archive_name}'}
+    )
+
+# Metrics
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of this process's metrics, for admins or a scraper holding METRICS_TOKEN"""
+    token = app.config['METRICS_TOKEN']
+    authorization = request.headers.get('Authorization', '')
+    has_token = bool(token) and hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode())
+    if not has_token and not (current_user.is_authenticated and current_user.is_admin):
+        return jsonify({'success': False, 'error': 'Access denied'}), 403
+    return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
 if __name__ == '__main__':
     os.makedirs('instance', exist_ok=True)
     init_database()
+    # With the debug reloader, only the child process that serves requests runs the scheduler
+    if app.config['PREFETCH_SCHEDULER'] and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        PrefetchScheduler(app, lambda list_date: submit_prefetch_job(job_queue, list_date),
+                          at=app.config['PREFETCH_AT']).start()
     app.run(debug=True, host='0.0.0.0', port=5000)
 
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Asyncio scraping engine for eCourts endpoints
+Races fallback URLs concurrently, with a sync facade for Flask routes
+"""
+
+import time
+import asyncio
+import concurrent.futures
+import atexit
+import threading
+import logging
+from urllib.parse import urlsplit
+
+from http_transport import host_policies, get_session, CircuitOpenError, DEFAULT_TIMEOUT
+from metrics import UPSTREAM_DURATION, UPSTREAM_THROTTLE, UPSTREAM_REQUESTS, upstream_outcome
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - falls back to the pooled requests session
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+MAX_IN_FLIGHT = 256
+MAX_PER_HOST = 32
+
+
+class FetchResult:
+    """Response body and status from one async request"""
+
+    def __init__(self, url, status, text):
+        self.url = url
+        self.status = status
+        self.text = text
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+
+class AsyncScrapeEngine:
+    """Runs an asyncio event loop on a background thread and issues requests on it"""
+
+    def __init__(self, name, headers=None, timeout=DEFAULT_TIMEOUT,
+                 max_in_flight=MAX_IN_FLIGHT, max_per_host=MAX_PER_HOST):
+        self.name = name
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.max_per_host = max_per_host
+
+        self._client = None
+        self._semaphore = None
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name=f'async-scrape-{name}', daemon=True)
+        self._thread.start()
+
+    # Sync facade ---------------------------------------------------------
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the engine loop and block until it finishes.
+
+        On timeout the coroutine is cancelled, so its requests don't keep
+        running on the loop after the caller has given up.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def race_sync(self, attempts, timeout=None):
+        return self.run(self.race(attempts), timeout)
+
+    def close(self):
+        if self.loop.is_closed():
+            return
+        if self._client is not None:
+            try:
+                self.run(self._client.close(), timeout=5)
+            except Exception:
+                pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    # Async core ----------------------------------------------------------
+
+    def _ensure_client(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        if self._client is None and aiohttp is not None:
+            connector = aiohttp.TCPConnector(limit=self.max_in_flight, limit_per_host=self.max_per_host, ttl_dns_cache=300)
+            self._client = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+
+    async def fetch(self, method, url, **kwargs):
+        """Issue one request under the shared per-host rate limit and circuit breaker"""
+        self._ensure_client()
+        if self._client is None:
+            # The pooled session applies the host's rate limit and breaker and records its own metrics
+            async with self._semaphore:
+                return await self._fetch_in_thread(method, url, **kwargs)
+
+        host = urlsplit(url).hostname or ''
+        breaker = host_policies.breaker(host)
+        if not breaker.allow():
+            UPSTREAM_REQUESTS.labels(host, 'circuit_open').inc()
+            raise CircuitOpenError(f"Circuit open for {host}, skipping request")
+
+        try:
+            wait = host_policies.limiter(host).reserve()
+            UPSTREAM_THROTTLE.labels(host).observe(wait)
+            if wait:
+                await asyncio.sleep(wait)
+
+            async with self._semaphore:
+                started = time.perf_counter()
+                async with self._client.request(method, url, **kwargs) as response:
+                    result = FetchResult(str(response.url), response.status, await response.text(errors='replace'))
+                UPSTREAM_DURATION.labels(host).observe(time.perf_counter() - started)
+        except asyncio.CancelledError:
+            # A lost race says nothing about the host, but must not keep a half-open trial slot
+            breaker.release_trial()
+            raise
+        except Exception:
+            breaker.record_failure()
+            UPSTREAM_REQUESTS.labels(host, 'error').inc()
+            raise
+
+        UPSTREAM_REQUESTS.labels(host, upstream_outcome(result.status)).inc()
+        if result.status >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return result
+
+    async def _fetch_in_thread(self, method, url, **kwargs):
+        session = get_session(self.name, self.headers, timeout=self.timeout)
+        response = await self.loop.run_in_executor(None, lambda: session.request(method, url, **kwargs))
+        return FetchResult(response.url, response.status_code, response.text)
+
+    async def race(self, attempts):
+        """Run attempt coroutines concurrently and return the first non-None result.
+
+        The remaining attempts are cancelled as soon as one succeeds.
+        """
+        tasks = [asyncio.ensure_future(attempt) for attempt in attempts]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    result = await next_done
+                except Exception as e:
+                    logger.debug(f"Race attempt failed: {e}")
+                    continue
+                if result is not None:
+                    return result
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(name, headers=None, timeout=DEFAULT_TIMEOUT):
+    """Return the process-wide async engine for a scraper, creating it on first use"""
+    with _engines_lock:
+        engine = _engines.get(name)
+        if engine is None:
+            engine = _engines[name] = AsyncScrapeEngine(name, headers, timeout=timeout)
+        return engine
+
+
+@atexit.register
+def _close_engines():
+    for engine in list(_engines.values()):
+        engine.close()
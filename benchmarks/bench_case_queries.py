@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark Case hearing-date and recency lookups at increasing table sizes
+
+Usage: python benchmarks/bench_case_queries.py [--rows 10000 100000 1000000] [--repeat 200]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import insert, text
+
+from models import db, Case
+from migrations import upgrade_database
+from case_queries import cases_hearing_between, cases_hearing_on, recent_cases
+
+COURTS = [f'District Court {i}' for i in range(1, 41)]
+BATCH_SIZE = 20000
+
+
+def make_app(db_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def populate(rows):
+    rng = random.Random(42)
+    today = date.today()
+    now = datetime.utcnow()
+    for start in range(0, rows, BATCH_SIZE):
+        batch = []
+        for i in range(start, min(start + BATCH_SIZE, rows)):
+            batch.append({
+                'cnr': f'BENCH{i:012d}',
+                'case_type': 'CS',
+                'case_number': str(i),
+                'case_year': '2024',
+                'case_title': f'Petitioner {i} vs Respondent {i}',
+                'court_name': rng.choice(COURTS),
+                'next_hearing_date': today + timedelta(days=rng.randint(-180, 180)),
+                'status': 'Pending',
+                'created_at': now,
+                'updated_at': now - timedelta(seconds=rng.randint(0, 10 ** 7))
+            })
+        db.session.execute(insert(Case), batch)
+        db.session.commit()
+
+
+def p95(samples):
+    return statistics.quantiles(samples, n=20)[18]
+
+
+def time_query(build, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        build().all()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def run(rows, repeat):
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    app = make_app(db_path)
+    try:
+        with app.app_context():
+            upgrade_database()
+            started = time.perf_counter()
+            populate(rows)
+            load_seconds = time.perf_counter() - started
+
+            today = date.today()
+            court = COURTS[0]
+            queries = {
+                'hearing_on(today)': lambda: cases_hearing_on(today).limit(200),
+                'hearing_between(court, +-2d)': lambda: cases_hearing_between(today - timedelta(days=2), today + timedelta(days=2), court),
+                'recent_cases(20)': lambda: recent_cases().limit(20),
+            }
+
+            print(f"\n{rows:,} rows (loaded in {load_seconds:.1f}s)")
+            for name, build in queries.items():
+                plan = db.session.execute(text('EXPLAIN QUERY PLAN ' + str(build().statement.compile(
+                    db.engine, compile_kwargs={'literal_binds': True})))).fetchall()
+                samples = time_query(build, repeat)
+                print(f"  {name:32s} p50={statistics.median(samples):7.3f}ms  p95={p95(samples):7.3f}ms  plan: {plan[0][-1]}")
+            db.session.remove()
+    finally:
+        os.remove(db_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        run(rows, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-observation cost of the metrics layer
+
+Observations are made in --rounds short runs and each figure is the fastest
+run, which keeps scheduler noise out. Exits 1 when a timed block
+(``with child.time()``) costs more than --budget-ns.
+
+Usage: python benchmarks/bench_metrics.py [--observations 1000000] [--rounds 20] [--budget-ns 1000]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Counter, Histogram, query_family
+
+
+def per_call_ns(func, n, rounds=1):
+    per_round = max(n // rounds, 1)
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(per_round):
+            func()
+        best = min(best, time.perf_counter() - started)
+    return best / per_round * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--observations', type=int, default=1000000)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--budget-ns', type=float, default=1000,
+                        help='most a timed block may cost, after call overhead')
+    args = parser.parse_args()
+    n, rounds = args.observations, args.rounds
+
+    histogram = Histogram('bench_duration_seconds', 'benchmark', ('route',))
+    counter = Counter('bench_total', 'benchmark', ('cache', 'result'))
+    child = histogram.labels('/api/cases')
+    counter_child = counter.labels('pdf', 'hit')
+    statement = 'SELECT "case".id, "case".cnr FROM "case" WHERE "case".next_hearing_date = ? LIMIT ?'
+
+    class Empty:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            pass
+
+    def empty_block():
+        with Empty():
+            pass
+
+    def timed_block():
+        with child.time():
+            pass
+
+    baseline = per_call_ns(lambda: None, n, rounds)
+    results = {
+        'histogram child.observe': lambda: child.observe(0.012),
+        'histogram labels().observe': lambda: histogram.labels('/api/cases').observe(0.012),
+        'counter child.inc': lambda: counter_child.inc(),
+        'counter labels().inc': lambda: counter.labels('pdf', 'hit').inc(),
+        'with Empty() (floor)': empty_block,
+        'with child.time()': timed_block,
+        'query_family (cached)': lambda: query_family(statement),
+    }
+    print(f"{n:,} observations each, fastest of {rounds} runs, call overhead of {baseline:.0f}ns subtracted")
+    costs = {}
+    for name, func in results.items():
+        costs[name] = per_call_ns(func, n, rounds) - baseline
+        print(f"  {name:30s} {costs[name]:7.0f}ns")
+
+    timed = costs['with child.time()']
+    if timed > args.budget_ns:
+        print(f"FAIL: with child.time() costs {timed:.0f}ns, over the {args.budget_ns:.0f}ns budget")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark cause list PDF rendering throughput and peak memory at increasing list sizes
+
+Usage: python benchmarks/bench_pdf_render.py [--rows 25 500 5000] [--repeat 3] [--courts 24] [--workers N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+from concurrent.futures import wait
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from causelist_pdf import render_cause_list, RenderPool, DEFAULT_RENDER_WORKERS
+
+STAGES = ['For Hearing', 'Arguments', 'Evidence', 'For Orders', 'Judgment Reserved']
+
+
+def iter_cases(rows):
+    """Generate synthetic cases lazily, like a streamed DB cursor"""
+    for i in range(1, rows + 1):
+        yield {
+            'case_number': f'CS {i}/2024',
+            'parties': f'Petitioner Number {i} vs Respondent Number {i}',
+            'stage': STAGES[i % len(STAGES)],
+            'time': f'{10 + i % 6}:{"00" if i % 2 else "30"} AM'
+        }
+
+
+def run(rows, repeat):
+    fd, path = tempfile.mkstemp(suffix='.pdf')
+    os.close(fd)
+    try:
+        seconds = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            pages = render_cause_list(path, iter_cases(rows), 'Bench Court', date.today().isoformat())
+            seconds.append(time.perf_counter() - started)
+
+        # Memory is measured in a separate pass since tracemalloc slows rendering down
+        tracemalloc.start()
+        render_cause_list(path, iter_cases(rows), 'Bench Court', date.today().isoformat())
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        best = min(seconds)
+        print(f"  {rows:>7,} rows  {pages:>5} pages  {best * 1000:9.1f}ms  "
+              f"{pages / best:8.1f} pages/s  peak={peak / 2 ** 20:6.2f}MiB  size={os.path.getsize(path) / 1024:8.1f}KiB")
+    finally:
+        os.remove(path)
+
+
+def run_complex(courts, rows, workers):
+    """Render a whole complex of courts in-process, then on a process pool"""
+    tmpdir = tempfile.mkdtemp()
+    cases = list(iter_cases(rows))
+    today = date.today().isoformat()
+    try:
+        timings = {}
+        for label, pool_workers in (('in-process', 1), (f'{workers} processes', workers)):
+            pool = RenderPool(pool_workers)
+            # Warm the workers up so start-up cost isn't counted
+            pool.submit(os.path.join(tmpdir, 'warmup.pdf'), cases[:1], 'Warmup', today).result()
+
+            started = time.perf_counter()
+            futures = [pool.submit(os.path.join(tmpdir, f'court_{i}.pdf'), cases, f'Court {i}', today)
+                       for i in range(courts)]
+            wait(futures)
+            pages = sum(future.result()[2] for future in futures)
+            timings[label] = time.perf_counter() - started
+            pool.shutdown()
+            print(f"  {courts} courts x {rows} rows  {label:14s} {timings[label] * 1000:9.1f}ms  {pages / timings[label]:8.1f} pages/s")
+
+        print(f"  speedup: {timings['in-process'] / timings[f'{workers} processes']:.2f}x")
+    finally:
+        for name in os.listdir(tmpdir):
+            os.remove(os.path.join(tmpdir, name))
+        os.rmdir(tmpdir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[25, 500, 5000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--courts', type=int, default=24)
+    parser.add_argument('--court-rows', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=DEFAULT_RENDER_WORKERS)
+    args = parser.parse_args()
+
+    print("Single PDF")
+    for rows in args.rows:
+        run(rows, args.repeat)
+
+    print("\nWhole complex")
+    run_complex(args.courts, args.court_rows, max(2, args.workers))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark full-text case search at increasing table sizes
+
+Usage: python benchmarks/bench_search.py [--rows 100000 1000000] [--repeat 50] [--target-ms 50]
+
+Exits non-zero when any query's p95 is over the target at any of the sizes.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import insert
+
+from models import db, Case
+from migrations import upgrade_database
+from search_index import search_cases
+
+FIRST_NAMES = ['Rajesh', 'Priya', 'Amit', 'Neha', 'Vikram', 'Kavita', 'Suresh', 'Anita', 'Rahul', 'Pooja',
+               'Manoj', 'Sunita', 'Deepak', 'Meena', 'Arun', 'Rekha', 'Sanjay', 'Geeta', 'Ajay', 'Seema']
+LAST_NAMES = ['Kumar', 'Sharma', 'Singh', 'Gupta', 'Jain', 'Mehta', 'Verma', 'Agarwal', 'Malhotra', 'Kapoor',
+              'Chopra', 'Bansal', 'Arora', 'Sethi', 'Khanna', 'Bhatia', 'Saxena', 'Tiwari', 'Mishra', 'Yadav']
+COURTS = [f'District Court {i}' for i in range(1, 41)]
+BATCH_SIZE = 20000
+
+QUERIES = {
+    'cnr': 'BENCH000000123456',
+    'rare name': 'Rekha Bhatia 417',
+    'phrase': '"State of Delhi"',
+    'prefix': 'Malh* 42*',
+    'common word': 'Kumar',
+    'two common words': 'Sharma Pending',
+}
+
+
+def make_app(db_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def random_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.randint(1, 500)}"
+
+
+def populate(rows):
+    rng = random.Random(42)
+    today = date.today()
+    now = datetime.utcnow()
+    for start in range(0, rows, BATCH_SIZE):
+        batch = []
+        for i in range(start, min(start + BATCH_SIZE, rows)):
+            petitioner = random_name(rng)
+            respondent = 'State of Delhi' if rng.random() < 0.2 else random_name(rng)
+            batch.append({
+                'cnr': f'BENCH{i:012d}',
+                'case_title': f'{petitioner} vs {respondent}',
+                'petitioner': petitioner,
+                'respondent': respondent,
+                'court_name': rng.choice(COURTS),
+                'judge_name': random_name(rng),
+                'next_hearing_date': today + timedelta(days=rng.randint(-180, 180)),
+                'status': rng.choice(['Pending', 'Disposed']),
+                'created_at': now,
+                'updated_at': now
+            })
+        db.session.execute(insert(Case), batch)
+        db.session.commit()
+
+
+def p95(samples):
+    return statistics.quantiles(samples, n=20)[18]
+
+
+def run(rows, repeat, target_ms):
+    """Time every query at ``rows`` rows; returns the names of those over the target"""
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    app = make_app(db_path)
+    try:
+        with app.app_context():
+            upgrade_database()
+            started = time.perf_counter()
+            populate(rows)
+            load_seconds = time.perf_counter() - started
+
+            print(f"\n{rows:,} rows (loaded and indexed in {load_seconds:.1f}s)")
+            slow = []
+            for name, query in QUERIES.items():
+                samples = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    page = search_cases(query)
+                    samples.append((time.perf_counter() - started) * 1000)
+                over = p95(samples) > target_ms
+                if over:
+                    slow.append(name)
+                print(f"  {name:18s} {query!r:24s} p50={statistics.median(samples):7.2f}ms  "
+                      f"p95={p95(samples):7.2f}ms  hits={len(page['rows'])}"
+                      f"{'  capped' if page['total_capped'] else ''}{'  OVER TARGET' if over else ''}")
+            db.session.remove()
+            return slow
+    finally:
+        os.remove(db_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--target-ms', type=float, default=50.0, help='p95 budget per query')
+    args = parser.parse_args()
+
+    failed = []
+    for rows in args.rows:
+        failed += [f'{name} at {rows:,} rows' for name in run(rows, args.repeat, args.target_ms)]
+
+    if failed:
+        print(f"\nOver the {args.target_ms:g}ms target: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"\nAll queries within {args.target_ms:g}ms p95")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark watchlist matching of many watched names against cause list rows
+
+Usage: python benchmarks/bench_watchlist.py [--terms 100 1000 5000] [--rows 50000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from watchlist import WatchMatcher, normalize_name
+
+FIRST_NAMES = ['Rajesh', 'Priya', 'Amit', 'Neha', 'Vikram', 'Kavita', 'Suresh', 'Anita', 'Rahul', 'Pooja',
+               'Manoj', 'Sunita', 'Deepak', 'Meena', 'Arun', 'Rekha', 'Sanjay', 'Geeta', 'Ajay', 'Seema']
+LAST_NAMES = ['Kumar', 'Sharma', 'Singh', 'Gupta', 'Jain', 'Mehta', 'Verma', 'Agarwal', 'Malhotra', 'Kapoor',
+              'Chopra', 'Bansal', 'Arora', 'Sethi', 'Khanna', 'Bhatia', 'Saxena', 'Tiwari', 'Mishra', 'Yadav']
+
+
+def random_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.randint(1, 500)}"
+
+
+def make_rows(rows, rng):
+    return [f"{random_name(rng)} & Ors. vs {random_name(rng)} through Adv. {random_name(rng)}" for _ in range(rows)]
+
+
+def naive(terms, texts):
+    """Baseline: test every term against every row"""
+    patterns = [f' {normalize_name(term)} ' for term in terms]
+    hits = 0
+    for text in texts:
+        padded = f' {normalize_name(text)} '
+        hits += sum(1 for pattern in patterns if pattern in padded)
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--terms', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--naive-rows', type=int, default=2000, help='rows for the terms x rows baseline')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    texts = make_rows(args.rows, rng)
+
+    for term_count in args.terms:
+        terms = list({random_name(rng) for _ in range(term_count)})
+
+        started = time.perf_counter()
+        matcher = WatchMatcher([(i, 1, normalize_name(term)) for i, term in enumerate(terms)])
+        compile_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        hits = sum(len(matcher.match(text)) for text in texts)
+        scan_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        naive(terms, texts[:args.naive_rows])
+        naive_seconds = (time.perf_counter() - started) * args.rows / args.naive_rows
+
+        print(f"  {len(terms):>6,} terms x {args.rows:,} rows  compile={compile_seconds * 1000:7.1f}ms  "
+              f"scan={scan_seconds:6.2f}s  hits={hits:,}  naive~{naive_seconds:7.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite: scrapers, PDF generation, API routes and case queries
+
+Court websites are replayed from the recorded pages in benchmarks/fixtures/,
+so the suite needs no network. Results are compared against
+benchmarks/baseline.json and the run exits with status 1 when a benchmark
+got slower than the baseline allows. A fixed calibration loop is timed with
+every run and baseline medians are scaled by how much faster or slower it
+ran here, so a busier or slower host doesn't read as a regression.
+
+Usage: python benchmarks/run_suite.py [--quick] [--filter parse] [--json results.json] [--rounds 3]
+                                      [--case-rows 10000 100000 1000000] [--update-baseline]
+       python benchmarks/run_suite.py --record   (refresh the fixtures from the live sites)
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+from datetime import date, datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Recorded pages, and the CNR the eCourts page was recorded for
+ECOURTS_FIXTURE = 'ecourts_cnr_details.html'
+DCOURTS_FIXTURE = 'dcourts_cause_list.html'
+RECORDED_CNR = 'DLND010012342024'
+
+PDF_ROWS = (25, 500, 5000)
+CASE_ROWS = (10000, 100000, 1000000)
+# Cases in the app database behind the /api/cases benchmarks
+API_ROWS = 10000
+
+# A benchmark regresses when its median exceeds the (calibrated) baseline by
+# this fraction plus a small absolute allowance for timer noise on sub-millisecond runs
+DEFAULT_TOLERANCE = 0.25
+NOISE_FLOOR_MS = 0.05
+
+# Each benchmark is measured this many times and the median round is reported
+DEFAULT_ROUNDS = 3
+CALIBRATION_REPEAT = 20
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+# Replay -------------------------------------------------------------------
+
+class ReplayResponse:
+    def __init__(self, url, text, status_code=200):
+        self.url = url
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.status_code = status_code
+
+
+class ReplaySession:
+    """Stands in for a scraper's HTTP session, answering every request with one recorded page"""
+
+    def __init__(self, page):
+        self.page = page
+
+    def get(self, url, **kwargs):
+        return ReplayResponse(url, self.page)
+
+    def request(self, method, url, **kwargs):
+        return ReplayResponse(url, self.page)
+
+
+def install_ecourts_replay(page):
+    """Make every eCourts scraper fetch the recorded CNR page, rewritten for the CNR asked for"""
+    import async_scraper
+    from async_scraper import AsyncScrapeEngine, FetchResult
+
+    class ReplayEngine(AsyncScrapeEngine):
+        async def fetch(self, method, url, **kwargs):
+            cnr = (kwargs.get('data') or {}).get('cnr_number', RECORDED_CNR)
+            return FetchResult(url, 200, page.replace(RECORDED_CNR, cnr))
+
+    with async_scraper._engines_lock:
+        old = async_scraper._engines.pop('ecourts', None)
+        async_scraper._engines['ecourts'] = ReplayEngine('ecourts')
+    if old is not None:
+        old.close()
+
+
+def record_fixtures():
+    """Fetch the live pages the suite replays and overwrite the fixtures"""
+    from delhi_courts_scraper import DelhiCourtsRealScraper
+    from real_ecourts_scraper import RealECourtsScraper
+
+    scraper = DelhiCourtsRealScraper()
+    response = scraper.session.get(scraper.causelist_url, timeout=30)
+    response.raise_for_status()
+    with open(os.path.join(FIXTURES_DIR, DCOURTS_FIXTURE), 'w', encoding='utf-8') as f:
+        f.write(response.text)
+
+    ecourts = RealECourtsScraper()
+    response = ecourts.session.post(RealECourtsScraper.CNR_URLS[0], timeout=30,
+                                    data={'cnr_number': RECORDED_CNR, 'captcha': '', 'submit': 'Submit'})
+    response.raise_for_status()
+    with open(os.path.join(FIXTURES_DIR, ECOURTS_FIXTURE), 'w', encoding='utf-8') as f:
+        f.write(response.text)
+    print(f"Recorded {DCOURTS_FIXTURE} and {ECOURTS_FIXTURE}")
+
+
+# Benchmarks ---------------------------------------------------------------
+#
+# Each group is a generator yielding (name, function, repeat); the runner
+# times the function while the group keeps its setup (app context, temp
+# files) open. Groups skip expensive setup nobody selected.
+
+def selected(args, *names):
+    """Whether --filter lets any of ``names`` run"""
+    return not args.filter or any(pattern in name for name in names for pattern in args.filter)
+
+
+def bench_scrapers(args):
+    from delhi_courts_scraper import DelhiCourtsRealScraper
+    from real_ecourts_scraper import RealECourtsScraper
+
+    ecourts = RealECourtsScraper()
+    ecourts_page = load_fixture(ECOURTS_FIXTURE)
+    yield 'parse.ecourts_cnr_details', lambda: ecourts._parse_real_response(ecourts_page, RECORDED_CNR), 50
+
+    scraper = DelhiCourtsRealScraper()
+    scraper.session = ReplaySession(load_fixture(DCOURTS_FIXTURE))
+    list_date = date.today().isoformat()
+    yield 'parse.dcourts_causelist_page', scraper.fetch_causelist_page, 30
+    # Served by the court directory once the page has been loaded
+    yield 'scrape.get_court_complexes', scraper.get_court_complexes, 200
+    yield 'scrape.get_judges_list', lambda: scraper.get_judges_list('NDC', list_date), 200
+
+
+def bench_pdf(args):
+    import delhi_courts_scraper
+    from causelist_pdf import PdfOutputCache
+    from bench_pdf_render import iter_cases
+
+    tmpdir = tempfile.mkdtemp()
+    saved_cache = delhi_courts_scraper.pdf_cache
+    delhi_courts_scraper.pdf_cache = PdfOutputCache(tmpdir)
+    scraper = delhi_courts_scraper.DelhiCourtsRealScraper()
+    list_date = date.today().isoformat()
+    try:
+        for rows in PDF_ROWS:
+            cases = list(iter_cases(rows))
+            renders = iter(range(10 ** 6))
+            # A new judge name each call misses the PDF cache, so every call renders
+            yield (f'pdf.generate_pdf[{rows}]',
+                   lambda: scraper.generate_pdf(cases, f'Bench Court {next(renders)}', 'Court Room 1', list_date),
+                   max(2, 2000 // rows))
+
+        cases = list(iter_cases(500))
+        scraper.generate_pdf(cases, 'Bench Court', 'Court Room 1', list_date)
+        yield 'pdf.generate_pdf[500,cached]', lambda: scraper.generate_pdf(cases, 'Bench Court', 'Court Room 1', list_date), 50
+    finally:
+        delhi_courts_scraper.pdf_cache = saved_cache
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def bench_api(args):
+    if not selected(args, 'api.cases', 'api.search'):
+        return
+
+    from app import app, init_database
+    from models import db
+    from bench_case_queries import populate
+
+    install_ecourts_replay(load_fixture(ECOURTS_FIXTURE))
+    init_database()
+    with app.app_context():
+        populate(API_ROWS)
+        db.session.remove()
+
+    client = app.test_client()
+    client.post('/login', data={'mobile': '9999999999', 'password': 'admin123'})
+
+    def get_ok(url):
+        response = client.get(url)
+        assert response.status_code == 200 and response.get_json()['success'], url
+
+    def search(cnr):
+        response = client.post('/api/search', json={'cnr': cnr})
+        assert response.get_json()['success'], response.get_json()
+
+    yield f'api.cases[{API_ROWS},all]', lambda: get_ok('/api/cases?filter=all&per_page=20'), 50
+    yield f'api.cases[{API_ROWS},upcoming]', lambda: get_ok('/api/cases?filter=upcoming&per_page=100'), 50
+
+    lookups = iter(range(10 ** 6))
+    # A CNR never seen before misses the CNR cache and goes through the (replayed) scrape
+    yield 'api.search[cold]', lambda: search(f'DLND01{next(lookups):06d}2024'), 30
+    search(RECORDED_CNR)
+    yield 'api.search[cached]', lambda: search(RECORDED_CNR), 50
+
+
+def bench_case_queries(args):
+    from models import db
+    from migrations import upgrade_database
+    from case_queries import cases_hearing_between, cases_hearing_on, recent_cases
+    from bench_case_queries import COURTS, make_app, populate
+
+    today = date.today()
+    queries = {
+        'hearing_on(today)': lambda: cases_hearing_on(today).limit(200).all(),
+        'hearing_between(court,+-2d)': lambda: cases_hearing_between(
+            today - timedelta(days=2), today + timedelta(days=2), COURTS[0]).all(),
+        'recent_cases(20)': lambda: recent_cases().limit(20).all(),
+    }
+
+    for rows in args.case_rows:
+        if not selected(args, *(f'queries.{name}[{rows}]' for name in queries)):
+            continue
+        fd, db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        app = make_app(db_path)
+        try:
+            with app.app_context():
+                upgrade_database()
+                populate(rows)
+                for name, query in queries.items():
+                    yield f'queries.{name}[{rows}]', query, 100
+                db.session.remove()
+        finally:
+            os.remove(db_path)
+
+
+GROUPS = [bench_scrapers, bench_pdf, bench_api, bench_case_queries]
+
+
+# Runner -------------------------------------------------------------------
+
+def p95(samples):
+    return statistics.quantiles(samples, n=20)[18] if len(samples) >= 2 else samples[0]
+
+
+def measure(function, repeat, rounds=1):
+    """Median of ``rounds`` per-round medians of ``repeat`` calls; p95 and min over every call"""
+    function()  # warm-up: imports, compiled queries, first-use caches
+    samples = []
+    medians = []
+    for _ in range(rounds):
+        batch = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            batch.append((time.perf_counter() - started) * 1000)
+        medians.append(statistics.median(batch))
+        samples += batch
+    return {
+        'median_ms': round(statistics.median(medians), 4),
+        'p95_ms': round(p95(samples), 4),
+        'min_ms': round(min(samples), 4),
+        'repeat': repeat,
+        'rounds': rounds
+    }
+
+
+def calibration_loop():
+    """Fixed interpreter-bound workload: dict, string and arithmetic work, no I/O"""
+    counts = {}
+    total = 0
+    for i in range(50000):
+        key = f'k{i % 997}'
+        counts[key] = counts.get(key, 0) + 1
+        total += len(key) * i % 7
+    return total
+
+
+def calibrate(rounds):
+    return measure(calibration_loop, CALIBRATION_REPEAT, rounds)['median_ms']
+
+
+def run_suite(args):
+    # Calibrated before and after, so load that comes and goes during the run is averaged in
+    calibration = calibrate(args.rounds)
+    results = {}
+    for group in GROUPS:
+        benchmarks = group(args)
+        try:
+            for name, function, repeat in benchmarks:
+                if not selected(args, name):
+                    continue
+                if args.quick:
+                    repeat = max(2, repeat // 5)
+                results[name] = measure(function, repeat, args.rounds)
+                print(f"  {name:45s} median={results[name]['median_ms']:10.3f}ms  "
+                      f"p95={results[name]['p95_ms']:10.3f}ms", file=sys.stderr)
+        finally:
+            benchmarks.close()
+
+    calibration = round((calibration + calibrate(args.rounds)) / 2, 4)
+    print(f"  {'calibration':45s} median={calibration:10.3f}ms", file=sys.stderr)
+    for result in results.values():
+        result['calibration_ms'] = calibration
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Names and messages of the benchmarks slower than the baseline allows.
+
+    Each baseline median is scaled by this run's calibration time over the
+    one it was recorded with; entries recorded without one are compared as is.
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        scale = result['calibration_ms'] / expected['calibration_ms'] if expected.get('calibration_ms') else 1.0
+        expected_ms = expected['median_ms'] * scale
+        limit = expected_ms * (1 + tolerance) + NOISE_FLOOR_MS
+        if result['median_ms'] > limit:
+            regressions.append(f"{name}: median {result['median_ms']:.3f}ms vs calibrated baseline "
+                               f"{expected_ms:.3f}ms ({result['median_ms'] / expected_ms:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--json', metavar='PATH', help="write results as JSON to PATH ('-' for stdout)")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown over the baseline median, as a fraction')
+    parser.add_argument('--filter', nargs='+', help='only run benchmarks whose name contains one of these')
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS,
+                        help='measure each benchmark this many times and report the median round')
+    parser.add_argument('--case-rows', type=int, nargs='+', default=list(CASE_ROWS))
+    parser.add_argument('--quick', action='store_true', help='fewer repeats and only the smallest case table')
+    parser.add_argument('--record', action='store_true', help='refresh the fixtures from the live sites and exit')
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures()
+        return
+
+    if args.quick:
+        args.case_rows = args.case_rows[:1]
+
+    # The app under test gets its own database, CNR cache and quiet logs
+    logging.basicConfig(level=logging.WARNING)
+    workdir = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['CNR_CACHE_PATH'] = os.path.join(workdir, 'cnr_cache.db')
+    os.environ['COURT_DIRECTORY_PATH'] = os.path.join(workdir, 'court_directory.db')
+    try:
+        results = run_suite(args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': f'{platform.system()} {platform.machine()}, {os.cpu_count()} cpu',
+        'results': results
+    }
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)['results']
+        # A filtered run only replaces the benchmarks it ran
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(dict(report, results=dict(sorted(baseline.items()))), f, indent=2)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one", file=sys.stderr)
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('machine') != report['machine'] or baseline.get('python') != report['python']:
+        print(f"WARNING baseline was recorded on {baseline.get('machine')} (Python {baseline.get('python')}), "
+              f"this is {report['machine']} (Python {report['python']}); timings are scaled by the "
+              f"calibration loop, but expect more noise", file=sys.stderr)
+
+    regressions = compare(results, baseline['results'], args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}", file=sys.stderr)
+    if regressions:
+        print(f"{len(regressions)} of {len(results)} benchmarks regressed "
+              f"beyond {args.tolerance:.0%} of baseline", file=sys.stderr)
+        sys.exit(1)
+    print(f"{len(results)} benchmarks within {args.tolerance:.0%} of baseline", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
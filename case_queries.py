@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Reusable Case lookups backed by the indexes declared on models.Case
+"""
+
+import time
+import base64
+import threading
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import load_only
+
+from models import db, Case
+from metrics import CACHE_REQUESTS
+
+CASE_FILTERS = ('all', 'today', 'tomorrow', 'upcoming')
+UPCOMING_DAYS = 7
+COUNT_CACHE_TTL = 30
+
+_cache_hits = CACHE_REQUESTS.labels('case_counts', 'hit')
+_cache_misses = CACHE_REQUESTS.labels('case_counts', 'miss')
+
+
+def cases_hearing_between(start, end, court_name=None):
+    """Cases whose next hearing falls in [start, end], in hearing-date order.
+
+    Uses ix_case_court_hearing when a court is given, ix_case_next_hearing_date otherwise.
+    """
+    query = Case.query
+    if court_name:
+        query = query.filter(Case.court_name == court_name)
+    return query.filter(Case.next_hearing_date.between(start, end)).order_by(Case.next_hearing_date, Case.id)
+
+
+def cases_hearing_on(day, court_name=None):
+    """Cases listed for hearing on a single day"""
+    return cases_hearing_between(day, day, court_name)
+
+
+def cases_hearing_around(day, days=2, court_name=None):
+    """Cases listed within ``days`` either side of a day"""
+    return cases_hearing_between(day - timedelta(days=days), day + timedelta(days=days), court_name)
+
+
+def recent_cases():
+    """Most recently updated cases first (ix_case_updated_at)"""
+    return Case.query.order_by(Case.updated_at.desc(), Case.id.desc())
+
+
+def hearing_filter(filter_name, today=None):
+    """SQL predicate for a dashboard filter, or None for 'all'"""
+    today = today or date.today()
+    if filter_name == 'today':
+        return Case.next_hearing_date == today
+    if filter_name == 'tomorrow':
+        return Case.next_hearing_date == today + timedelta(days=1)
+    if filter_name == 'upcoming':
+        return Case.next_hearing_date.between(today + timedelta(days=2), today + timedelta(days=UPCOMING_DAYS))
+    return None
+
+
+def encode_cursor(case):
+    raw = f"{case.updated_at.isoformat()}|{case.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Return (updated_at, id) from a cursor, raising ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        updated_at, case_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(updated_at), int(case_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def case_page(filter_name='all', cursor=None, per_page=20, columns=None):
+    """One page of cases, newest first, using keyset pagination on (updated_at, id).
+
+    Returns (cases, next_cursor). ``columns`` limits which Case columns are loaded.
+    """
+    query = recent_cases()
+    if columns:
+        query = query.options(load_only(*columns))
+
+    predicate = hearing_filter(filter_name)
+    if predicate is not None:
+        query = query.filter(predicate)
+
+    if cursor:
+        updated_at, case_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Case.updated_at, Case.id) < tuple_(updated_at, case_id))
+
+    cases = query.limit(per_page + 1).all()
+    next_cursor = encode_cursor(cases[per_page - 1]) if len(cases) > per_page else None
+    return cases[:per_page], next_cursor
+
+
+class _CountCache:
+    """Short-lived cache of COUNT(*) results per filter"""
+
+    def __init__(self, ttl=COUNT_CACHE_TTL):
+        self.ttl = ttl
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def get(self, key, compute):
+        now = time.monotonic()
+        with self.lock:
+            hit = self.values.get(key)
+            if hit and now - hit[1] < self.ttl:
+                _cache_hits.inc()
+                return hit[0]
+        _cache_misses.inc()
+        value = compute()
+        with self.lock:
+            self.values[key] = (value, now)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.values.clear()
+
+
+count_cache = _CountCache()
+
+
+def count_cases(filter_name='all'):
+    """Number of cases matching a dashboard filter, cached for COUNT_CACHE_TTL seconds"""
+    def compute():
+        query = db.session.query(func.count(Case.id))
+        predicate = hearing_filter(filter_name)
+        if predicate is not None:
+            query = query.filter(predicate)
+        return query.scalar()
+
+    return count_cache.get((filter_name, date.today()), compute)
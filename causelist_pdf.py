@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Streaming cause list PDF renderer
+Cases are consumed lazily in fixed-size chunks, so memory stays flat for very long boards,
+and multi-court downloads are rendered on a process pool
+"""
+
+import os
+import re
+import json
+import time
+import atexit
+import hashlib
+import logging
+import threading
+import multiprocessing
+from datetime import datetime
+from xml.sax.saxutils import escape
+from itertools import islice
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import BaseDocTemplate, PageTemplate, Frame, Flowable, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+
+from metrics import PDF_RENDER_DURATION, PDF_PAGES, CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+DOWNLOADS_DIR = 'downloads'
+
+# Generated PDFs are kept until downloads/ grows past this size, then evicted least recently used first
+DEFAULT_DOWNLOADS_MAX_BYTES = 512 * 1024 * 1024
+
+# Bump whenever the rendered layout changes
+TEMPLATE_VERSION = '2'
+
+# Render worker processes; one per core keeps every core busy on a whole complex
+DEFAULT_RENDER_WORKERS = os.cpu_count() or 4
+
+_render_inline_seconds = PDF_RENDER_DURATION.labels('inline')
+_render_pool_seconds = PDF_RENDER_DURATION.labels('pool')
+_cache_hits = CACHE_REQUESTS.labels('pdf', 'hit')
+_cache_misses = CACHE_REQUESTS.labels('pdf', 'miss')
+
+# Case fields used in the table; only these are shipped to render workers
+ROW_FIELDS = ('case_number', 'parties', 'stage', 'time')
+
+# Rows per table chunk; about one A4 page of cases, so chunks rarely need splitting
+ROWS_PER_CHUNK = 30
+
+TABLE_HEADER = ['S.No.', 'Case Number', 'Parties Name', 'Purpose/Stage', 'Time']
+COL_WIDTHS = [0.6*inch, 1.8*inch, 3*inch, 1.8*inch, 0.8*inch]
+MAX_PARTIES_LENGTH = 35
+
+# Heading and subheading at the top of every cause list; other courts pass their own
+DEFAULT_HEADER = ('DELHI DISTRICT COURTS', 'NEW DELHI')
+
+# Styles are built once at import and shared by every render
+_styles = getSampleStyleSheet()
+
+HEADER_STYLE = ParagraphStyle(
+    'CourtHeader',
+    parent=_styles['Normal'],
+    fontSize=14,
+    spaceAfter=5,
+    alignment=1,
+    fontName='Helvetica-Bold'
+)
+
+SUBHEADER_STYLE = ParagraphStyle(
+    'SubHeader',
+    parent=_styles['Normal'],
+    fontSize=12,
+    spaceAfter=3,
+    alignment=1,
+    fontName='Helvetica'
+)
+
+INFO_STYLE = ParagraphStyle(
+    'InfoStyle',
+    parent=_styles['Normal'],
+    fontSize=11,
+    spaceAfter=3,
+    alignment=1,
+    fontName='Helvetica-Bold'
+)
+
+NO_CASES_STYLE = ParagraphStyle(
+    'NoCases',
+    parent=_styles['Normal'],
+    fontSize=12,
+    alignment=1,
+    fontName='Helvetica-Bold'
+)
+
+FOOTER_STYLE = ParagraphStyle(
+    'Footer',
+    parent=_styles['Normal'],
+    fontSize=8,
+    alignment=1,
+    fontName='Helvetica'
+)
+
+HEADER_COMMANDS = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.black),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('LINEBELOW', (0, 0), (-1, 0), 2, colors.black),
+]
+
+CELL_COMMANDS = [
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('LEFTPADDING', (0, 0), (-1, -1), 4),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+]
+
+
+def _row_commands(first_row):
+    return [
+        ('FONTNAME', (0, first_row), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, first_row), (-1, -1), 9),
+        ('ALIGN', (0, first_row), (0, -1), 'CENTER'),  # S.No. center
+        ('ALIGN', (1, first_row), (-1, -1), 'LEFT'),   # Rest left aligned
+        ('ROWBACKGROUNDS', (0, first_row), (-1, -1), [colors.white, colors.lightgrey]),
+    ]
+
+
+# First chunk carries the column header; later chunks are rows only
+TABLE_STYLE = TableStyle(CELL_COMMANDS + HEADER_COMMANDS + _row_commands(1))
+ROWS_STYLE = TableStyle(CELL_COMMANDS + _row_commands(0))
+HEADER_STYLE_ONLY = TableStyle(CELL_COMMANDS + HEADER_COMMANDS)
+
+
+class CaseRowsMarker(Flowable):
+    """Zero-size flowable telling the doc template whether case rows are flowing"""
+
+    def __init__(self, rows_open):
+        super().__init__()
+        self.rows_open = rows_open
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        pass
+
+
+class CauseListDocTemplate(BaseDocTemplate):
+    """A4 template that redraws the column header at the top of every continuation page"""
+
+    def __init__(self, filename, **kwargs):
+        kwargs.setdefault('pagesize', A4)
+        kwargs.setdefault('topMargin', 0.5*inch)
+        kwargs.setdefault('bottomMargin', 0.5*inch)
+        super().__init__(filename, **kwargs)
+        self.rows_open = False
+
+        # Built per document: flowables keep drawing state, so they aren't shared between threads
+        self.column_header = Table([TABLE_HEADER], colWidths=COL_WIDTHS, style=HEADER_STYLE_ONLY)
+        header_height = self.column_header.wrap(self.width, self.height)[1]
+
+        self.addPageTemplates([
+            PageTemplate('First', [Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id='first')],
+                         autoNextPageTemplate='Later'),
+            PageTemplate('Later', [Frame(self.leftMargin, self.bottomMargin, self.width, self.height - header_height, id='later')],
+                         onPage=self._draw_column_header),
+        ])
+
+    def _draw_column_header(self, canvas, doc):
+        if not self.rows_open:
+            return
+        width, height = self.column_header.wrap(self.width, self.height)
+        self.column_header.drawOn(canvas, self.leftMargin + (self.width - width) / 2,
+                                  self.bottomMargin + self.height - height)
+
+    def afterFlowable(self, flowable):
+        if isinstance(flowable, CaseRowsMarker):
+            self.rows_open = flowable.rows_open
+
+
+class StreamingStory(list):
+    """Flowable list that refills itself from a generator as ReportLab consumes it.
+
+    BaseDocTemplate.build() pops flowables off the front and checks len()
+    before each one, so only a couple of flowables exist at any time.
+    """
+
+    def __init__(self, source, low_water=2):
+        super().__init__()
+        self._source = iter(source)
+        self._low_water = low_water
+
+    def __len__(self):
+        while self._source is not None and list.__len__(self) < self._low_water:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+        return list.__len__(self)
+
+
+def case_row(sr_no, case):
+    """One table row for a case dict"""
+    parties = case.get('parties', f'Party {sr_no} vs Party {sr_no + 1}')
+    if len(parties) > MAX_PARTIES_LENGTH:
+        parties = parties[:MAX_PARTIES_LENGTH - 3] + '...'
+
+    return [
+        str(sr_no),
+        case.get('case_number', f'Case {sr_no}'),
+        parties,
+        case.get('stage', 'For Hearing'),
+        case.get('time', '10:30 AM')
+    ]
+
+
+def iter_story(cases, judge_name, date, chunk_size=ROWS_PER_CHUNK, header=DEFAULT_HEADER):
+    """Yield the cause list flowables, building one table chunk at a time"""
+    # Official Court Header; names come from court websites, so they are escaped for Paragraph markup
+    heading, subheading = header
+    yield Paragraph(escape(heading), HEADER_STYLE)
+    if subheading:
+        yield Paragraph(escape(subheading), SUBHEADER_STYLE)
+    yield Spacer(1, 10)
+
+    # Cause List Title
+    yield Paragraph("CAUSE LIST", HEADER_STYLE)
+    yield Spacer(1, 5)
+
+    # Court and Date Info
+    yield Paragraph(f"Court: {escape(judge_name)}", INFO_STYLE)
+    yield Paragraph(f"Date: {datetime.strptime(date, '%Y-%m-%d').strftime('%d-%m-%Y')}", INFO_STYLE)
+    yield Spacer(1, 15)
+
+    # Cases tables - Court Format, one chunk at a time
+    cases = iter(cases)
+    sr_no = 0
+    while True:
+        chunk = list(islice(cases, chunk_size))
+        if not chunk:
+            break
+
+        if sr_no == 0:
+            yield CaseRowsMarker(True)
+            data = [TABLE_HEADER]
+            style = TABLE_STYLE
+        else:
+            data = []
+            style = ROWS_STYLE
+
+        for case in chunk:
+            sr_no += 1
+            data.append(case_row(sr_no, case))
+
+        yield Table(data, colWidths=COL_WIDTHS, style=style)
+
+    if sr_no:
+        yield CaseRowsMarker(False)
+    else:
+        yield Paragraph("NO CASES LISTED FOR THIS DATE", NO_CASES_STYLE)
+
+    # Footer
+    yield Spacer(1, 30)
+    yield Paragraph(f"Generated on: {datetime.now().strftime('%d-%m-%Y at %H:%M:%S')}", FOOTER_STYLE)
+    yield Paragraph("This is a computer generated cause list", FOOTER_STYLE)
+
+
+def render_cause_list(filepath, cases, judge_name, date, chunk_size=ROWS_PER_CHUNK, header=DEFAULT_HEADER):
+    """Render a cause list PDF from any iterable of case dicts; returns the page count"""
+    doc = CauseListDocTemplate(filepath)
+    doc.build(StreamingStory(iter_story(cases, judge_name, date, chunk_size, header)))
+    return doc.page
+
+
+def row_payload(cases):
+    """Strip case dicts down to the plain table fields before pickling them to a worker"""
+    return [{field: str(case[field]) for field in ROW_FIELDS if case.get(field) is not None} for case in cases]
+
+
+def render_to_file(filepath, rows, judge_name, date, header=DEFAULT_HEADER):
+    """Worker entry point: render one PDF and return (filepath, size in bytes, pages).
+
+    The PDF is written next to its final path and renamed into place, so a
+    concurrent download never sees a half-written file.
+    """
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        pages = render_cause_list(tmp_path, rows, judge_name, date, header=header)
+        os.replace(tmp_path, filepath)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return filepath, os.path.getsize(filepath), pages
+
+
+# Process pool ---------------------------------------------------------------
+
+def _mp_context():
+    # Never fork the threaded web process: a child could inherit a lock held by another thread
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _render_observer(histogram, started):
+    """Future callback recording a finished render's latency and pages"""
+    def observe(future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        histogram.observe(time.perf_counter() - started)
+        PDF_PAGES.inc(future.result()[2])
+    return observe
+
+
+class RenderPool:
+    """Renders cause list PDFs on worker processes, outside the web process's GIL.
+
+    With a single worker, or if the pool can't be started, rendering runs
+    in-process and the returned future is already resolved.
+    """
+
+    def __init__(self, max_workers=DEFAULT_RENDER_WORKERS):
+        self.max_workers = max(1, int(max_workers))
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_mp_context())
+            return self._executor
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, filepath, cases, judge_name, date, header=DEFAULT_HEADER):
+        """Queue one PDF; the future resolves to (filepath, size in bytes, pages)"""
+        rows = row_payload(cases)
+        if self.max_workers > 1:
+            # A worker that died breaks the whole pool, so retry once on a fresh one
+            for attempt in range(2):
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(render_to_file, filepath, rows, judge_name, date, tuple(header))
+                    future.add_done_callback(_render_observer(_render_pool_seconds, time.perf_counter()))
+                    return future
+                except BrokenProcessPool:
+                    logger.warning("PDF render pool broken, restarting it")
+                    self._reset(executor)
+                except (OSError, RuntimeError) as e:
+                    logger.warning(f"PDF render pool unavailable, rendering in-process: {e}")
+                    break
+
+        return self.render_inline(filepath, rows, judge_name, date, header)
+
+    def render_inline(self, filepath, cases, judge_name, date, header=DEFAULT_HEADER):
+        future = Future()
+        future.add_done_callback(_render_observer(_render_inline_seconds, time.perf_counter()))
+        try:
+            future.set_result(render_to_file(filepath, cases, judge_name, date, header))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_render_pools = {}
+_render_pools_lock = threading.Lock()
+
+
+def get_render_pool(max_workers=DEFAULT_RENDER_WORKERS):
+    """Return the process-wide render pool of the given size, creating it on first use"""
+    max_workers = max(1, int(max_workers))
+    with _render_pools_lock:
+        pool = _render_pools.get(max_workers)
+        if pool is None:
+            pool = _render_pools[max_workers] = RenderPool(max_workers)
+        return pool
+
+
+@atexit.register
+def _shutdown_render_pools():
+    for pool in list(_render_pools.values()):
+        pool.shutdown(wait=False)
+
+
+# Output cache ---------------------------------------------------------------
+
+def cause_list_key(rows, judge_name, date, header=DEFAULT_HEADER):
+    """Content hash of a cause list: template version, header, judge, date and normalized case rows"""
+    payload = json.dumps([TEMPLATE_VERSION, list(header), judge_name, date, row_payload(rows)],
+                         sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]
+
+
+class PdfOutputCache:
+    """Content-addressed store of rendered cause lists in downloads/, bounded in size.
+
+    Files are named after the hash of their input, so an identical cause list
+    maps to the same file and is only rendered once. Access time marks use;
+    the least recently used files are removed once the directory outgrows
+    ``max_bytes``.
+    """
+
+    _digest_re = re.compile(r'_([0-9a-f]{24})\.pdf$')
+
+    def __init__(self, directory=DOWNLOADS_DIR, max_bytes=DEFAULT_DOWNLOADS_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._total = None
+        # Last known size of each file counted in _total, so a re-render only adds the difference
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, rows, judge_name, date, header=DEFAULT_HEADER):
+        safe_judge_name = re.sub(r'[^\w\s-]', '', judge_name).replace(' ', '_')
+        filename = f"CauseList_{safe_judge_name}_{date}_{cause_list_key(rows, judge_name, date, header)}.pdf"
+
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, filename)
+
+    def contains(self, path):
+        """Whether ``path`` points inside the downloads directory"""
+        root = os.path.realpath(self.directory)
+        return os.path.commonpath([root, os.path.realpath(path)]) == root
+
+    def etag(self, path):
+        """Content hash of a cached PDF, or None for files that aren't content-addressed"""
+        match = self._digest_re.search(path)
+        return match.group(1) if match else None
+
+    def touch(self, path):
+        """Mark ``path`` as recently used; False if it isn't there"""
+        try:
+            stat = os.stat(path)
+            os.utime(path, (time.time(), stat.st_mtime))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def get(self, path):
+        """Return True if ``path`` is already rendered, marking it as recently used"""
+        if self.touch(path):
+            _cache_hits.inc()
+            return True
+        _cache_misses.inc()
+        return False
+
+    def add(self, path):
+        """Account for a newly rendered (or re-rendered) file and evict old ones if over budget"""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+
+        with self._lock:
+            if self._total is not None:
+                self._total += size - self._sizes.get(path, 0)
+                self._sizes[path] = size
+            if self._total is None or self._total > self.max_bytes:
+                self._evict(keep=path)
+
+    def _evict(self, keep=None):
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith('.pdf'):
+                stat = entry.stat()
+                files.append((stat.st_atime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        sizes = {path: size for _, size, path in files}
+        if total > self.max_bytes:
+            # Trim to 90% so the next few renders don't trigger another scan
+            target = int(self.max_bytes * 0.9)
+            keep = os.path.realpath(keep) if keep else None
+            for _, size, path in sorted(files):
+                if total <= target:
+                    break
+                if os.path.realpath(path) == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                    del sizes[path]
+                except OSError as e:
+                    logger.warning(f"Could not evict {path}: {e}")
+            logger.info(f"Evicted cached PDFs, downloads now {total / 2 ** 20:.1f} MiB")
+        self._total = total
+        self._sizes = sizes
+
+
+pdf_cache = PdfOutputCache(
+    DOWNLOADS_DIR,
+    max_bytes=int(os.environ.get('DOWNLOADS_MAX_BYTES', DEFAULT_DOWNLOADS_MAX_BYTES))
+)
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+eCourts cause list scraper
+Court hierarchy and per-court cause lists from the eCourts services portal, rendered to PDF
+"""
+
+import os
+import re
+import json
+import queue
+import threading
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from http_transport import get_session
+from page_parsers import select_options, table_rows, PageParseError
+from court_hierarchy import CODE_FIELDS, NAME_FIELDS, CourtHierarchy
+from causelist_store import ingest_cause_list
+from causelist_pdf import row_payload, pdf_cache, get_render_pool, DEFAULT_RENDER_WORKERS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FETCH_WORKERS = 8
+
+
+class ECourtsPortal:
+    """Client for the cause list pages of the eCourts services portal.
+
+    The portal answers its dropdown requests with JSON wrapping <option>
+    lists and rotates an ``app_token`` on every reply; the current token is
+    sent back with the next request. A token is only good for the next
+    request of its own session, so each client makes one request at a time
+    and parallel work uses several clients, each with its own session.
+    """
+
+    BASE_URL = 'https://services.ecourts.gov.in/ecourtindia_v6/'
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': 'application/json, text/javascript, */*; q=0.01',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'X-Requested-With': 'XMLHttpRequest',
+        'Referer': 'https://services.ecourts.gov.in/ecourtindia_v6/?p=cause_list/index'
+    }
+
+    _token_re = re.compile(r'app_token\W{1,20}([0-9a-f]{32,})')
+
+    def __init__(self, session_name='ecourts_causelist'):
+        self.session = get_session(session_name, self.HEADERS)
+        self._token = ''
+        # Held for a whole request: the reply carries the token for the next one
+        self._call_lock = threading.RLock()
+
+    def _url(self, page):
+        return f'{self.BASE_URL}?p={page}'
+
+    def _open(self):
+        """GET the cause list page, starting the session and taking its first token"""
+        with self._call_lock:
+            response = self.session.get(self._url('cause_list/index'), timeout=15)
+            response.raise_for_status()
+            match = self._token_re.search(response.text)
+            if match:
+                self._token = match.group(1)
+            return response
+
+    def _post(self, page, data):
+        with self._call_lock:
+            if not self._token:
+                self._open()
+            response = self.session.post(self._url(page), data=dict(data, ajax_req='true', app_token=self._token), timeout=15)
+            response.raise_for_status()
+            reply = json.loads(response.text)
+            # Without a fresh token the session has to start over
+            self._token = reply.get('app_token') or ''
+        if reply.get('errormsg'):
+            raise RuntimeError(reply['errormsg'])
+        return reply
+
+    def _options(self, fragment):
+        """(value, text) of an <option> list, without the 'Select ...' placeholder"""
+        try:
+            selects = select_options(f'<select>{fragment}</select>')
+        except PageParseError as e:
+            logger.error(f"Unreadable option list: {e}")
+            return []
+        options = selects[0][2] if selects else []
+        return [(value, text) for value, text in options if value and value != '0' and text]
+
+    def states(self):
+        response = self._open()
+        for name, element_id, options in select_options(response.content):
+            if 'state' in name.lower() or 'state' in element_id.lower():
+                return [{'state_code': value, 'state_name': text} for value, text in options if value and value != '0' and text]
+        return None
+
+    def districts(self, state_code):
+        reply = self._post('casestatus/fillDistrict', {'state_code': state_code})
+        return [{'district_code': value, 'district_name': text} for value, text in self._options(reply.get('dist_list', ''))]
+
+    def complexes(self, state_code, district_code):
+        reply = self._post('casestatus/fillcomplex', {'state_code': state_code, 'dist_code': district_code})
+        return [{'complex_code': value, 'complex_name': text} for value, text in self._options(reply.get('complex_list', ''))]
+
+    def courts(self, state_code, district_code, complex_code):
+        court_complex_code, est_code = _split_complex_code(complex_code)
+        reply = self._post('cause_list/fillCauseList', {
+            'state_code': state_code,
+            'dist_code': district_code,
+            'court_complex_code': court_complex_code,
+            'est_code': est_code
+        })
+        return [{'court_code': value, 'court_name': text} for value, text in self._options(reply.get('cause_list', ''))]
+
+    def cause_list(self, state_code, district_code, complex_code, court_code, court_name, date, case_type):
+        """HTML table of one court's cause list; ``case_type`` is 'civ' or 'cri'"""
+        court_complex_code, est_code = _split_complex_code(complex_code)
+        reply = self._post('cause_list/submitCauseList', {
+            'CL_court_no': court_code,
+            'causelist_date': datetime.strptime(date, '%Y-%m-%d').strftime('%d-%m-%Y'),
+            'court_name_txt': court_name,
+            'state_code': state_code,
+            'dist_code': district_code,
+            'court_complex_code': court_complex_code,
+            'est_code': est_code,
+            'cicri': case_type,
+            'selprevdays': '0',
+            'cause_list_captcha_code': ''
+        })
+        return reply.get('case_data', '')
+
+    def load(self, level, codes):
+        """CourtHierarchy loader"""
+        return getattr(self, level)(*codes)
+
+
+def board_code(state_code, district_code, complex_code, court_code):
+    """cause_list.court_code of one eCourts court's board"""
+    return f"{state_code}:{district_code}:{complex_code}:{court_code}"
+
+
+def _split_complex_code(complex_code):
+    # Complex options carry their establishments: '<complex>@<est codes>@<flag>'
+    parts = str(complex_code).split('@')
+    return parts[0], parts[1] if len(parts) > 1 else ''
+
+
+_portals = {}
+_hierarchy = None
+_lock = threading.Lock()
+
+
+def get_portal(slot=0):
+    """Process-wide portal client number ``slot``; each slot has its own session and token chain"""
+    with _lock:
+        portal = _portals.get(slot)
+        if portal is None:
+            portal = _portals[slot] = ECourtsPortal('ecourts_causelist' if slot == 0 else f'ecourts_causelist_{slot}')
+        return portal
+
+
+def get_court_hierarchy():
+    """Process-wide court hierarchy, opened on first use"""
+    global _hierarchy
+    if _hierarchy is None:
+        portal = get_portal()
+        with _lock:
+            if _hierarchy is None:
+                _hierarchy = CourtHierarchy(
+                    os.environ.get('COURT_HIERARCHY_PATH', os.path.join('instance', 'court_hierarchy.db')),
+                    portal.load
+                )
+    return _hierarchy
+
+
+class CauseListScraper:
+    """Cause lists of any court on the eCourts portal, by state, district, complex and court"""
+
+    CASE_TYPES = ('civ', 'cri')
+
+    def __init__(self, max_fetch_workers=DEFAULT_FETCH_WORKERS, max_render_workers=DEFAULT_RENDER_WORKERS):
+        self.max_fetch_workers = max(1, int(max_fetch_workers))
+        self.max_render_workers = max(1, int(max_render_workers))
+        self.hierarchy = get_court_hierarchy()
+        self.portal = get_portal()
+
+    def _items(self, level, *codes):
+        node = self.hierarchy.get(level, codes)
+        return node.items if node is not None else []
+
+    def get_states(self):
+        return self._items('states')
+
+    def get_districts(self, state_code):
+        return self._items('districts', state_code)
+
+    def get_court_complexes(self, state_code, district_code):
+        return self._items('complexes', state_code, district_code)
+
+    def get_courts(self, state_code, district_code, complex_code):
+        return self._items('courts', state_code, district_code, complex_code)
+
+    def _name(self, level, codes, code):
+        for item in self._items(level, *codes):
+            if str(item[CODE_FIELDS[level]]) == str(code):
+                return item[NAME_FIELDS[level]]
+        return None
+
+    def court_name(self, state_code, district_code, complex_code, court_code):
+        return self._name('courts', (state_code, district_code, complex_code), court_code) or f"Court {court_code}"
+
+    def header(self, state_code, district_code, complex_code):
+        """PDF heading for a complex: its name, then its district and state"""
+        state = self._name('states', (), state_code)
+        district = self._name('districts', (state_code,), district_code)
+        complex_name = self._name('complexes', (state_code, district_code), complex_code)
+        heading = complex_name or (f"{district} District Courts" if district else 'District Courts')
+        subheading = ', '.join(name for name in (district, state) if name)
+        return heading.upper(), subheading.upper()
+
+    def get_cause_list(self, state_code, district_code, complex_code, court_code, date, court_name='', portal=None):
+        """Civil and criminal cases listed before one court on ``date``, or {'error': ...}"""
+        portal = portal or self.portal
+        try:
+            cases = []
+            for case_type in self.CASE_TYPES:
+                html = portal.cause_list(state_code, district_code, complex_code, court_code,
+                                              court_name, date, case_type)
+                cases.extend(self._parse_cause_list(html))
+            for i, case in enumerate(cases, 1):
+                case['sr_no'] = str(i)
+            return cases
+        except Exception as e:
+            logger.error(f"Error fetching cause list of court {court_code}: {e}")
+            return {'error': f'Could not fetch the cause list of court {court_code}'}
+
+    def _parse_cause_list(self, html):
+        """Cases of a cause list table: Sr No | Case | Parties | Advocate, under stage headings"""
+        if not html:
+            return []
+        cases = []
+        stage = ''
+        for cells in table_rows(html):
+            filled = [cell for cell in cells if cell]
+            if len(filled) == 1:
+                # A full-width row names the stage of the cases below it
+                stage = filled[0]
+            elif len(cells) >= 3 and cells[0].rstrip('.').isdigit():
+                # Positional, so a blank parties or advocate cell doesn't shift the others
+                cases.append({
+                    'case_number': re.sub(r'^View\s*', '', cells[1]),
+                    'parties': cells[2],
+                    'advocate': cells[3] if len(cells) > 3 and cells[3] else None,
+                    'stage': stage,
+                    'time': None
+                })
+        return cases
+
+    def iter_courts_causelist(self, state_code, district_code, complex_code, courts, date, header):
+        """Fetch and render the cause lists of several courts of a complex concurrently.
+
+        Fetches run on ``max_fetch_workers`` threads, each with a portal client
+        of its own so no two requests share an app_token, and PDFs render on
+        the shared render pool while later courts are still being fetched.
+        A result dict is yielded per court as soon as it is finished, in
+        completion order.
+
+        Each board is also ingested into the cause list store and the result
+        carries its change counts, so this must be consumed inside an app
+        context.
+        """
+        workers = min(self.max_fetch_workers, len(courts))
+        portals = queue.Queue()
+        for slot in range(workers):
+            portals.put(get_portal(slot))
+
+        def fetch(court):
+            portal = portals.get()
+            try:
+                return self.get_cause_list(state_code, district_code, complex_code,
+                                           court['court_code'], date, court['court_name'], portal)
+            finally:
+                portals.put(portal)
+
+        fetch_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='causelist-fetch')
+        render_pool = get_render_pool(self.max_render_workers if len(courts) > 1 else 1)
+        pending = {}
+
+        try:
+            for court in courts:
+                pending[fetch_pool.submit(fetch, court)] = ('fetch', court, None)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, court, board = pending.pop(future)
+
+                    if stage == 'fetch':
+                        cases = future.result()
+                        if isinstance(cases, dict):
+                            yield self._court_result(court, [], None, error=cases['error'])
+                            continue
+
+                        changes = self.ingest_board(state_code, district_code, complex_code,
+                                                    court['court_code'], court['court_name'], date, cases)
+
+                        rows = row_payload(cases)
+                        filepath = pdf_cache.path_for(rows, court['court_name'], date, header)
+                        if pdf_cache.get(filepath):
+                            yield self._court_result(court, cases, filepath, changes=changes)
+                            continue
+
+                        render_future = render_pool.submit(filepath, rows, court['court_name'], date, header)
+                        pending[render_future] = ('render', court, (cases, changes))
+                    else:
+                        cases, changes = board
+                        try:
+                            filepath, _, _ = future.result()
+                        except Exception as e:
+                            logger.error(f"Error rendering PDF for {court['court_name']}: {e}")
+                            yield self._court_result(court, cases, None, error=str(e), changes=changes)
+                            continue
+
+                        pdf_cache.add(filepath)
+                        yield self._court_result(court, cases, filepath, changes=changes)
+        finally:
+            fetch_pool.shutdown(wait=False, cancel_futures=True)
+            # The render pool is shared; only drop this run's queued PDFs
+            for future in pending:
+                future.cancel()
+
+    def ingest_board(self, state_code, district_code, complex_code, court_code, court_name, date, cases):
+        """Record what changed on a court's board since the last scrape; None if that fails"""
+        try:
+            summary = ingest_cause_list(board_code(state_code, district_code, complex_code, court_code),
+                                        court_name, date, cases)
+            return {key: summary[key] for key in ('added', 'removed', 'updated')}
+        except Exception as e:
+            logger.error(f"Error storing cause list for {court_name}: {e}")
+            return None
+
+    def _court_result(self, court, cases, filepath, error=None, changes=None):
+        result = {
+            'court_code': court['court_code'],
+            'court_name': court['court_name'],
+            'file_path': filepath,
+            'cases_count': len(cases),
+            'file_size': os.path.getsize(filepath) if filepath and os.path.exists(filepath) else 0
+        }
+        if changes is not None:
+            result['changes'] = changes
+        if error:
+            result['error'] = error
+        return result
+
+    def generate_pdf(self, cases, court_name, date, header):
+        """Render one court's cause list under ``header``, reusing an identical PDF rendered before"""
+        try:
+            rows = row_payload(cases)
+            filepath = pdf_cache.path_for(rows, court_name, date, header)
+            if pdf_cache.get(filepath):
+                return filepath
+
+            get_render_pool(1).render_inline(filepath, rows, court_name, date, header).result()
+            pdf_cache.add(filepath)
+            return filepath
+
+        except Exception as e:
+            logger.error(f"Error generating PDF: {e}")
+            return None
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Incremental cause list ingestion
+Each scrape of a board is diffed against its stored entries and only the changed entries are written and recorded
+"""
+
+import json
+import hashlib
+import logging
+from datetime import datetime
+
+from sqlalchemy import insert, update, delete, select
+
+from models import db, Case, CauseList, CauseListEntry, CauseListChange
+
+logger = logging.getLogger(__name__)
+
+# Fields compared between scrapes; the serial number is left out since
+# inserting one case would otherwise renumber (and "update") every later entry
+ENTRY_FIELDS = ('cnr', 'parties', 'advocate', 'stage', 'time')
+
+CHANGES_PAGE_SIZE = 500
+LOOKUP_LIMIT = 200
+
+# Keep IN (...) lists well under SQLite's bound parameter limit
+IN_CHUNK_SIZE = 500
+
+
+_ingest_callbacks = []
+
+
+def on_entries_ingested(callback):
+    """Register ``callback(cause_list, entries)`` for added or updated entries of an ingested board.
+
+    ``entries`` maps entry_key to the normalized entry. Callbacks run in the
+    ingest transaction, each in its own savepoint, so one failing callback
+    doesn't lose the board.
+    """
+    _ingest_callbacks.append(callback)
+    return callback
+
+
+def _run_ingest_callbacks(cause_list, entries):
+    for callback in _ingest_callbacks:
+        try:
+            with db.session.begin_nested():
+                callback(cause_list, entries)
+        except Exception as e:
+            logger.error(f"Cause list ingest callback {callback.__name__} failed: {e}")
+
+
+def normalize_case_number(case_number):
+    return ' '.join(str(case_number).split()).upper()
+
+
+def normalize_entries(cases):
+    """Key a scraped board by normalized case number.
+
+    Each entry holds its position (``sr_no``), the case number as listed and
+    the comparable ``ENTRY_FIELDS``.
+    """
+    entries = {}
+    for case in cases:
+        case_number = case.get('case_number')
+        if not case_number:
+            continue
+        key = normalize_case_number(case_number)
+        if key in entries:
+            # Listed twice on the same board; keep both, in order
+            n = 2
+            while f"{key}#{n}" in entries:
+                n += 1
+            key = f"{key}#{n}"
+        entry = {field: ' '.join(str(case[field]).split())
+                 for field in ENTRY_FIELDS if case.get(field) is not None}
+        if 'cnr' in entry:
+            entry['cnr'] = entry['cnr'].upper()
+        entry['sr_no'] = len(entries) + 1
+        entry['case_number'] = ' '.join(str(case_number).split())
+        entries[key] = entry
+    return entries
+
+
+def comparable(entry):
+    return {field: entry[field] for field in ENTRY_FIELDS if entry.get(field) is not None}
+
+
+def entries_hash(entries):
+    """Hash of a board's entries in listing order"""
+    payload = json.dumps([[key, entry['case_number'], comparable(entry)] for key, entry in entries.items()],
+                         separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def diff_entries(old, new):
+    """Return (added, removed, updated) between two normalized boards.
+
+    ``updated`` holds (case_number, entry, changed field names).
+    """
+    added = [(key, new[key]) for key in new if key not in old]
+    removed = [(key, old[key]) for key in old if key not in new]
+    updated = []
+    for key, entry in new.items():
+        previous = old.get(key)
+        if previous is None:
+            continue
+        before, after = comparable(previous), comparable(entry)
+        if before != after:
+            fields = sorted(field for field in set(before) | set(after) if before.get(field) != after.get(field))
+            updated.append((key, entry, fields))
+    return added, removed, updated
+
+
+def _chunks(items, size=IN_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _load_entries(cause_list_id):
+    """Stored entries of a board keyed by entry_key, each with its row id"""
+    rows = db.session.execute(
+        select(CauseListEntry.id, CauseListEntry.entry_key, CauseListEntry.sr_no, CauseListEntry.case_number,
+               CauseListEntry.cnr, CauseListEntry.parties, CauseListEntry.advocate, CauseListEntry.stage,
+               CauseListEntry.time)
+        .where(CauseListEntry.cause_list_id == cause_list_id)
+        .order_by(CauseListEntry.sr_no)
+    )
+    entries = {}
+    for row in rows:
+        entry = {field: getattr(row, field) for field in ENTRY_FIELDS if getattr(row, field) is not None}
+        entry.update(id=row.id, sr_no=row.sr_no, case_number=row.case_number)
+        entries[row.entry_key] = entry
+    return entries
+
+
+def _case_ids_by_cnr(cnrs):
+    case_ids = {}
+    for chunk in _chunks(sorted(cnrs)):
+        case_ids.update(db.session.execute(select(Case.cnr, Case.id).where(Case.cnr.in_(chunk))).all())
+    return case_ids
+
+
+def _entry_row(entry, case_ids):
+    return {
+        'sr_no': entry['sr_no'],
+        'case_number': entry['case_number'],
+        'cnr': entry.get('cnr'),
+        'case_id': case_ids.get(entry.get('cnr')),
+        'parties': entry.get('parties'),
+        'advocate': entry.get('advocate'),
+        'stage': entry.get('stage'),
+        'time': entry.get('time')
+    }
+
+
+def ingest_cause_list(court_code, court_name, list_date, cases):
+    """Store a freshly scraped board, writing only what changed since the last scrape.
+
+    ``list_date`` is a date or 'YYYY-MM-DD'. Returns a summary dict with the
+    cause list id and counts of added, removed and updated entries. An
+    unchanged board is detected from its hash without loading its entries.
+    Call inside an app context.
+    """
+    if isinstance(list_date, str):
+        list_date = datetime.strptime(list_date, '%Y-%m-%d').date()
+
+    entries = normalize_entries(cases)
+    content_hash = entries_hash(entries)
+    summary = {'added': 0, 'removed': 0, 'updated': 0}
+
+    cause_list = CauseList.query.filter_by(court_code=court_code, date=list_date).first()
+    if cause_list is not None and cause_list.content_hash == content_hash:
+        return dict(summary, cause_list_id=cause_list.id, changed=False)
+
+    try:
+        if cause_list is None:
+            cause_list = CauseList(court_code=court_code, date=list_date)
+            db.session.add(cause_list)
+            db.session.flush()
+            old_entries = {}
+        else:
+            old_entries = _load_entries(cause_list.id)
+
+        added, removed, updated = diff_entries(old_entries, entries)
+        updated_keys = {key for key, _, _ in updated}
+        case_ids = _case_ids_by_cnr({entry['cnr'] for _, entry in added + [(k, e) for k, e, _ in updated] if entry.get('cnr')})
+
+        # Entries: delete, insert and update only the rows that differ
+        removed_ids = [entry['id'] for _, entry in removed]
+        for chunk in _chunks(removed_ids):
+            db.session.execute(delete(CauseListEntry).where(CauseListEntry.id.in_(chunk)))
+
+        if added:
+            db.session.execute(insert(CauseListEntry), [
+                dict(_entry_row(entry, case_ids), cause_list_id=cause_list.id, date=list_date, entry_key=key)
+                for key, entry in added
+            ])
+
+        # Rows whose fields changed, or that only moved on the board
+        moved = []
+        for key, entry in entries.items():
+            previous = old_entries.get(key)
+            if previous is None:
+                continue
+            if key in updated_keys:
+                moved.append(dict(_entry_row(entry, case_ids), id=previous['id']))
+            elif previous['sr_no'] != entry['sr_no'] or previous['case_number'] != entry['case_number']:
+                moved.append({'id': previous['id'], 'sr_no': entry['sr_no'], 'case_number': entry['case_number']})
+        # Bulk UPDATE by primary key, grouped so each batch sets the same columns
+        for columns in {frozenset(row) for row in moved}:
+            db.session.execute(update(CauseListEntry), [row for row in moved if frozenset(row) == columns])
+
+        if added or updated:
+            _run_ingest_callbacks(cause_list, dict(added + [(key, entry) for key, entry, _ in updated]))
+
+        # Change feed
+        rows = []
+        for key, entry in added:
+            rows.append({'change': 'added', 'case_number': key, 'data': json.dumps(comparable(entry)), 'changed_fields': None})
+        for key, entry in removed:
+            rows.append({'change': 'removed', 'case_number': key, 'data': json.dumps(comparable(entry)), 'changed_fields': None})
+        for key, entry, fields in updated:
+            rows.append({'change': 'updated', 'case_number': key, 'data': json.dumps(comparable(entry)), 'changed_fields': json.dumps(fields)})
+
+        if rows:
+            now = datetime.utcnow()
+            for row in rows:
+                row.update(cause_list_id=cause_list.id, court_code=court_code, date=list_date, created_at=now)
+            db.session.execute(insert(CauseListChange), rows)
+
+        cause_list.court_name = court_name
+        cause_list.total_cases = len(entries)
+        cause_list.data = None
+        cause_list.content_hash = content_hash
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    summary.update(added=len(added), removed=len(removed), updated=len(updated))
+    logger.info(f"Cause list {court_code} {list_date}: +{summary['added']} -{summary['removed']} ~{summary['updated']}")
+    return dict(summary, cause_list_id=cause_list.id, changed=bool(rows))
+
+
+def find_listings(start, end, cnr=None, case_number=None, limit=LOOKUP_LIMIT):
+    """Boards listing a case (by CNR or case number) between two dates, across all courts.
+
+    One indexed query; returns (CauseListEntry, CauseList) pairs by date.
+    """
+    query = db.session.query(CauseListEntry, CauseList).join(CauseList, CauseListEntry.cause_list_id == CauseList.id)
+    if cnr:
+        query = query.filter(CauseListEntry.cnr == cnr.strip().upper())
+    else:
+        query = query.filter(CauseListEntry.entry_key == normalize_case_number(case_number))
+    return (query.filter(CauseListEntry.date.between(start, end))
+            .order_by(CauseListEntry.date, CauseList.court_code)
+            .limit(limit)
+            .all())
+
+
+def listing_to_dict(entry, cause_list):
+    return {
+        'date': entry.date.strftime('%Y-%m-%d'),
+        'court_code': cause_list.court_code,
+        'court_name': cause_list.court_name,
+        'sr_no': entry.sr_no,
+        'case_number': entry.case_number,
+        'cnr': entry.cnr,
+        'case_id': entry.case_id,
+        'parties': entry.parties,
+        'advocate': entry.advocate,
+        'stage': entry.stage,
+        'time': entry.time
+    }
+
+
+def changes_since(since=0, court_code=None, list_date=None, limit=CHANGES_PAGE_SIZE):
+    """Changes recorded after change id ``since``, oldest first, optionally for one board"""
+    query = CauseListChange.query.filter(CauseListChange.id > since)
+    if court_code:
+        query = query.filter(CauseListChange.court_code == court_code)
+    if list_date:
+        query = query.filter(CauseListChange.date == list_date)
+    return query.order_by(CauseListChange.id).limit(limit).all()
+
+
+def change_to_dict(change):
+    return {
+        'id': change.id,
+        'court_code': change.court_code,
+        'date': change.date.strftime('%Y-%m-%d'),
+        'case_number': change.case_number,
+        'change': change.change,
+        'entry': json.loads(change.data or '{}'),
+        'changed_fields': json.loads(change.changed_fields) if change.changed_fields else [],
+        'created_at': change.created_at.strftime('%Y-%m-%d %H:%M:%S') if change.created_at else None
+    }
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Persistent CNR lookup cache for eCourts case data
+SQLite-backed, with per-field TTLs, LRU eviction and stale-while-revalidate refresh
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# How long each top-level field of a case record stays fresh.
+# Party and filing details almost never change; hearing dates change often.
+DEFAULT_FIELD_TTLS = {
+    'case_details': 30 * DAY,
+    'court_details': 7 * DAY,
+    'parties': 30 * DAY,
+    'case_type': 30 * DAY,
+    'under_act': 30 * DAY,
+    'under_section': 30 * DAY,
+    'filing_number': 30 * DAY,
+    'filing_date': 30 * DAY,
+    'petitioner': 30 * DAY,
+    'respondent': 30 * DAY,
+    'court_name': 7 * DAY,
+    'judge_name': 7 * DAY,
+    'case_status': 2 * HOUR,
+    'next_hearing_date': 2 * HOUR,
+}
+
+# Fields that describe the lookup itself rather than the case
+IGNORED_FIELDS = {'cnr', 'source', 'retrieved_at', 'display_format', 'is_real_data', 'note'}
+
+DEFAULT_TTL = DAY
+DEFAULT_MAX_STALE = 7 * DAY
+DEFAULT_MAX_ENTRIES = 50000
+
+# last_access is only rewritten once it is this old, so most hits are read-only
+ACCESS_RESOLUTION = 60
+
+
+class CNRCache:
+    """CNR -> case record cache that survives restarts"""
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, field_ttls=None,
+                 default_ttl=DEFAULT_TTL, max_stale=DEFAULT_MAX_STALE, refresh_workers=2):
+        self.path = path
+        self.max_entries = max_entries
+        self.field_ttls = dict(DEFAULT_FIELD_TTLS, **(field_ttls or {}))
+        self.default_ttl = default_ttl
+        self.max_stale = max_stale
+
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='cnr-refresh')
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS cnr_cache ('
+            ' cnr TEXT PRIMARY KEY,'
+            ' data TEXT NOT NULL,'
+            ' field_times TEXT NOT NULL,'
+            ' last_access REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS ix_cnr_cache_last_access ON cnr_cache (last_access)')
+        self._count = self._conn.execute('SELECT COUNT(*) FROM cnr_cache').fetchone()[0]
+
+    def _ttl(self, field):
+        return self.field_ttls.get(field, self.default_ttl)
+
+    def _overdue(self, field, fetched_at, now):
+        return now - fetched_at - self._ttl(field)
+
+    def _age_state(self, field_times, now):
+        """Return 'fresh', 'stale' (servable while refreshing) or 'expired'"""
+        state = 'fresh'
+        for field, fetched_at in field_times.items():
+            overdue = self._overdue(field, fetched_at, now)
+            if overdue > self.max_stale:
+                return 'expired'
+            if overdue > 0:
+                state = 'stale'
+        return state
+
+    def get(self, cnr):
+        """Return (data, state) where state is 'fresh', 'stale', 'expired' or 'miss'"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data, field_times, last_access FROM cnr_cache WHERE cnr = ?', (cnr,)
+            ).fetchone()
+            if not row:
+                return None, 'miss'
+            # LRU order only needs minute precision; skipping the write keeps hits off the write lock
+            if now - row[2] > ACCESS_RESOLUTION:
+                self._conn.execute('UPDATE cnr_cache SET last_access = ? WHERE cnr = ?', (now, cnr))
+
+        data, field_times = json.loads(row[0]), json.loads(row[1])
+        return data, self._age_state(field_times, now)
+
+    def put(self, cnr, data, merge=False):
+        """Store a freshly fetched case record.
+
+        Every fetched field takes its new value and fetch time. With
+        ``merge``, stored fields missing from the fetch are kept until their
+        own TTL runs out and then dropped, so a field the court site stops
+        sending can't keep the entry stale.
+        """
+        now = time.time()
+        field_times = {field: now for field in data if field not in IGNORED_FIELDS}
+        with self._lock:
+            exists = self._conn.execute('SELECT data, field_times FROM cnr_cache WHERE cnr = ?', (cnr,)).fetchone()
+            if exists and merge:
+                stored, stored_times = json.loads(exists[0]), json.loads(exists[1])
+                kept = {field: fetched_at for field, fetched_at in stored_times.items()
+                        if field not in data and field in stored and self._overdue(field, fetched_at, now) < 0}
+                data = dict({field: stored[field] for field in kept}, **data)
+                field_times.update(kept)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cnr_cache (cnr, data, field_times, last_access) VALUES (?, ?, ?, ?)',
+                (cnr, json.dumps(data), json.dumps(field_times), now)
+            )
+            if not exists:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries down to 90% of capacity (lock held)"""
+        target = int(self.max_entries * 0.9)
+        excess = self._count - target
+        self._conn.execute(
+            'DELETE FROM cnr_cache WHERE cnr IN ('
+            ' SELECT cnr FROM cnr_cache ORDER BY last_access LIMIT ?)',
+            (excess,)
+        )
+        self._count = self._conn.execute('SELECT COUNT(*) FROM cnr_cache').fetchone()[0]
+
+    def invalidate(self, cnr):
+        with self._lock:
+            deleted = self._conn.execute('DELETE FROM cnr_cache WHERE cnr = ?', (cnr,)).rowcount
+            self._count -= deleted
+
+    def lookup(self, cnr, loader, force_refresh=False):
+        """Serve a CNR from cache, falling back to ``loader(cnr)``.
+
+        Stale entries are returned immediately and refreshed in the
+        background. Only records flagged ``is_real_data`` are cached.
+        """
+        if not force_refresh:
+            data, state = self.get(cnr)
+            CACHE_REQUESTS.labels('cnr', state).inc()
+            if state == 'fresh':
+                return data
+            if state == 'stale':
+                self._schedule_refresh(cnr, loader)
+                return data
+
+        data = loader(cnr)
+        self._store_if_cacheable(cnr, data)
+        return data
+
+    def _store_if_cacheable(self, cnr, data, merge=False):
+        if isinstance(data, dict) and data.get('is_real_data') and 'error' not in data:
+            self.put(cnr, data, merge)
+
+    def _schedule_refresh(self, cnr, loader):
+        with self._lock:
+            if cnr in self._refreshing:
+                return
+            self._refreshing.add(cnr)
+        self._refresher.submit(self._refresh, cnr, loader)
+
+    def _refresh(self, cnr, loader):
+        try:
+            # Fields the refetch left out stay until their own TTLs run out
+            self._store_if_cacheable(cnr, loader(cnr), merge=True)
+        except Exception as e:
+            logger.error(f"Background refresh for {cnr} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(cnr)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': self._count, 'max_entries': self.max_entries, 'refreshing': len(self._refreshing)}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cnr_cache():
+    """Process-wide CNR cache, opened on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CNRCache(
+                    os.environ.get('CNR_CACHE_PATH', os.path.join('instance', 'cnr_cache.db')),
+                    max_entries=int(os.environ.get('CNR_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+                )
+    return _cache
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Court directory store for the Delhi Courts scraper
+Court complexes and per-date judge rosters, fetched from the cause list page once per TTL, kept in memory and SQLite
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+
+from metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Complexes hardly ever change; rosters follow transfers and leave
+COMPLEXES_TTL = 6 * HOUR
+ROSTER_TTL = HOUR
+
+# Rosters not refreshed for this long are dropped
+ROSTER_RETENTION = 14 * DAY
+
+_cache_hits = CACHE_REQUESTS.labels('court_directory', 'hit')
+_cache_misses = CACHE_REQUESTS.labels('court_directory', 'miss')
+
+
+class CourtDirectory:
+    """Complex list and judge rosters of one cause list page.
+
+    ``load_page`` callables fetch and parse the page, returning
+    ``{'complexes': [...], 'judges': [...]}`` or None on failure. A parsed
+    page is reused by every lookup while it is younger than the lookup's
+    TTL, so loading the complexes and then a roster costs one fetch. When a
+    fetch fails, the last stored value is served however old it is.
+    """
+
+    def __init__(self, path, complexes_ttl=COMPLEXES_TTL, roster_ttl=ROSTER_TTL):
+        self.path = path
+        self.complexes_ttl = complexes_ttl
+        self.roster_ttl = roster_ttl
+
+        self._memory = {}
+        self._page = None
+        self._lock = threading.Lock()
+        # One page fetch at a time; concurrent lookups wait for it and reuse it
+        self._fetch_lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS court_directory ('
+            ' key TEXT PRIMARY KEY,'
+            ' data TEXT NOT NULL,'
+            ' fetched_at REAL NOT NULL)'
+        )
+
+    def complexes(self, load_page):
+        """Court complexes of the page, or None if they were never loaded"""
+        return self._lookup('complexes', self.complexes_ttl, load_page, 'complexes')
+
+    def judges(self, complex_code, list_date, load_page):
+        """Judge roster of a complex for ``list_date``, or None if it was never loaded"""
+        return self._lookup(f'judges:{complex_code}:{list_date}', self.roster_ttl, load_page, 'judges')
+
+    def _lookup(self, key, ttl, load_page, field):
+        entry = self._memory.get(key)
+        if entry and time.time() - entry[1] < ttl:
+            _cache_hits.inc()
+            return entry[0]
+
+        with self._fetch_lock:
+            entry = self._memory.get(key) or self._load(key)
+            if entry and time.time() - entry[1] < ttl:
+                self._memory[key] = entry
+                _cache_hits.inc()
+                return entry[0]
+
+            _cache_misses.inc()
+            page = self._page
+            if page is None or time.time() - page[1] >= ttl:
+                page = self._page = self._fetch(load_page)
+
+            if page is None:
+                if entry:
+                    logger.warning(f"Court directory: serving stored {key} after a failed refresh")
+                    self._memory[key] = entry
+                    return entry[0]
+                return None
+
+            # Values keep the page's fetch time, so they expire with the page
+            entry = (page[0][field], page[1])
+            self._store(key, entry)
+            return entry[0]
+
+    def _fetch(self, load_page):
+        try:
+            page = load_page()
+        except Exception as e:
+            logger.error(f"Court directory: loading the cause list page failed: {e}")
+            return None
+        return (page, time.time()) if page is not None else None
+
+    def _load(self, key):
+        with self._lock:
+            row = self._conn.execute('SELECT data, fetched_at FROM court_directory WHERE key = ?', (key,)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def _store(self, key, entry):
+        cutoff = time.time() - ROSTER_RETENTION
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO court_directory (key, data, fetched_at) VALUES (?, ?, ?)',
+                (key, json.dumps(entry[0]), entry[1])
+            )
+            self._conn.execute("DELETE FROM court_directory WHERE key LIKE 'judges:%' AND fetched_at < ?", (cutoff,))
+            self._memory = {k: v for k, v in self._memory.items() if v[1] >= cutoff or not k.startswith('judges:')}
+            self._memory[key] = entry
+
+    def clear(self):
+        """Forget everything, so the next lookup fetches the page again"""
+        with self._fetch_lock, self._lock:
+            self._conn.execute('DELETE FROM court_directory')
+            self._memory = {}
+            self._page = None
+
+
+_directory = None
+_directory_lock = threading.Lock()
+
+
+def get_court_directory():
+    """Process-wide court directory, opened on first use"""
+    global _directory
+    if _directory is None:
+        with _directory_lock:
+            if _directory is None:
+                _directory = CourtDirectory(
+                    os.environ.get('COURT_DIRECTORY_PATH', os.path.join('instance', 'court_directory.db'))
+                )
+    return _directory
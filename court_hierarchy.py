@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+State -> district -> complex -> court tree of the eCourts portal
+Loaded lazily one level at a time, persisted in SQLite, served from memory with ETags and refreshed in the background
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Levels from the root down, with the fields holding each item's code and name
+LEVELS = ('states', 'districts', 'complexes', 'courts')
+CODE_FIELDS = {
+    'states': 'state_code',
+    'districts': 'district_code',
+    'complexes': 'complex_code',
+    'courts': 'court_code',
+}
+NAME_FIELDS = {
+    'states': 'state_name',
+    'districts': 'district_name',
+    'complexes': 'complex_name',
+    'courts': 'court_name',
+}
+
+# How long a level stays fresh; stale levels are served while they refresh.
+# States and districts practically never change, court rooms follow postings.
+LEVEL_TTLS = {
+    'states': 30 * DAY,
+    'districts': 30 * DAY,
+    'complexes': 7 * DAY,
+    'courts': DAY,
+}
+
+# Portal codes are short tokens such as '23', '1230001@1,2@N' or '3^12'
+_code_re = re.compile(r'[\w@,^.:-]{1,64}')
+
+_cache_results = {state: CACHE_REQUESTS.labels('court_hierarchy', state) for state in ('hit', 'stale', 'miss')}
+
+
+class HierarchyNode:
+    """The items of one level under one parent, e.g. the districts of a state"""
+
+    __slots__ = ('items', 'etag', 'fetched_at', 'codes')
+
+    def __init__(self, level, items, fetched_at, etag=None):
+        self.items = items
+        self.fetched_at = fetched_at
+        self.etag = etag or hashlib.sha1(json.dumps(items, sort_keys=True).encode()).hexdigest()[:20]
+        self.codes = frozenset(str(item[CODE_FIELDS[level]]) for item in items)
+
+
+class CourtHierarchy:
+    """Court tree backed by ``loader(level, codes)``, which returns a level's items or None on failure.
+
+    ``codes`` are the parent codes, from the state down: () for states,
+    (state,) for districts and so on. Every stored level is kept in memory,
+    so a lookup is a dict access; a level is fetched the first time it is
+    asked for, and again in the background once older than its TTL.
+    """
+
+    def __init__(self, path, loader, ttls=None, refresh_workers=1):
+        self.path = path
+        self.loader = loader
+        self.ttls = dict(LEVEL_TTLS, **(ttls or {}))
+
+        self._nodes = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._refreshing = set()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='hierarchy-refresh')
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS court_hierarchy ('
+            ' level TEXT NOT NULL,'
+            ' parent TEXT NOT NULL,'
+            ' items TEXT NOT NULL,'
+            ' etag TEXT NOT NULL,'
+            ' fetched_at REAL NOT NULL,'
+            ' PRIMARY KEY (level, parent))'
+        )
+        for level, parent, items, etag, fetched_at in self._conn.execute(
+            'SELECT level, parent, items, etag, fetched_at FROM court_hierarchy'
+        ):
+            if level in CODE_FIELDS:
+                codes = tuple(parent.split('/')) if parent else ()
+                self._nodes[(level, codes)] = HierarchyNode(level, json.loads(items), fetched_at, etag)
+
+    def get(self, level, codes=()):
+        """The node of ``level`` under parent ``codes``, or None if it can't be loaded.
+
+        Raises ValueError for a malformed code or one its parent level doesn't list.
+        """
+        codes = tuple(str(code) for code in codes)
+        depth = LEVELS.index(level)
+        if len(codes) != depth:
+            raise ValueError(f"{level} takes {depth} parent codes")
+        for code in codes:
+            if not _code_re.fullmatch(code):
+                raise ValueError(f"Invalid code: {code!r}")
+
+        key = (level, codes)
+        node = self._nodes.get(key)
+        if node is not None:
+            if time.time() - node.fetched_at < self.ttls[level]:
+                _cache_results['hit'].inc()
+            else:
+                _cache_results['stale'].inc()
+                self._schedule_refresh(key)
+            return node
+
+        # Lazily load the parent first, so unknown codes never reach the portal
+        if depth:
+            parent = self.get(LEVELS[depth - 1], codes[:-1])
+            if parent is not None and codes[-1] not in parent.codes:
+                raise ValueError(f"Unknown {CODE_FIELDS[LEVELS[depth - 1]]}: {codes[-1]}")
+
+        with self._key_lock(key):
+            node = self._nodes.get(key)
+            if node is None:
+                _cache_results['miss'].inc()
+                node = self._fetch(key)
+            return node
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _fetch(self, key):
+        level, codes = key
+        try:
+            items = self.loader(level, codes)
+        except Exception as e:
+            logger.error(f"Loading {level} {'/'.join(codes)} failed: {e}")
+            items = None
+        if items is None:
+            return None
+
+        node = HierarchyNode(level, items, time.time())
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO court_hierarchy (level, parent, items, etag, fetched_at) VALUES (?, ?, ?, ?, ?)',
+                (level, '/'.join(codes), json.dumps(items), node.etag, node.fetched_at)
+            )
+            self._nodes[key] = node
+        return node
+
+    def _schedule_refresh(self, key):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._refresher.submit(self._refresh, key)
+
+    def _refresh(self, key):
+        try:
+            with self._key_lock(key):
+                # A failed refresh keeps serving the stored level
+                self._fetch(key)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def stored(self, level):
+        """Every stored node of ``level`` as (parent codes, items), without loading anything"""
+        with self._lock:
+            return [(codes, node.items) for (node_level, codes), node in self._nodes.items() if node_level == level]
+
+    def invalidate(self, level=None):
+        """Drop stored levels (all of them, or one level everywhere) so they are fetched again"""
+        with self._lock:
+            if level is None:
+                self._conn.execute('DELETE FROM court_hierarchy')
+                self._nodes.clear()
+            else:
+                self._conn.execute('DELETE FROM court_hierarchy WHERE level = ?', (level,))
+                self._nodes = {key: node for key, node in self._nodes.items() if key[0] != level}
+
+    def stats(self):
+        with self._lock:
+            counts = {level: 0 for level in LEVELS}
+            for level, _ in self._nodes:
+                counts[level] += 1
+            return {'nodes': counts, 'refreshing': len(self._refreshing)}
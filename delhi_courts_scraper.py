@@ -4,28 +4,38 @@ REAL Delhi Courts Cause List Scraper
 Scrapes actual data from https://newdelhi.dcourts.gov.in/
 """
 
-import requests
 from bs4 import BeautifulSoup
-import json
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import os
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
 import logging
 import re
 
+from http_transport import get_session
+from page_parsers import select_options, page_text, PageParseError
+from court_directory import get_court_directory
+from causelist_pdf import row_payload, pdf_cache, get_render_pool, DEFAULT_RENDER_WORKERS
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Default fetch pool size for the multi-judge pipeline; render workers default to one per core
+DEFAULT_FETCH_WORKERS = 8
+
+# Judge names in various possible formats, tried in order
+JUDGE_PATTERNS = [
+    re.compile(r'(?:Hon\'ble\s+)?(?:Sh\.|Smt\.|Ms\.)?\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)'),
+    re.compile(r'Judge\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)'),
+    re.compile(r'Court\s+of\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)')
+]
+MAX_JUDGES = 10
+
 class DelhiCourtsRealScraper:
-    def __init__(self):
+    def __init__(self, max_fetch_workers=DEFAULT_FETCH_WORKERS, max_render_workers=DEFAULT_RENDER_WORKERS):
+        self.max_fetch_workers = max(1, int(max_fetch_workers))
+        self.max_render_workers = max(1, int(max_render_workers))
         self.base_url = "https://newdelhi.dcourts.gov.in"
         self.causelist_url = "https://newdelhi.dcourts.gov.in/cause-list-%e2%81%84-daily-board/"
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = get_session('dcourts', {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9',
@@ -33,92 +43,120 @@ class DelhiCourtsRealScraper:
             'Connection': 'keep-alive',
             'Referer': 'https://newdelhi.dcourts.gov.in/'
         })
+        self.directory = get_court_directory()
 
     def get_court_complexes(self):
-        """Get available court complexes from Delhi Courts"""
-        try:
-            response = self.session.get(self.causelist_url, timeout=15)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Look for court selection dropdown or links
-                court_options = []
-                
-                # Try to find court selection elements
-                selects = soup.find_all('select')
-                for select in selects:
-                    if 'court' in select.get('name', '').lower() or 'court' in select.get('id', '').lower():
-                        options = select.find_all('option')
-                        for option in options:
-                            if option.get('value') and option.text.strip():
-                                court_options.append({
-                                    'complex_code': option.get('value'),
-                                    'complex_name': option.text.strip()
-                                })
-                
-                # If no dropdown found, return default Delhi court complexes
-                if not court_options:
-                    court_options = [
-                        {'complex_code': 'NDC', 'complex_name': 'New Delhi Courts Complex'},
-                        {'complex_code': 'CDC', 'complex_name': 'Central Delhi Courts'},
-                        {'complex_code': 'EDC', 'complex_name': 'East Delhi Courts'},
-                        {'complex_code': 'WDC', 'complex_name': 'West Delhi Courts'},
-                        {'complex_code': 'SDC', 'complex_name': 'South Delhi Courts'},
-                        {'complex_code': 'NDDC', 'complex_name': 'North Delhi Courts'}
-                    ]
-                
-                return court_options
-                
-        except Exception as e:
-            logger.error(f"Error fetching court complexes: {e}")
-            return []
+        """Get available court complexes from Delhi Courts, through the court directory"""
+        return self.directory.complexes(self.fetch_causelist_page) or []
 
     def get_judges_list(self, complex_code, date):
-        """Get list of judges for a court complex on specific date"""
+        """Get list of judges for a court complex on specific date, through the court directory"""
+        return self.directory.judges(complex_code, date, self.fetch_causelist_page) or []
+
+    def fetch_causelist_page(self):
+        """Fetch the cause list page and parse its complexes and judges; None on failure"""
         try:
-            # Try to get the cause list page
             response = self.session.get(self.causelist_url, timeout=15)
             if response.status_code != 200:
-                return []
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            judges = []
+                logger.error(f"Cause list page returned HTTP {response.status_code}")
+                return None
             
-            # Look for judge names in various possible formats
-            judge_patterns = [
-                r'(?:Hon\'ble\s+)?(?:Sh\.|Smt\.|Ms\.)?\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-                r'Judge\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-                r'Court\s+of\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)'
-            ]
-            
-            # Search in all text content
-            page_text = soup.get_text()
-            for pattern in judge_patterns:
-                matches = re.findall(pattern, page_text)
-                for match in matches:
-                    if len(match.split()) >= 2:  # At least first and last name
-                        judges.append({
-                            'judge_code': f"J{len(judges)+1:02d}",
-                            'judge_name': f"Hon'ble {match}",
-                            'court_room': f"Court Room {len(judges)+1}"
-                        })
-            
-            # If no judges found from scraping, return default Delhi judges
-            if not judges:
-                judges = [
-                    {'judge_code': 'J01', 'judge_name': 'Hon\'ble Sh. Rajesh Kumar', 'court_room': 'Court Room 1'},
-                    {'judge_code': 'J02', 'judge_name': 'Hon\'ble Smt. Priya Sharma', 'court_room': 'Court Room 2'},
-                    {'judge_code': 'J03', 'judge_name': 'Hon\'ble Sh. Amit Singh', 'court_room': 'Court Room 3'},
-                    {'judge_code': 'J04', 'judge_name': 'Hon\'ble Ms. Neha Gupta', 'court_room': 'Court Room 4'},
-                    {'judge_code': 'J05', 'judge_name': 'Hon\'ble Sh. Vikram Jain', 'court_room': 'Court Room 5'},
-                    {'judge_code': 'J06', 'judge_name': 'Hon\'ble Smt. Kavita Mehta', 'court_room': 'Court Room 6'}
-                ]
-            
-            return judges[:10]  # Limit to 10 judges
+            return {
+                'complexes': self._parse_court_complexes(response.content),
+                'judges': self._parse_judges(response.content)
+            }
             
         except Exception as e:
-            logger.error(f"Error fetching judges list: {e}")
-            return []
+            logger.error(f"Error fetching cause list page: {e}")
+            return None
+
+    def _parse_court_complexes(self, content):
+        """Court complexes listed on the cause list page"""
+        # Look for court selection dropdown or links
+        court_options = []
+        
+        # Try to find court selection elements
+        for name, element_id, options in self._select_options(content):
+            if 'court' in name.lower() or 'court' in element_id.lower():
+                for value, text in options:
+                    if value and text:
+                        court_options.append({
+                            'complex_code': value,
+                            'complex_name': text
+                        })
+        
+        # If no dropdown found, return default Delhi court complexes
+        if not court_options:
+            court_options = [
+                {'complex_code': 'NDC', 'complex_name': 'New Delhi Courts Complex'},
+                {'complex_code': 'CDC', 'complex_name': 'Central Delhi Courts'},
+                {'complex_code': 'EDC', 'complex_name': 'East Delhi Courts'},
+                {'complex_code': 'WDC', 'complex_name': 'West Delhi Courts'},
+                {'complex_code': 'SDC', 'complex_name': 'South Delhi Courts'},
+                {'complex_code': 'NDDC', 'complex_name': 'North Delhi Courts'}
+            ]
+        
+        return court_options
+
+    def _parse_judges(self, content):
+        """Judges named on the cause list page"""
+        judges = []
+        
+        # Search in all text content; only the first MAX_JUDGES names are kept
+        text_content = self._page_text(content)
+        for pattern in JUDGE_PATTERNS:
+            for match in pattern.finditer(text_content):
+                name = match.group(1)
+                if len(name.split()) >= 2:  # At least first and last name
+                    judges.append({
+                        'judge_code': f"J{len(judges)+1:02d}",
+                        'judge_name': f"Hon'ble {name}",
+                        'court_room': f"Court Room {len(judges)+1}"
+                    })
+                    if len(judges) == MAX_JUDGES:
+                        break
+            if len(judges) == MAX_JUDGES:
+                break
+        
+        # If no judges found from scraping, return default Delhi judges
+        if not judges:
+            judges = [
+                {'judge_code': 'J01', 'judge_name': 'Hon\'ble Sh. Rajesh Kumar', 'court_room': 'Court Room 1'},
+                {'judge_code': 'J02', 'judge_name': 'Hon\'ble Smt. Priya Sharma', 'court_room': 'Court Room 2'},
+                {'judge_code': 'J03', 'judge_name': 'Hon\'ble Sh. Amit Singh', 'court_room': 'Court Room 3'},
+                {'judge_code': 'J04', 'judge_name': 'Hon\'ble Ms. Neha Gupta', 'court_room': 'Court Room 4'},
+                {'judge_code': 'J05', 'judge_name': 'Hon\'ble Sh. Vikram Jain', 'court_room': 'Court Room 5'},
+                {'judge_code': 'J06', 'judge_name': 'Hon\'ble Smt. Kavita Mehta', 'court_room': 'Court Room 6'}
+            ]
+        
+        return judges
+
+    def _select_options(self, content):
+        """(name, id, options) of every <select> on a page, falling back to BeautifulSoup"""
+        try:
+            selects = select_options(content)
+            if selects:
+                return selects
+        except PageParseError as e:
+            logger.debug(f"Fast parse failed, using BeautifulSoup: {e}")
+        
+        soup = BeautifulSoup(content, 'html.parser')
+        return [
+            (select.get('name', ''), select.get('id', ''),
+             [(option.get('value'), option.text.strip()) for option in select.find_all('option')])
+            for select in soup.find_all('select')
+        ]
+
+    def _page_text(self, content):
+        """Text content of a page, falling back to BeautifulSoup"""
+        try:
+            text = page_text(content)
+            if text.strip():
+                return text
+        except PageParseError as e:
+            logger.debug(f"Fast parse failed, using BeautifulSoup: {e}")
+        
+        return BeautifulSoup(content, 'html.parser').get_text()
 
     def scrape_cause_list(self, judge_code, date):
         """Get real case data from database for cause list"""
@@ -128,8 +166,8 @@ class DelhiCourtsRealScraper:
             import os
             sys.path.append(os.path.dirname(os.path.abspath(__file__)))
             
-            from models import Case
-            from datetime import datetime, timedelta
+            from case_queries import cases_hearing_around, recent_cases
+            from datetime import datetime
             
             # Get cases from database
             cases = []
@@ -142,24 +180,19 @@ class DelhiCourtsRealScraper:
                     selected_date = datetime.strptime(date, '%Y-%m-%d').date()
                     
                     # Get cases with next hearing on selected date or nearby dates
-                    db_cases = Case.query.filter(
-                        Case.next_hearing_date.between(
-                            selected_date - timedelta(days=2),
-                            selected_date + timedelta(days=2)
-                        )
-                    ).limit(15).all()
+                    db_cases = cases_hearing_around(selected_date, days=2).limit(15).all()
                     
                     # If no cases found for that date range, get recent cases
                     if not db_cases:
-                        db_cases = Case.query.order_by(Case.updated_at.desc()).limit(12).all()
+                        db_cases = recent_cases().limit(12).all()
                     
                     for i, case in enumerate(db_cases, 1):
                         # Create realistic court case entry using actual database fields
                         case_number = f"{case.case_type or 'CC'} {case.case_number or case.id}/2024"
                         
-                        # Extract parties from case_title or create from CNR
-                        if hasattr(case, 'case_title') and case.case_title:
-                            parties = case.case_title
+                        # Use the stored parties, or create generic names
+                        if case.parties:
+                            parties = case.parties
                         else:
                             # Create parties from CNR or generic names
                             parties = f"Petitioner {case.id} vs Respondent {case.id}"
@@ -205,145 +238,14 @@ class DelhiCourtsRealScraper:
     def generate_pdf(self, cases, judge_name, court_room, date):
         """Generate PDF matching actual court cause list format"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            safe_judge_name = re.sub(r'[^\w\s-]', '', judge_name).replace(' ', '_')
-            filename = f"CauseList_{safe_judge_name}_{date}_{timestamp}.pdf"
-            
-            os.makedirs('downloads', exist_ok=True)
-            filepath = os.path.join('downloads', filename)
-            
-            doc = SimpleDocTemplate(filepath, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
-            styles = getSampleStyleSheet()
-            story = []
-            
-            # Court Header - Official Format
-            header_style = ParagraphStyle(
-                'CourtHeader',
-                parent=styles['Normal'],
-                fontSize=14,
-                spaceAfter=5,
-                alignment=1,
-                fontName='Helvetica-Bold'
-            )
-            
-            subheader_style = ParagraphStyle(
-                'SubHeader',
-                parent=styles['Normal'],
-                fontSize=12,
-                spaceAfter=3,
-                alignment=1,
-                fontName='Helvetica'
-            )
-            
-            # Official Court Header
-            story.append(Paragraph("DELHI DISTRICT COURTS", header_style))
-            story.append(Paragraph("NEW DELHI", subheader_style))
-            story.append(Spacer(1, 10))
-            
-            # Cause List Title
-            story.append(Paragraph("CAUSE LIST", header_style))
-            story.append(Spacer(1, 5))
-            
-            # Court and Date Info
-            info_style = ParagraphStyle(
-                'InfoStyle',
-                parent=styles['Normal'],
-                fontSize=11,
-                spaceAfter=3,
-                alignment=1,
-                fontName='Helvetica-Bold'
-            )
-            
-            story.append(Paragraph(f"Court: {judge_name}", info_style))
-            story.append(Paragraph(f"Date: {datetime.strptime(date, '%Y-%m-%d').strftime('%d-%m-%Y')}", info_style))
-            story.append(Spacer(1, 15))
-            
-            # Cases table - Court Format
-            if cases:
-                # Table header
-                data = [[
-                    'S.No.',
-                    'Case Number',
-                    'Parties Name',
-                    'Purpose/Stage',
-                    'Time'
-                ]]
-                
-                # Add cases
-                for i, case in enumerate(cases[:25], 1):  # Limit to 25 cases
-                    case_no = case.get('case_number', f'Case {i}')
-                    parties = case.get('parties', f'Party {i} vs Party {i+1}')
-                    stage = case.get('stage', 'For Hearing')
-                    time = case.get('time', '10:30 AM')
-                    
-                    # Truncate long party names
-                    if len(parties) > 35:
-                        parties = parties[:32] + '...'
-                    
-                    data.append([
-                        str(i),
-                        case_no,
-                        parties,
-                        stage,
-                        time
-                    ])
-                
-                # Create table with proper court formatting
-                table = Table(data, colWidths=[0.6*inch, 1.8*inch, 3*inch, 1.8*inch, 0.8*inch])
-                table.setStyle(TableStyle([
-                    # Header styling
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.black),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    
-                    # Data rows styling
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 9),
-                    ('ALIGN', (0, 1), (0, -1), 'CENTER'),  # S.No. center
-                    ('ALIGN', (1, 1), (-1, -1), 'LEFT'),   # Rest left aligned
-                    
-                    # Borders
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('LINEBELOW', (0, 0), (-1, 0), 2, colors.black),
-                    
-                    # Alternating row colors
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-                    
-                    # Padding
-                    ('TOPPADDING', (0, 0), (-1, -1), 6),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 4),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-                ]))
-                
-                story.append(table)
-            else:
-                no_cases_style = ParagraphStyle(
-                    'NoCases',
-                    parent=styles['Normal'],
-                    fontSize=12,
-                    alignment=1,
-                    fontName='Helvetica-Bold'
-                )
-                story.append(Paragraph("NO CASES LISTED FOR THIS DATE", no_cases_style))
-            
-            # Footer
-            story.append(Spacer(1, 30))
-            footer_style = ParagraphStyle(
-                'Footer',
-                parent=styles['Normal'],
-                fontSize=8,
-                alignment=1,
-                fontName='Helvetica'
-            )
-            
-            story.append(Paragraph(f"Generated on: {datetime.now().strftime('%d-%m-%Y at %H:%M:%S')}", footer_style))
-            story.append(Paragraph("This is a computer generated cause list", footer_style))
-            
-            doc.build(story)
+            rows = row_payload(cases)
+            filepath = pdf_cache.path_for(rows, judge_name, date)
+            if pdf_cache.get(filepath):
+                return filepath
+            
+            # Cases are rendered in chunks, so long boards are no longer truncated
+            get_render_pool(1).render_inline(filepath, rows, judge_name, date).result()
+            pdf_cache.add(filepath)
             return filepath
             
         except Exception as e:
@@ -359,33 +261,20 @@ class DelhiCourtsRealScraper:
             if not judges:
                 return {'error': 'No judges found for this court complex'}
             
-            generated_files = []
+            # Collect results as they finish, then restore the judge order
+            results = list(self.iter_judges_causelist(judges, date, complex_code))
+            results.sort(key=lambda r: r['judge_index'])
             
-            for i, judge in enumerate(judges):
-                judge_code = judge['judge_code']
-                judge_name = judge['judge_name']
-                court_room = judge['court_room']
-                
-                logger.info(f"Generating cause list for {judge_name}")
-                
-                # Get different cases for each judge
-                judge_cases = self.get_judge_specific_cases(judge_code, date, i)
-                
-                # Re-number cases for this judge
-                for j, case in enumerate(judge_cases, 1):
-                    case['sr_no'] = str(j)
-                
-                # Generate PDF
-                pdf_path = self.generate_pdf(judge_cases, judge_name, court_room, date)
-                if pdf_path:
+            generated_files = []
+            for result in results:
+                if result.get('file_path'):
                     generated_files.append({
-                        'judge_name': judge_name,
-                        'court_room': court_room,
-                        'file_path': pdf_path,
-                        'cases_count': len(judge_cases),
-                        'file_size': os.path.getsize(pdf_path) if os.path.exists(pdf_path) else 0
+                        'judge_name': result['judge_name'],
+                        'court_room': result['court_room'],
+                        'file_path': result['file_path'],
+                        'cases_count': result['cases_count'],
+                        'file_size': result['file_size']
                     })
-                    logger.info(f"Generated PDF for {judge_name} with {len(judge_cases)} cases")
             
             return {
                 'success': True,
@@ -397,13 +286,112 @@ class DelhiCourtsRealScraper:
         except Exception as e:
             logger.error(f"Error downloading cause lists: {e}")
             return {'error': str(e)}
+
+    def iter_judges_causelist(self, judges, date, complex_code=None):
+        """Fetch and render cause lists for several judges concurrently.
+
+        Case fetching runs on a pool of ``max_fetch_workers`` threads and PDF
+        rendering on a shared pool of ``max_render_workers`` processes, so
+        ReportLab's CPU-bound work spreads across cores and one judge's PDF can
+        be rendered while the next judge's cases are still being fetched. A
+        single judge is rendered in-process. Per-judge result dicts are yielded
+        as soon as each judge's PDF is ready, in completion order.
+
+        With ``complex_code``, each judge's board is also ingested into the
+        cause list store and the result carries its change counts. Must then
+        be consumed inside an app context.
+        """
+        fetch_pool = ThreadPoolExecutor(max_workers=self.max_fetch_workers, thread_name_prefix='causelist-fetch')
+        render_pool = get_render_pool(self.max_render_workers if len(judges) > 1 else 1)
+        pending = {}
+        
+        try:
+            for i, judge in enumerate(judges):
+                future = fetch_pool.submit(self.get_judge_specific_cases, judge['judge_code'], date, i)
+                pending[future] = ('fetch', i, judge)
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, i, judge = pending.pop(future)
+                    
+                    if stage == 'fetch':
+                        try:
+                            judge_cases = future.result()
+                        except Exception as e:
+                            logger.error(f"Error fetching cases for {judge['judge_name']}: {e}")
+                            yield self._judge_result(i, judge, [], None, error=str(e))
+                            continue
+                        
+                        # Re-number cases for this judge
+                        for j, case in enumerate(judge_cases, 1):
+                            case['sr_no'] = str(j)
+                        
+                        changes = self._ingest_board(complex_code, judge, date, judge_cases) if complex_code else None
+                        
+                        # Identical cause lists were already rendered; reuse the file
+                        rows = row_payload(judge_cases)
+                        pdf_path = pdf_cache.path_for(rows, judge['judge_name'], date)
+                        if pdf_cache.get(pdf_path):
+                            yield self._judge_result(i, judge, judge_cases, pdf_path, changes=changes)
+                            continue
+                        
+                        render_future = render_pool.submit(pdf_path, rows, judge['judge_name'], date)
+                        pending[render_future] = ('render', i, (judge, judge_cases, changes))
+                    else:
+                        judge, judge_cases, changes = judge
+                        try:
+                            pdf_path, _, _ = future.result()
+                        except Exception as e:
+                            logger.error(f"Error rendering PDF for {judge['judge_name']}: {e}")
+                            yield self._judge_result(i, judge, judge_cases, None, error=str(e), changes=changes)
+                            continue
+                        
+                        pdf_cache.add(pdf_path)
+                        logger.info(f"Generated PDF for {judge['judge_name']} with {len(judge_cases)} cases")
+                        yield self._judge_result(i, judge, judge_cases, pdf_path, changes=changes)
+        finally:
+            fetch_pool.shutdown(wait=False, cancel_futures=True)
+            # The render pool is shared; only drop this run's queued PDFs
+            for future in pending:
+                future.cancel()
+
+    def _ingest_board(self, complex_code, judge, date, judge_cases):
+        """Record what changed on a judge's board since the last scrape; None if that fails"""
+        try:
+            from causelist_store import ingest_cause_list
+            summary = ingest_cause_list(
+                f"{complex_code}:{judge['judge_code']}",
+                f"{judge['court_room']} - {judge['judge_name']}",
+                date,
+                judge_cases
+            )
+            return {key: summary[key] for key in ('added', 'removed', 'updated')}
+        except Exception as e:
+            logger.error(f"Error storing cause list for {judge['judge_name']}: {e}")
+            return None
+
+    def _judge_result(self, judge_index, judge, judge_cases, pdf_path, error=None, changes=None):
+        """Build the per-judge result dict yielded by iter_judges_causelist"""
+        result = {
+            'judge_index': judge_index,
+            'judge_code': judge['judge_code'],
+            'judge_name': judge['judge_name'],
+            'court_room': judge['court_room'],
+            'file_path': pdf_path,
+            'cases_count': len(judge_cases),
+            'file_size': os.path.getsize(pdf_path) if pdf_path and os.path.exists(pdf_path) else 0
+        }
+        if changes is not None:
+            result['changes'] = changes
+        if error:
+            result['error'] = error
+        return result
     
     def get_judge_specific_cases(self, judge_code, date, judge_index):
         """Get different cases for each judge"""
         try:
             from models import Case
-            from datetime import datetime, timedelta
-            import random
             
             # Import here to avoid circular imports
             import sys
@@ -444,8 +432,8 @@ class DelhiCourtsRealScraper:
                         for i, case in enumerate(db_cases):
                             case_number = f"{case.case_type or 'CC'} {case.case_number or case.id}/2024"
                             
-                            if hasattr(case, 'case_title') and case.case_title:
-                                parties = case.case_title
+                            if case.parties:
+                                parties = case.parties
                             else:
                                 parties = f"Case {case.id} Petitioner vs Case {case.id} Respondent"
                             
@@ -462,6 +450,7 @@ class DelhiCourtsRealScraper:
                             cases.append({
                                 'sr_no': str(i + 1),
                                 'case_number': case_number,
+                                'cnr': case.cnr,
                                 'parties': parties,
                                 'stage': stage,
                                 'time': time
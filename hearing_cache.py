@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Shared cache of hearing aggregates used by both dashboards and /api/live-hearings
+Each (date, scope) entry is computed once per refresh window and dropped when case hearing dates change
+"""
+
+import time
+import threading
+import logging
+from datetime import date
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from models import Case
+from metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+REFRESH_WINDOW = 300
+
+_cache_hits = CACHE_REQUESTS.labels('hearings', 'hit')
+_cache_misses = CACHE_REQUESTS.labels('hearings', 'miss')
+
+
+class HearingAggregateCache:
+    """(date, scope) -> hearing list, recomputed at most once per refresh window"""
+
+    def __init__(self, refresh_window=REFRESH_WINDOW):
+        self.refresh_window = refresh_window
+        self.entries = {}
+        self.key_locks = {}
+        self.lock = threading.Lock()
+        self.generation = 0
+
+    def _key_lock(self, key):
+        with self.lock:
+            return self.key_locks.setdefault(key, threading.Lock())
+
+    def get(self, key, compute):
+        entry = self.entries.get(key)
+        if entry and time.monotonic() - entry[1] < self.refresh_window:
+            _cache_hits.inc()
+            return entry[0]
+
+        # Only one thread computes a given key; the others wait and reuse it
+        with self._key_lock(key):
+            entry = self.entries.get(key)
+            if entry and time.monotonic() - entry[1] < self.refresh_window:
+                _cache_hits.inc()
+                return entry[0]
+
+            _cache_misses.inc()
+
+            generation = self.generation
+            value = compute()
+            with self.lock:
+                # Don't store a value computed across an invalidation
+                if generation == self.generation:
+                    self.entries[key] = (value, time.monotonic())
+            return value
+
+    def invalidate(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+
+hearing_cache = HearingAggregateCache()
+
+
+def get_hearings(scope, days=7):
+    """Hearing list for scope 'today', 'tomorrow' or 'upcoming' (next ``days`` days)"""
+    from live_hearings_api import LiveHearingsAPI
+
+    if scope == 'upcoming':
+        key = (date.today(), f'upcoming:{days}')
+        compute = lambda: LiveHearingsAPI().get_upcoming_hearings(days)
+    elif scope == 'tomorrow':
+        key = (date.today(), 'tomorrow')
+        compute = lambda: LiveHearingsAPI().get_tomorrow_hearings()
+    else:
+        key = (date.today(), 'today')
+        compute = lambda: LiveHearingsAPI().get_today_hearings()
+
+    return hearing_cache.get(key, compute)
+
+
+def hearing_totals(days=7):
+    """Today / tomorrow / upcoming hearing counts for the dashboard stat cards"""
+    return {
+        'today_cases': get_hearings('today').get('total', 0),
+        'tomorrow_cases': get_hearings('tomorrow').get('total', 0),
+        'upcoming_cases': get_hearings('upcoming', days).get('total', 0)
+    }
+
+
+# Invalidation -------------------------------------------------------------
+
+_invalidation_callbacks = [hearing_cache.invalidate]
+
+
+def on_hearing_dates_changed(callback):
+    """Register another callback to run after a commit that changed hearing dates"""
+    _invalidation_callbacks.append(callback)
+    return callback
+
+
+def _hearing_date_changed(session):
+    for obj in session.new:
+        if isinstance(obj, Case) and obj.next_hearing_date is not None:
+            return True
+    for obj in session.deleted:
+        if isinstance(obj, Case):
+            return True
+    for obj in session.dirty:
+        if isinstance(obj, Case) and inspect(obj).attrs.next_hearing_date.history.has_changes():
+            return True
+    return False
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_hearing_changes(session, flush_context, instances):
+    if _hearing_date_changed(session):
+        session.info['hearing_dates_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('hearing_dates_changed', False):
+        for callback in _invalidation_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Hearing cache invalidation failed: {e}")
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('hearing_dates_changed', None)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP transport for the eCourts and Delhi Courts scrapers
+Process-wide pooled sessions with retries, per-host rate limiting and circuit breakers
+"""
+
+import time
+import random
+import threading
+import logging
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import UPSTREAM_DURATION, UPSTREAM_THROTTLE, UPSTREAM_REQUESTS, upstream_outcome
+
+logger = logging.getLogger(__name__)
+
+# Connection pool sizing: number of hosts kept warm and connections per host
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 32
+
+DEFAULT_TIMEOUT = 15
+
+# Requests per second and burst size allowed per host
+DEFAULT_RATE_LIMIT = (5.0, 10)
+HOST_RATE_LIMITS = {
+    'services.ecourts.gov.in': (3.0, 6),
+    'ecourts.gov.in': (3.0, 6),
+    'main.ecourts.gov.in': (3.0, 6),
+    'newdelhi.dcourts.gov.in': (2.0, 4),
+}
+
+# Consecutive failures before a host is short-circuited, and for how long
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 30
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a host whose circuit breaker is open"""
+
+
+class JitteredRetry(Retry):
+    """urllib3 Retry with full-jitter exponential backoff"""
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff > 0 else 0
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting request rate to one host"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take one token and return how many seconds to wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        """Block until a token is available; returns the seconds waited"""
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker: closed -> open after repeated failures -> half-open trial"""
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self.lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def release_trial(self):
+        """Free the half-open trial slot of a request that ended without an answer, e.g. one cancelled"""
+        with self.lock:
+            self.trial_in_flight = False
+
+
+class HostPolicies:
+    """Lazily created rate limiter and circuit breaker for every host"""
+
+    def __init__(self):
+        self.limiters = {}
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def limiter(self, host):
+        with self.lock:
+            if host not in self.limiters:
+                rate, burst = HOST_RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT)
+                self.limiters[host] = TokenBucket(rate, burst)
+            return self.limiters[host]
+
+    def breaker(self, host):
+        with self.lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker()
+            return self.breakers[host]
+
+
+host_policies = HostPolicies()
+
+_adapter = HTTPAdapter(
+    pool_connections=POOL_CONNECTIONS,
+    pool_maxsize=POOL_MAXSIZE,
+    max_retries=JitteredRetry(
+        total=3,
+        connect=3,
+        read=2,
+        status=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+)
+
+
+class PooledSession(requests.Session):
+    """requests.Session that applies host policies and a default timeout"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+        # All sessions share one adapter, and with it one pool per host
+        self.mount('https://', _adapter)
+        self.mount('http://', _adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        host = urlsplit(url).hostname or ''
+        breaker = host_policies.breaker(host)
+        if not breaker.allow():
+            UPSTREAM_REQUESTS.labels(host, 'circuit_open').inc()
+            raise CircuitOpenError(f"Circuit open for {host}, skipping request")
+
+        UPSTREAM_THROTTLE.labels(host).observe(host_policies.limiter(host).acquire())
+        kwargs.setdefault('timeout', self.timeout)
+        started = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.exceptions.RequestException:
+            breaker.record_failure()
+            UPSTREAM_REQUESTS.labels(host, 'error').inc()
+            raise
+        except BaseException:
+            breaker.release_trial()
+            raise
+        finally:
+            UPSTREAM_DURATION.labels(host).observe(time.perf_counter() - started)
+
+        UPSTREAM_REQUESTS.labels(host, upstream_outcome(response.status_code)).inc()
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(name, headers=None, timeout=DEFAULT_TIMEOUT):
+    """Return the process-wide session for a scraper, creating it on first use"""
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            session = PooledSession(timeout=timeout)
+            if headers:
+                session.headers.update(headers)
+            _sessions[name] = session
+        return session
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+In-process background job queue for cause list downloads
+Jobs are persisted in the application's SQLite database, no external broker needed
+"""
+
+import json
+import uuid
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from models import db, DownloadJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_WORKERS = 2
+
+
+class JobCancelled(Exception):
+    """Raised inside a job handler when the job has been cancelled"""
+
+
+class JobReporter:
+    """Progress reporting handle passed to job handlers"""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self._progress = {}
+        self._files = []
+
+    def _update(self, **fields):
+        job = db.session.get(DownloadJob, self.job_id)
+        for key, value in fields.items():
+            setattr(job, key, value)
+        db.session.commit()
+        return job
+
+    def set_items(self, items):
+        """Register the items (judges / courts) this job will process"""
+        self._progress = {
+            key: {'label': label, 'status': 'pending'}
+            for key, label in items
+        }
+        self._update(total_items=len(self._progress), progress=json.dumps(self._progress))
+
+    def item_done(self, key, file_info=None, error=None):
+        """Record the outcome of one item and publish any file it produced"""
+        entry = self._progress.setdefault(key, {'label': key})
+        entry['status'] = 'failed' if error else 'done'
+        if error:
+            entry['error'] = error
+        if file_info:
+            entry['file_path'] = file_info.get('file_path')
+            self._files.append(file_info)
+
+        completed = sum(1 for item in self._progress.values() if item['status'] != 'pending')
+        self._update(
+            completed_items=completed,
+            progress=json.dumps(self._progress),
+            files=json.dumps(self._files)
+        )
+
+    def is_cancelled(self):
+        job = db.session.get(DownloadJob, self.job_id)
+        db.session.refresh(job)
+        return bool(job.cancel_requested)
+
+    def check_cancelled(self):
+        if self.is_cancelled():
+            raise JobCancelled()
+
+
+class JobQueue:
+    """Runs registered job handlers on a bounded thread pool"""
+
+    def __init__(self, app=None, max_workers=DEFAULT_JOB_WORKERS):
+        self.max_workers = max_workers
+        self.handlers = {}
+        self.executor = None
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.max_workers = app.config.get('JOB_WORKERS', self.max_workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='download-job')
+
+    def handler(self, kind):
+        """Decorator registering a handler function for a job kind"""
+        def decorator(func):
+            self.handlers[kind] = func
+            return func
+        return decorator
+
+    def submit(self, kind, params, user_id=None):
+        """Persist a new job and schedule it, returning the job id immediately"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = DownloadJob(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            user_id=user_id,
+            status='queued',
+            params=json.dumps(params),
+            progress=json.dumps({}),
+            files=json.dumps([])
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        self.executor.submit(self._run, job.id)
+        return job.id
+
+    def cancel(self, job_id):
+        """Request cancellation; running handlers stop at their next checkpoint"""
+        job = db.session.get(DownloadJob, job_id)
+        if not job or job.is_finished:
+            return False
+
+        job.cancel_requested = True
+        if job.status == 'queued':
+            job.status = 'cancelled'
+            job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return True
+
+    def recover_interrupted(self):
+        """Mark jobs left queued/running by a previous process as failed"""
+        interrupted = DownloadJob.query.filter(DownloadJob.status.in_(['queued', 'running'])).all()
+        for job in interrupted:
+            job.status = 'failed'
+            job.error = 'Interrupted by server restart'
+            job.finished_at = datetime.utcnow()
+        if interrupted:
+            db.session.commit()
+        return len(interrupted)
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            job = db.session.get(DownloadJob, job_id)
+            if not job or job.status != 'queued':
+                return
+
+            job.status = 'running'
+            db.session.commit()
+
+            reporter = JobReporter(job_id)
+            try:
+                self.handlers[job.kind](json.loads(job.params or '{}'), reporter)
+                status, error = 'completed', None
+            except JobCancelled:
+                status, error = 'cancelled', None
+            except Exception as e:
+                logger.error(f"Job {job_id} ({job.kind}) failed: {e}")
+                status, error = 'failed', str(e)
+
+            try:
+                db.session.rollback()
+                job = db.session.get(DownloadJob, job_id)
+                if status == 'completed' and job.cancel_requested:
+                    status = 'cancelled'
+                job.status = status
+                job.error = error
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+            except Exception as e:
+                logger.error(f"Failed to finalize job {job_id}: {e}")
+            finally:
+                db.session.remove()
+
+
+def job_to_dict(job):
+    """Serialize a job for the status endpoint"""
+    files = json.loads(job.files or '[]')
+    return {
+        'job_id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'finished': job.is_finished,
+        'total_items': job.total_items or 0,
+        'completed_items': job.completed_items or 0,
+        'progress': json.loads(job.progress or '{}'),
+        'files': files,
+        'total_pdfs': len(files),
+        'error': job.error,
+        'cancel_requested': bool(job.cancel_requested),
+        'created_at': job.created_at.strftime('%Y-%m-%d %H:%M:%S') if job.created_at else None,
+        'finished_at': job.finished_at.strftime('%Y-%m-%d %H:%M:%S') if job.finished_at else None
+    }
@@ -4,11 +4,10 @@ Real eCourts India API Integration
 Connects to actual government eCourts portal for live case data
 """
 
-import requests
-import json
 from datetime import datetime, date, timedelta
 import logging
-import urllib.parse
+
+from http_transport import get_session
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,21 +32,19 @@ class LiveHearingsAPI:
         'court_complex': '/cases/courtComplex.do'
     }
     
+    # Set proper headers to mimic browser request
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        'Accept': 'application/json, text/javascript, */*; q=0.01',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
+        'X-Requested-With': 'XMLHttpRequest',
+        'Origin': 'https://services.ecourts.gov.in',
+        'Referer': 'https://services.ecourts.gov.in/ecourtindia_v6/'
+    }
+    
     def __init__(self):
-        self.session = requests.Session()
-        
-        # Set proper headers to mimic browser request
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json, text/javascript, */*; q=0.01',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8',
-            'X-Requested-With': 'XMLHttpRequest',
-            'Origin': 'https://services.ecourts.gov.in',
-            'Referer': 'https://services.ecourts.gov.in/ecourtindia_v6/'
-        })
-        
-        self.session.timeout = 30
+        self.session = get_session('ecourts_api', self.HEADERS, timeout=30)
     
     def get_today_hearings(self):
         """Get today's hearings with fallback data"""
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+In-process metrics in the Prometheus text format
+Latency histograms and counters for routes, upstream hosts, DB queries, PDF rendering and caches
+"""
+
+import re
+import threading
+from collections import deque
+from bisect import bisect_left
+from time import perf_counter
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Upper bounds in seconds, from a cached lookup to a slow scrape
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Distinct SQL strings whose query family is remembered
+MAX_CACHED_STATEMENTS = 5000
+
+# Timed durations a histogram child queues before bucketing them
+MAX_PENDING_TIMINGS = 1000
+
+
+# Each child guards its values with its own lock: "+=" on an attribute is a
+# separate load, add and store, so unguarded threads would lose updates.
+# An uncontended lock costs well under a microsecond.
+
+class _CounterChild:
+    __slots__ = ('_value', '_lock')
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        with self._lock:
+            return self._value
+
+
+class _Timer:
+    """Times a ``with`` block into a histogram child.
+
+    Timed blocks sit on hot paths, so the duration is only appended to the
+    child's queue (deque appends need no lock); the child buckets it later.
+    """
+    __slots__ = ('child', 'started')
+
+    def __enter__(self):
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pending = self.child._pending
+        pending.append(perf_counter() - self.started)
+        if len(pending) > MAX_PENDING_TIMINGS:
+            self.child._drain()
+
+
+class _HistogramChild:
+    __slots__ = ('upper_bounds', 'counts', 'sum', '_pending', '_lock')
+
+    def __init__(self, upper_bounds):
+        self.upper_bounds = upper_bounds
+        # One count per bucket plus +Inf; made cumulative only when rendered
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        bucket = bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[bucket] += 1
+            self.sum += value
+
+    def _drain(self):
+        """Bucket the durations queued by timed blocks"""
+        pending, upper_bounds, counts = self._pending, self.upper_bounds, self.counts
+        with self._lock:
+            # popleft is atomic, so timers may keep appending meanwhile
+            while pending:
+                value = pending.popleft()
+                counts[bisect_left(upper_bounds, value)] += 1
+                self.sum += value
+
+    def snapshot(self):
+        """(bucket counts, sum) taken together, so they agree with each other"""
+        self._drain()
+        with self._lock:
+            return list(self.counts), self.sum
+
+    def time(self):
+        """Context manager observing the time spent in its block"""
+        # Set on a bare instance: a Python __init__ would add a quarter of the cost
+        timer = _Timer()
+        timer.child = self
+        return timer
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def labels(self, *values):
+        """Child metric for one combination of label values.
+
+        Hot paths should look their child up once and keep it.
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(tuple(str(value) for value in values), self._new_child())
+                self._children.setdefault(values, child)
+        return child
+
+    def _samples(self):
+        with self._lock:
+            children = {tuple(str(value) for value in values): child for values, child in self._children.items()}
+        return sorted(children.items())
+
+    def _label_text(self, values, extra=None):
+        pairs = list(zip(self.labelnames, values))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for values, child in self._samples():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def _render_child(self, values, child):
+        return [f'{self.name}{self._label_text(values)} {_number(child.value)}']
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.upper_bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def _render_child(self, values, child):
+        counts, total = child.snapshot()
+        lines = []
+        cumulative = 0
+        for upper_bound, count in zip(self.upper_bounds + (float('inf'),), counts):
+            cumulative += count
+            le = '+Inf' if upper_bound == float('inf') else _number(upper_bound)
+            lines.append(f'{self.name}_bucket{self._label_text(values, ("le", le))} {cumulative}')
+        lines.append(f'{self.name}_sum{self._label_text(values)} {_number(total)}')
+        lines.append(f'{self.name}_count{self._label_text(values)} {cumulative}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _number(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+REGISTRY = []
+
+
+def render():
+    """Every metric of this process in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+# Metrics -------------------------------------------------------------------
+
+REQUEST_DURATION = Histogram('http_request_duration_seconds', 'Flask request latency, streamed bodies included',
+                             ('method', 'route'))
+REQUESTS = Counter('http_requests_total', 'Flask requests by response status', ('method', 'route', 'status'))
+
+UPSTREAM_DURATION = Histogram('upstream_request_duration_seconds', 'Latency of requests to court websites', ('host',))
+UPSTREAM_THROTTLE = Histogram('upstream_throttle_seconds', 'Time spent waiting for a host rate limit', ('host',))
+UPSTREAM_REQUESTS = Counter('upstream_requests_total', 'Requests to court websites by outcome', ('host', 'outcome'))
+
+DB_QUERY_DURATION = Histogram('db_query_duration_seconds', 'SQL statement latency by statement and table',
+                              ('family',), buckets=DB_BUCKETS)
+
+PDF_RENDER_DURATION = Histogram('pdf_render_duration_seconds',
+                                'Cause list PDF render latency; pool renders include queueing', ('mode',))
+PDF_PAGES = Counter('pdf_pages_rendered_total', 'Cause list PDF pages rendered')
+
+CACHE_REQUESTS = Counter('cache_requests_total', 'Cache lookups by result', ('cache', 'result'))
+
+
+def upstream_outcome(status_code):
+    return f'{status_code // 100}xx'
+
+
+# Flask routes --------------------------------------------------------------
+
+def init_app(app):
+    """Time every request of ``app`` by its URL rule"""
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_started = perf_counter()
+
+    @app.after_request
+    def _record_response_status(response):
+        g._metrics_status = response.status_code
+        return response
+
+    # Teardown runs after a streamed body has been sent, so streams are timed in full
+    @app.teardown_request
+    def _observe_request(exc):
+        started = g.pop('_metrics_started', None)
+        if started is None:
+            return
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        status = 500 if exc is not None else g.pop('_metrics_status', 500)
+        REQUEST_DURATION.labels(request.method, route).observe(perf_counter() - started)
+        REQUESTS.labels(request.method, route, status).inc()
+
+
+# DB query families ---------------------------------------------------------
+
+_table_res = {
+    'SELECT': re.compile(r'\bFROM\s+"?(\w+)', re.IGNORECASE),
+    'DELETE': re.compile(r'\bFROM\s+"?(\w+)', re.IGNORECASE),
+    'INSERT': re.compile(r'\bINTO\s+"?(\w+)', re.IGNORECASE),
+    'UPDATE': re.compile(r'\bUPDATE\s+"?(\w+)', re.IGNORECASE),
+}
+_statement_families = {}
+
+
+def query_family(statement):
+    """'select case', 'insert cause_list_entry', 'pragma', ... for a SQL string.
+
+    SQLAlchemy reuses its compiled SQL strings, so each one is parsed once.
+    """
+    family = _statement_families.get(statement)
+    if family is None:
+        words = statement.split(None, 1)
+        verb = words[0].upper() if words else ''
+        match = _table_res[verb].search(statement) if verb in _table_res else None
+        family = f'{verb.lower()} {match.group(1)}' if match else verb.lower()
+        if len(_statement_families) < MAX_CACHED_STATEMENTS:
+            _statement_families[statement] = family
+    return family
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _observe_query(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_metrics_started', None)
+    if started is not None:
+        DB_QUERY_DURATION.labels(query_family(statement)).observe(perf_counter() - started)
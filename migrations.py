@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+In-place schema upgrades for existing SQLite databases
+db.create_all() only creates missing tables, so changes to existing tables are applied here
+"""
+
+import json
+import logging
+
+from sqlalchemy import inspect, text, insert, select, update
+
+from models import db, CauseList, CauseListEntry
+from search_index import ensure_search_index, drop_search_index
+
+logger = logging.getLogger(__name__)
+
+
+def add_missing_columns():
+    """ALTER TABLE ... ADD COLUMN for every model column the database is missing.
+
+    Returns {table_name: [column names added]}.
+    """
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    added = {}
+
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+                added.setdefault(table.name, []).append(column.name)
+                logger.info(f"Added column {table.name}.{column.name}")
+
+    return added
+
+
+def backfill_case_parties():
+    """Split legacy 'Petitioner vs Respondent' titles into the party columns"""
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE \"case\" SET "
+            " petitioner = trim(substr(case_title, 1, instr(case_title, ' vs ') - 1)),"
+            " respondent = trim(substr(case_title, instr(case_title, ' vs ') + 4)) "
+            "WHERE petitioner IS NULL AND instr(case_title, ' vs ') > 0"
+        ))
+
+
+def backfill_cause_list_entries():
+    """Move JSON cause list snapshots from cause_list.data into cause_list_entry rows"""
+    with db.engine.begin() as conn:
+        cause_lists = CauseList.__table__
+        snapshots = conn.execute(
+            select(cause_lists.c.id, cause_lists.c.date, cause_lists.c.data).where(cause_lists.c.data.isnot(None))
+        ).fetchall()
+        for cause_list_id, list_date, data in snapshots:
+            try:
+                entries = json.loads(data)
+            except ValueError:
+                logger.warning(f"Skipping unreadable snapshot of cause list {cause_list_id}")
+                continue
+            if not isinstance(entries, dict):
+                continue
+
+            rows = [{
+                'cause_list_id': cause_list_id,
+                'date': list_date,
+                'sr_no': sr_no,
+                'entry_key': key,
+                'case_number': key,
+                'cnr': entry.get('cnr'),
+                'parties': entry.get('parties'),
+                'advocate': entry.get('advocate'),
+                'stage': entry.get('stage'),
+                'time': entry.get('time')
+            } for sr_no, (key, entry) in enumerate(entries.items(), 1)]
+            if rows:
+                conn.execute(insert(CauseListEntry.__table__), rows)
+            conn.execute(update(cause_lists).where(cause_lists.c.id == cause_list_id).values(data=None))
+
+        if snapshots:
+            logger.info(f"Moved {len(snapshots)} cause list snapshots into cause_list_entry")
+
+
+def ensure_indexes():
+    """Create any index declared on the models that the database is missing"""
+    created = []
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+            created.append(index.name)
+    return created
+
+
+def upgrade_database():
+    """Bring an existing database up to the current models (call inside an app context)"""
+    existing_tables = set(inspect(db.engine).get_table_names())
+    added = add_missing_columns()
+    db.create_all()
+    
+    if 'cause_list_entry' not in existing_tables and 'cause_list' in existing_tables:
+        backfill_cause_list_entries()
+
+    if 'petitioner' in added.get('case', []):
+        backfill_case_parties()
+
+    if 'advocate' in added.get('cause_list_entry', []):
+        # FTS5 tables can't gain columns; rebuild the entry index with the advocate column
+        drop_search_index('cause_list_entry_fts')
+
+    ensure_indexes()
+    ensure_search_index()
@@ -24,6 +24,12 @@ class User(UserMixin, db.Model):
         return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
 
 class Case(db.Model):
+    __table_args__ = (
+        db.Index('ix_case_court_hearing', 'court_name', 'next_hearing_date'),
+        db.Index('ix_case_next_hearing_date', 'next_hearing_date'),
+        db.Index('ix_case_updated_at', 'updated_at', 'id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     cnr = db.Column(db.String(50), unique=True, nullable=False)
     case_type = db.Column(db.String(10))
@@ -34,9 +40,23 @@ class Case(db.Model):
     next_hearing_date = db.Column(db.Date)
     serial_number = db.Column(db.String(20))
     status = db.Column(db.String(50))
+    filing_number = db.Column(db.String(50))
+    filing_date = db.Column(db.Date)
+    judge_name = db.Column(db.String(200))
+    petitioner = db.Column(db.String(500))
+    respondent = db.Column(db.String(500))
+    under_act = db.Column(db.String(200))
+    under_section = db.Column(db.String(100))
+    note = db.Column(db.String(200))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    @property
+    def parties(self):
+        if self.petitioner and self.respondent:
+            return f"{self.petitioner} vs {self.respondent}"
+        return self.case_title or ''
+    
     @property
     def is_today(self):
         if self.next_hearing_date:
@@ -51,9 +71,113 @@ class Case(db.Model):
         return False
 
 class CauseList(db.Model):
+    __table_args__ = (
+        db.Index('ix_cause_list_court_date', 'court_code', 'date', unique=True),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     date = db.Column(db.Date, nullable=False)
+    court_code = db.Column(db.String(100))  # complex:judge, identifies one board
     court_name = db.Column(db.String(200))
     total_cases = db.Column(db.Integer, default=0)
-    data = db.Column(db.Text)  # JSON string
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    data = db.Column(db.Text)  # legacy JSON snapshot; entries now live in CauseListEntry
+    content_hash = db.Column(db.String(64))  # hash of the normalized entries
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class CauseListEntry(db.Model):
+    """One case listed on a cause list"""
+    __table_args__ = (
+        db.Index('ix_cause_list_entry_list_sr', 'cause_list_id', 'sr_no'),
+        db.Index('ix_cause_list_entry_cnr_date', 'cnr', 'date'),
+        db.Index('ix_cause_list_entry_key_date', 'entry_key', 'date'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    cause_list_id = db.Column(db.Integer, db.ForeignKey('cause_list.id'), nullable=False)
+    case_id = db.Column(db.Integer, db.ForeignKey('case.id'), index=True)  # set when the CNR is a tracked case
+    date = db.Column(db.Date, nullable=False)  # copied from the cause list for cross-court lookups
+    sr_no = db.Column(db.Integer)
+    entry_key = db.Column(db.String(100), nullable=False)  # normalized case number, unique per list
+    case_number = db.Column(db.String(100))
+    cnr = db.Column(db.String(50))
+    parties = db.Column(db.String(500))
+    advocate = db.Column(db.String(300))
+    stage = db.Column(db.String(100))
+    time = db.Column(db.String(20))
+
+class CauseListChange(db.Model):
+    """One entry added to, removed from or updated on a cause list between two scrapes"""
+    __table_args__ = (
+        db.Index('ix_cause_list_change_court_date', 'court_code', 'date', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)  # increasing; used as the "since" cursor
+    cause_list_id = db.Column(db.Integer, db.ForeignKey('cause_list.id'), nullable=False, index=True)
+    court_code = db.Column(db.String(100))
+    date = db.Column(db.Date, nullable=False)
+    case_number = db.Column(db.String(100), nullable=False)
+    change = db.Column(db.String(10), nullable=False)  # added, removed, updated
+    data = db.Column(db.Text)  # JSON string, entry after the change (before it, for removals)
+    changed_fields = db.Column(db.Text)  # JSON list, for updates
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class DownloadJob(db.Model):
+    __table_args__ = (
+        # At most one live prefetch job per date, however many processes schedule it
+        db.Index('ix_download_job_live_prefetch', 'kind', 'params', unique=True,
+                 sqlite_where=db.text("kind = 'prefetch' AND status IN ('queued', 'running', 'completed')")),
+    )
+    
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    status = db.Column(db.String(20), default='queued', index=True)  # queued, running, completed, failed, cancelled
+    params = db.Column(db.Text)  # JSON string
+    total_items = db.Column(db.Integer, default=0)
+    completed_items = db.Column(db.Integer, default=0)
+    progress = db.Column(db.Text)  # JSON string, per-item progress
+    files = db.Column(db.Text)  # JSON string, files generated so far
+    error = db.Column(db.Text)
+    cancel_requested = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed', 'cancelled')
+
+class StatCounter(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+class WatchTerm(db.Model):
+    """An advocate or party name a user wants to be alerted about"""
+    __table_args__ = (
+        db.Index('ix_watch_term_user_normalized', 'user_id', 'normalized', unique=True),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    term = db.Column(db.String(200), nullable=False)
+    normalized = db.Column(db.String(200), nullable=False)  # upper-case words, punctuation stripped
+    kind = db.Column(db.String(20), default='party')  # advocate, party
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class WatchHit(db.Model):
+    """A watched name found on a cause list entry"""
+    __table_args__ = (
+        db.Index('ix_watch_hit_term_entry', 'term_id', 'entry_id', unique=True),
+        db.Index('ix_watch_hit_user', 'user_id', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    term_id = db.Column(db.Integer, db.ForeignKey('watch_term.id'), nullable=False)
+    entry_id = db.Column(db.Integer, db.ForeignKey('cause_list_entry.id'), nullable=False)
+    court_code = db.Column(db.String(100))
+    date = db.Column(db.Date)
+    case_number = db.Column(db.String(100))
+    parties = db.Column(db.String(500))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
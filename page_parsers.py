@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Streaming extraction from court website pages
+lxml parser targets pick out table rows, <select> options and page text without building a document tree
+"""
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - scrapers fall back to BeautifulSoup
+    etree = None
+
+# Elements whose text is code, not page content (BeautifulSoup's get_text() skips them too)
+NON_TEXT_TAGS = frozenset(('script', 'style', 'template'))
+
+
+class PageParseError(Exception):
+    """The fast path can't handle this page; the caller should use BeautifulSoup instead"""
+
+
+class _Target:
+    """Base parser target: buffers text between tags and drops script/style contents.
+
+    lxml may hand one text node over in several pieces, so pieces are only
+    joined and passed on at the next tag boundary, giving the same strings
+    BeautifulSoup would.
+    """
+
+    def __init__(self):
+        self._pieces = []
+        self._skip = 0
+
+    def _flush(self):
+        if self._pieces:
+            self.text(''.join(self._pieces))
+            self._pieces = []
+
+    def start(self, tag, attrib):
+        self._flush()
+        if tag in NON_TEXT_TAGS:
+            self._skip += 1
+        self.open(tag, attrib)
+
+    def end(self, tag):
+        self._flush()
+        if tag in NON_TEXT_TAGS:
+            self._skip = max(0, self._skip - 1)
+        self.close_tag(tag)
+
+    def data(self, data):
+        if not self._skip:
+            self._pieces.append(data)
+
+    def comment(self, text):
+        self._flush()
+
+    def open(self, tag, attrib):
+        pass
+
+    def close_tag(self, tag):
+        pass
+
+    def text(self, text):
+        pass
+
+    def close(self):
+        self._flush()
+        return self.result()
+
+
+class _TableRows(_Target):
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._tables = 0
+        self._row = None
+        self._cell = None
+
+    def open(self, tag, attrib):
+        if tag == 'table':
+            self._tables += 1
+        elif not self._tables:
+            return
+        elif tag == 'tr':
+            self._row = []
+            self.rows.append(self._row)
+        elif (tag == 'td' or tag == 'th') and self._row is not None:
+            self._cell = []
+            self._row.append(self._cell)
+
+    def close_tag(self, tag):
+        if tag == 'table':
+            self._tables = max(0, self._tables - 1)
+        elif tag == 'td' or tag == 'th':
+            self._cell = None
+        elif tag == 'tr':
+            self._row = self._cell = None
+
+    def text(self, text):
+        if self._cell is not None:
+            text = text.strip()
+            if text:
+                self._cell.append(text)
+
+    def result(self):
+        return [[''.join(cell) for cell in row] for row in self.rows]
+
+
+class _SelectOptions(_Target):
+    def __init__(self):
+        super().__init__()
+        self.selects = []
+        self._options = None
+        self._option = None
+
+    def open(self, tag, attrib):
+        if tag == 'select':
+            self._options = []
+            self.selects.append((attrib.get('name', ''), attrib.get('id', ''), self._options))
+        elif tag == 'option' and self._options is not None:
+            self._option = [attrib.get('value'), []]
+            self._options.append(self._option)
+
+    def close_tag(self, tag):
+        if tag == 'option':
+            self._option = None
+        elif tag == 'select':
+            self._options = self._option = None
+
+    def text(self, text):
+        if self._option is not None:
+            self._option[1].append(text)
+
+    def result(self):
+        return [(name, element_id, [(value, ''.join(text).strip()) for value, text in options])
+                for name, element_id, options in self.selects]
+
+
+class _PageText(_Target):
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+
+    def text(self, text):
+        self.parts.append(text)
+
+    def result(self):
+        return ''.join(self.parts)
+
+
+def _parse(html_content, target):
+    if etree is None:
+        raise PageParseError('lxml is not installed')
+    if isinstance(html_content, bytes):
+        # The court sites serve UTF-8; anything else is left to lxml's own detection
+        try:
+            html_content = html_content.decode('utf-8')
+        except UnicodeDecodeError:
+            pass
+    try:
+        return etree.fromstring(html_content, etree.HTMLParser(target=target))
+    except (etree.LxmlError, ValueError) as e:
+        raise PageParseError(str(e)) from e
+
+
+def table_rows(html_content):
+    """Every <tr> inside a <table>, as a list of its cells' stripped text.
+
+    Cell text matches BeautifulSoup's ``get_text(strip=True)``.
+    Raises PageParseError when the page can't be parsed this way.
+    """
+    return _parse(html_content, _TableRows())
+
+
+def select_options(html_content):
+    """Every <select> as (name, id, [(option value, stripped option text), ...])"""
+    return _parse(html_content, _SelectOptions())
+
+
+def page_text(html_content):
+    """The text of the page without scripts and styles, like BeautifulSoup's ``get_text()``"""
+    return _parse(html_content, _PageText())
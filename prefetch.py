@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Evening prefetch of the next day's cause lists
+Every Delhi complex and eCourts court that tracked cases are heard in is fetched, stored and rendered ahead of the morning rush
+"""
+
+import re
+import json
+import time
+import random
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from functools import partial
+from urllib.parse import urlsplit
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Case, DownloadJob
+from http_transport import host_policies
+
+logger = logging.getLogger(__name__)
+
+# Local time the scheduler starts prefetching, plus up to this much random delay
+PREFETCH_AT = '20:00'
+PREFETCH_JITTER_MINUTES = 30
+
+# Kept well below the interactive pipeline so a prefetch never crowds out users
+PREFETCH_FETCH_WORKERS = 2
+# Random pause between two complexes on the same host, in seconds
+PREFETCH_PAUSE_SECONDS = (5.0, 20.0)
+
+# Job statuses covered by ix_download_job_live_prefetch
+LIVE_PREFETCH_STATUSES = ('queued', 'running', 'completed')
+
+# Courts don't sit on Sundays
+PREFETCH_SKIP_WEEKDAYS = (6,)
+
+# Court buildings, by the complex whose cause lists they publish
+COMPLEX_ALIASES = {
+    'NDC': ('patiala house',),
+    'CDC': ('tis hazari',),
+    'EDC': ('karkardooma',),
+    'SDC': ('saket',),
+    'NDDC': ('rohini',),
+}
+
+# CNR state + district prefix for cases whose court name doesn't say where they are
+CNR_DISTRICTS = {
+    'DLND': 'NDC',
+    'DLCT': 'CDC',
+    'DLET': 'EDC',
+    'DLWT': 'WDC',
+    'DLST': 'SDC',
+    'DLNT': 'NDDC',
+}
+
+_complex_suffix_re = re.compile(r'\b(courts?|complex)\b')
+# The portal numbers its courts: "3-Civil Judge Junior Division"
+_court_number_re = re.compile(r'^\s*\d+\s*-\s*')
+
+
+def _normalize(text):
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', str(text).lower()).split())
+
+
+def tracked_complexes(complexes):
+    """Complexes, out of the scraper's ``complexes``, that stored cases are listed in.
+
+    A case's court name is matched against each complex's name ("New Delhi
+    Courts Complex" -> "new delhi") and its building aliases; when the name
+    is too generic, the CNR district prefix decides.
+    """
+    patterns = {}
+    for court_complex in complexes:
+        code = court_complex['complex_code']
+        name = ' '.join(_complex_suffix_re.sub(' ', _normalize(court_complex['complex_name'])).split())
+        patterns[code] = [alias for alias in (name,) + COMPLEX_ALIASES.get(code, ()) if alias]
+
+    rows = db.session.execute(
+        select(Case.court_name, func.upper(func.substr(Case.cnr, 1, 4))).distinct()
+    ).all()
+
+    tracked = set()
+    for court_name, cnr_prefix in rows:
+        padded = f' {_normalize(court_name or "")} '
+        matched = [code for code, aliases in patterns.items() if any(f' {alias} ' in padded for alias in aliases)]
+        if not matched and CNR_DISTRICTS.get(cnr_prefix) in patterns:
+            matched = [CNR_DISTRICTS[cnr_prefix]]
+        tracked.update(matched)
+
+    return [court_complex for court_complex in complexes if court_complex['complex_code'] in tracked]
+
+
+def tracked_courts(hierarchy):
+    """eCourts courts that stored cases are listed before, by (state, district, complex) code.
+
+    Only courts already in the stored ``hierarchy`` (complexes someone has
+    browsed or downloaded) are considered; the portal isn't walked. A case
+    matches a court whose name, without the portal's court number, appears
+    in the case's court name. Names such as "Civil Judge Junior Division"
+    recur across districts, so when a case matches courts of several
+    complexes only those whose complex or district name it also mentions
+    are kept, and none if that doesn't settle it.
+    """
+    districts = {(codes[0], str(item['district_code'])): _normalize(item['district_name'])
+                 for codes, items in hierarchy.stored('districts') for item in items}
+    complex_names = {codes + (str(item['complex_code']),): _normalize(item['complex_name'])
+                     for codes, items in hierarchy.stored('complexes') for item in items}
+    courts = [(codes, court, _normalize(_court_number_re.sub('', court['court_name'])))
+              for codes, items in hierarchy.stored('courts') for court in items]
+    courts = [(codes, court, name) for codes, court, name in courts if name]
+
+    tracked = {}
+    for court_name in db.session.execute(select(Case.court_name).distinct()).scalars():
+        padded = f' {_normalize(court_name or "")} '
+        matched = [(codes, court) for codes, court, name in courts if f' {name} ' in padded]
+        complexes = {codes for codes, _ in matched}
+        if len(complexes) > 1:
+            complexes = {codes for codes in complexes
+                         if any(f' {name} ' in padded for name in (complex_names.get(codes), districts.get(codes[:2]))
+                                if name)}
+            if len(complexes) != 1:
+                continue
+        for codes, court in matched:
+            if codes in complexes:
+                tracked.setdefault(codes, {})[str(court['court_code'])] = court
+
+    return {codes: list(by_code.values()) for codes, by_code in tracked.items()}
+
+
+def _delhi_boards(scraper, complex_code, list_date):
+    """Results of a Delhi complex's judges, or None when it has no roster for the date"""
+    judges = scraper.get_judges_list(complex_code, list_date)
+    if not judges:
+        return None
+    return list(scraper.iter_judges_causelist(judges, list_date, complex_code))
+
+
+def _ecourts_boards(scraper, codes, courts, list_date):
+    """Results of the tracked courts of one eCourts complex"""
+    return list(scraper.iter_courts_causelist(*codes, courts, list_date, scraper.header(*codes)))
+
+
+def prefetch_cause_lists(list_date=None, reporter=None, fetch_workers=PREFETCH_FETCH_WORKERS,
+                         pause=PREFETCH_PAUSE_SECONDS):
+    """Fetch, store and render every tracked complex's boards for ``list_date`` (default tomorrow).
+
+    That is each Delhi district court complex from tracked_complexes() and
+    the courts tracked_courts() finds on the eCourts portal. Boards go
+    through the normal pipelines, so they land in the cause list store and
+    the PDF cache and a morning request finds both warm. Complexes are done
+    one at a time with a random pause in between, on top of the per-host
+    rate limit every request already goes through; a host whose circuit
+    breaker is open is skipped. Call inside an app context.
+    Returns a summary dict.
+    """
+    from delhi_courts_scraper import DelhiCourtsRealScraper
+    from causelist_scraper import CauseListScraper, ECourtsPortal
+
+    if list_date is None:
+        list_date = date.today() + timedelta(days=1)
+    if isinstance(list_date, date):
+        list_date = list_date.strftime('%Y-%m-%d')
+
+    delhi = DelhiCourtsRealScraper(max_fetch_workers=fetch_workers)
+    delhi_host = urlsplit(delhi.base_url).hostname
+    ecourts = CauseListScraper(max_fetch_workers=fetch_workers)
+    ecourts_host = urlsplit(ECourtsPortal.BASE_URL).hostname
+
+    # (item key, name, host, fetch returning the board results or None)
+    work = [(c['complex_code'], c['complex_name'], delhi_host,
+             partial(_delhi_boards, delhi, c['complex_code'], list_date))
+            for c in tracked_complexes(delhi.get_court_complexes() or [])]
+    work += [(':'.join(codes), ecourts.header(*codes)[0], ecourts_host,
+              partial(_ecourts_boards, ecourts, codes, courts, list_date))
+             for codes, courts in tracked_courts(ecourts.hierarchy).items()]
+
+    # incomplete: complexes skipped, without a roster or with failed boards
+    summary = {'date': list_date, 'complexes': len(work), 'boards': 0, 'failed': 0, 'skipped': [], 'incomplete': []}
+
+    if reporter:
+        reporter.set_items([(code, name) for code, name, _, _ in work])
+
+    for n, (code, name, host, fetch) in enumerate(work):
+        if reporter:
+            reporter.check_cancelled()
+        if n:
+            time.sleep(random.uniform(*pause))
+
+        if host_policies.breaker(host).state == 'open':
+            logger.warning(f"Prefetch: skipping {code}, {host} is failing")
+            summary['skipped'].append(code)
+            summary['incomplete'].append(code)
+            if reporter:
+                reporter.item_done(code, error=f'{host} unavailable')
+            continue
+
+        results = fetch()
+        if not results:
+            logger.warning(f"Prefetch: no judges found for {code} on {list_date}")
+            summary['incomplete'].append(code)
+            if reporter:
+                reporter.item_done(code, error='No judges found')
+            continue
+
+        failed = sum(1 for result in results if not result.get('file_path'))
+        summary['boards'] += len(results) - failed
+        summary['failed'] += failed
+        if failed:
+            summary['incomplete'].append(code)
+
+        logger.info(f"Prefetch: {code} {list_date}, {len(results)} boards, {failed} failed")
+        if reporter:
+            reporter.item_done(code, error=f'{failed} of {len(results)} boards failed' if failed else None)
+
+    return summary
+
+
+def submit_prefetch_job(job_queue, list_date):
+    """Queue a prefetch job for ``list_date`` unless one already ran or is running; returns its id or None.
+
+    Several app processes may run a scheduler. The partial unique index
+    ix_download_job_live_prefetch lets only one of them insert the job;
+    failed and cancelled runs don't count, so those dates can be retried.
+    """
+    params = json.dumps({'date': list_date})
+    existing = DownloadJob.query.filter(
+        DownloadJob.kind == 'prefetch',
+        DownloadJob.params == params,
+        DownloadJob.status.in_(LIVE_PREFETCH_STATUSES)
+    ).first()
+    if existing is not None:
+        return None
+    try:
+        return job_queue.submit('prefetch', {'date': list_date})
+    except IntegrityError:
+        # Another process queued it between the check and the insert
+        db.session.rollback()
+        return None
+
+
+class PrefetchScheduler:
+    """Daemon thread calling ``action(list_date)`` for the next day, every evening"""
+
+    def __init__(self, app, action, at=PREFETCH_AT, jitter_minutes=PREFETCH_JITTER_MINUTES):
+        self.app = app
+        self.action = action
+        self.hour, self.minute = (int(part) for part in at.split(':'))
+        self.jitter = timedelta(minutes=jitter_minutes)
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def next_slot(self, now=None):
+        """Next scheduled start: today's slot if still ahead, else tomorrow's"""
+        now = now or datetime.now()
+        slot = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        return slot if slot > now else slot + timedelta(days=1)
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name='causelist-prefetch', daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        while not self.stopped.is_set():
+            slot = self.next_slot()
+            # Spread the start so several deployments don't hit the courts at the same minute
+            run_at = slot + timedelta(seconds=random.uniform(0, self.jitter.total_seconds()))
+            logger.info(f"Next cause list prefetch at {run_at:%Y-%m-%d %H:%M}")
+            if self.stopped.wait((run_at - datetime.now()).total_seconds()):
+                return
+
+            list_date = slot.date() + timedelta(days=1)
+            if list_date.weekday() in PREFETCH_SKIP_WEEKDAYS:
+                continue
+            try:
+                with self.app.app_context():
+                    self.action(list_date.strftime('%Y-%m-%d'))
+            except Exception as e:
+                logger.error(f"Cause list prefetch for {list_date} failed: {e}")
@@ -3,29 +3,88 @@
 Real eCourts Data Scraper - Gets actual case data from eCourts servers
 """
 
-import requests
 from bs4 import BeautifulSoup
-import re
+import sqlite3
 from datetime import datetime
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from cnr_cache import get_cnr_cache
+from http_transport import get_session
+from async_scraper import get_engine
+from page_parsers import table_rows, PageParseError
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BULK_WORKERS = 16
+
+# Label text of a case table row -> case field, tried in order
+CASE_FIELD_LABELS = (
+    ('filing number', 'filing_number'),
+    ('filing date', 'filing_date'),
+    ('court name', 'court_name'),
+    ('case type', 'case_type'),
+    ('next hearing', 'next_hearing_date'),
+    ('judge', 'judge_name'),
+    ('petitioner', 'petitioner'),
+    ('respondent', 'respondent'),
+)
+
 class RealECourtsScraper:
     """Real eCourts scraper that gets actual case data"""
     
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Connection': 'keep-alive',
+        'Referer': 'https://services.ecourts.gov.in/ecourtindia_v6/'
+    }
+    
+    # eCourts endpoints that can answer a CNR search, raced against each other
+    CNR_URLS = [
+        'https://services.ecourts.gov.in/ecourtindia_v6/cases/cnr_details',
+        'https://ecourts.gov.in/ecourts_home/cnr_details',
+        'https://main.ecourts.gov.in/case_status/case_status.php'
+    ]
+    
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Connection': 'keep-alive',
-            'Referer': 'https://services.ecourts.gov.in/ecourtindia_v6/'
-        })
+        self.session = get_session('ecourts', self.HEADERS)
+        self.engine = get_engine('ecourts', self.HEADERS)
+    
+    def search_case_by_cnr(self, cnr, use_cache=True, force_refresh=False):
+        """Get real case data for the given CNR, served from the CNR cache when possible"""
+        cnr = cnr.upper()
+        if not use_cache:
+            return self._fetch_case(cnr)
+        
+        try:
+            return get_cnr_cache().lookup(cnr, self._fetch_case, force_refresh=force_refresh)
+        except sqlite3.Error as e:
+            logger.error(f"CNR cache error: {e}")
+            return self._fetch_case(cnr)
     
-    def search_case_by_cnr(self, cnr):
-        """Get real case data for the given CNR"""
+    def search_many(self, cnrs, max_workers=DEFAULT_BULK_WORKERS):
+        """Look up many CNRs concurrently, yielding (cnr, case_info) as each completes"""
+        unique_cnrs = list(dict.fromkeys(cnr.strip().upper() for cnr in cnrs if cnr and cnr.strip()))
+        if not unique_cnrs:
+            return
+        
+        pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique_cnrs))), thread_name_prefix='cnr-search')
+        try:
+            futures = {pool.submit(self.search_case_by_cnr, cnr): cnr for cnr in unique_cnrs}
+            for future in as_completed(futures):
+                cnr = futures[future]
+                try:
+                    yield cnr, future.result()
+                except Exception as e:
+                    logger.error(f"Bulk lookup for {cnr} failed: {e}")
+                    yield cnr, {'error': 'Search failed'}
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _fetch_case(self, cnr):
+        """Fetch case data for the given CNR from eCourts"""
         try:
             # Real eCourts case data from screenshots
             real_cases = {
@@ -137,46 +196,41 @@ class RealECourtsScraper:
     def _attempt_real_scraping(self, cnr):
         """Attempt to get real data from eCourts servers"""
         try:
-            # Try multiple eCourts endpoints
-            urls = [
-                f'https://services.ecourts.gov.in/ecourtindia_v6/cases/cnr_details',
-                f'https://ecourts.gov.in/ecourts_home/cnr_details',
-                f'https://main.ecourts.gov.in/case_status/case_status.php'
-            ]
+            # Query all eCourts endpoints at once and keep the first real answer
+            attempts = [self._attempt_cnr_url(url, cnr) for url in self.CNR_URLS]
+            return self.engine.race_sync(attempts, timeout=45)
             
-            for url in urls:
-                try:
-                    # Get the form page first
-                    response = self.session.get(url, timeout=15)
-                    if response.status_code == 200:
-                        # Try to submit CNR search
-                        form_data = {
-                            'cnr_number': cnr,
-                            'captcha': '',
-                            'submit': 'Submit'
-                        }
-                        
-                        search_response = self.session.post(url, data=form_data, timeout=15)
-                        if search_response.status_code == 200:
-                            parsed_data = self._parse_real_response(search_response.text, cnr)
-                            if parsed_data:
-                                return parsed_data
-                                
-                except Exception as e:
-                    logger.debug(f"URL {url} failed: {e}")
-                    continue
+        except Exception as e:
+            logger.error(f"Real scraping attempt failed: {e}")
+            return None
+    
+    async def _attempt_cnr_url(self, url, cnr):
+        """Search one eCourts endpoint for a CNR, returning parsed data or None"""
+        try:
+            # Get the form page first
+            response = await self.engine.fetch('GET', url)
+            if response.status != 200:
+                return None
+            
+            # Try to submit CNR search
+            form_data = {
+                'cnr_number': cnr,
+                'captcha': '',
+                'submit': 'Submit'
+            }
             
+            search_response = await self.engine.fetch('POST', url, data=form_data)
+            if search_response.status == 200:
+                return self._parse_real_response(search_response.text, cnr)
             return None
             
         except Exception as e:
-            logger.error(f"Real scraping attempt failed: {e}")
+            logger.debug(f"URL {url} failed: {e}")
             return None
     
     def _parse_real_response(self, html_content, cnr):
         """Parse real eCourts response"""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
             # Check if we got real case data
             if cnr.upper() in html_content.upper():
                 # Extract real data from HTML
@@ -187,32 +241,9 @@ class RealECourtsScraper:
                     'is_real_data': True
                 }
                 
-                # Extract case details from tables
-                tables = soup.find_all('table')
-                for table in tables:
-                    rows = table.find_all('tr')
-                    for row in rows:
-                        cells = row.find_all(['td', 'th'])
-                        if len(cells) >= 2:
-                            field = cells[0].get_text(strip=True).lower()
-                            value = cells[1].get_text(strip=True)
-                            
-                            if 'filing number' in field:
-                                case_data['filing_number'] = value
-                            elif 'filing date' in field:
-                                case_data['filing_date'] = value
-                            elif 'court name' in field:
-                                case_data['court_name'] = value
-                            elif 'case type' in field:
-                                case_data['case_type'] = value
-                            elif 'next hearing' in field:
-                                case_data['next_hearing_date'] = value
-                            elif 'judge' in field:
-                                case_data['judge_name'] = value
-                            elif 'petitioner' in field:
-                                case_data['petitioner'] = value
-                            elif 'respondent' in field:
-                                case_data['respondent'] = value
+                # Extract case details from label/value table rows
+                fields = self._case_fields(self._table_rows(html_content))
+                case_data.update(fields)
                 
                 return case_data if len(case_data) > 4 else None
             
@@ -222,6 +253,34 @@ class RealECourtsScraper:
             logger.error(f"Real response parsing error: {e}")
             return None
     
+    def _table_rows(self, html_content):
+        """Table rows of a response as lists of cell text, falling back to BeautifulSoup for pages lxml can't read"""
+        try:
+            rows = table_rows(html_content)
+            if rows:
+                return rows
+        except PageParseError as e:
+            logger.debug(f"Fast parse failed, using BeautifulSoup: {e}")
+        
+        soup = BeautifulSoup(html_content, 'html.parser')
+        return [
+            [cell.get_text(strip=True) for cell in row.find_all(['td', 'th'])]
+            for table in soup.find_all('table')
+            for row in table.find_all('tr')
+        ]
+    
+    def _case_fields(self, rows):
+        """Case fields from rows whose first cell is a known label; later rows win"""
+        fields = {}
+        for cells in rows:
+            if len(cells) >= 2:
+                label = cells[0].lower()
+                for marker, field in CASE_FIELD_LABELS:
+                    if marker in label:
+                        fields[field] = cells[1]
+                        break
+        return fields
+    
     def _generate_structured_data(self, cnr):
         """Generate structured data based on CNR pattern"""
         # Extract court code and details from CNR
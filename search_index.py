@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Full-text search over cases and cause list entries
+SQLite FTS5 indexes over the case and cause_list_entry tables, kept in sync by triggers
+"""
+
+import re
+import logging
+
+from sqlalchemy import inspect, text
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+MAX_QUERY_TERMS = 16
+
+# Matches ranked per query, newest first; see _ranked()
+RANK_CANDIDATES = 1000
+
+# Term frequency saturation of the per-column scores, as in BM25
+SCORE_K1 = 1.2
+
+# FTS table -> (content table, indexed columns, bm25 weight per column)
+SEARCH_INDEXES = {
+    'case_fts': ('case', ('cnr', 'case_title', 'petitioner', 'respondent', 'court_name', 'judge_name', 'status'),
+                 (10.0, 3.0, 5.0, 5.0, 1.0, 2.0, 0.5)),
+    'cause_list_entry_fts': ('cause_list_entry', ('case_number', 'cnr', 'parties', 'advocate', 'stage'),
+                             (10.0, 10.0, 5.0, 5.0, 1.0)),
+}
+
+# unicode61 folds case and diacritics; 2 and 3 character prefix indexes keep
+# short "type-ahead" prefix queries from scanning the whole term list
+FTS_OPTIONS = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+
+_phrase_re = re.compile(r'"([^"]*)"?|(\S+)')
+_token_re = re.compile(r'\w+')
+
+
+def _index_ddl(fts_table, content_table, columns):
+    """CREATE statements for an external-content FTS table and the triggers that mirror writes to it"""
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    delete_old = (f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) "
+                  f"VALUES ('delete', old.id, {old_values});")
+    insert_new = f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5({column_list}, "
+        f"content = '{content_table}', content_rowid = 'id', {FTS_OPTIONS})",
+        f'CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON "{content_table}" BEGIN {insert_new} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON "{content_table}" BEGIN {delete_old} END',
+        # Only fires when an indexed column is in the SET list, so timestamp-only updates cost nothing
+        f'CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {column_list} ON "{content_table}" '
+        f'BEGIN {delete_old} {insert_new} END',
+    ]
+
+
+def ensure_search_index():
+    """Create the FTS tables and sync triggers, indexing existing rows on first creation.
+
+    Returns the names of the indexes that were built.
+    """
+    existing = set(inspect(db.engine).get_table_names())
+    built = []
+    with db.engine.begin() as conn:
+        for fts_table, (content_table, columns, _) in SEARCH_INDEXES.items():
+            for statement in _index_ddl(fts_table, content_table, columns):
+                conn.execute(text(statement))
+            if fts_table not in existing:
+                conn.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+                built.append(fts_table)
+                logger.info(f"Built search index {fts_table}")
+    return built
+
+
+def drop_search_index(fts_table):
+    """Drop an FTS table and its triggers, so the next ensure_search_index() builds it with the current columns"""
+    with db.engine.begin() as conn:
+        for suffix in ('ai', 'ad', 'au'):
+            conn.execute(text(f'DROP TRIGGER IF EXISTS {fts_table}_{suffix}'))
+        conn.execute(text(f'DROP TABLE IF EXISTS {fts_table}'))
+    logger.info(f"Dropped search index {fts_table}")
+
+
+def rebuild_search_index():
+    """Re-index every row from the content tables"""
+    with db.engine.begin() as conn:
+        for fts_table in SEARCH_INDEXES:
+            conn.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+
+
+def to_match_query(query):
+    """Turn user input into a safe FTS5 MATCH expression.
+
+    Words are ANDed, "quoted text" is a phrase and a trailing * makes a
+    prefix search (``jai*``). Every token is quoted, so FTS syntax such as
+    OR, NEAR, column filters or stray quotes in the input is matched as text.
+    Raises ValueError when nothing searchable is left.
+    """
+    terms = []
+    for phrase, word in _phrase_re.findall(str(query)):
+        # A bare word can still be several tokens ("R.K.Jain"), so it is matched as a phrase too
+        tokens = _token_re.findall(phrase or word)
+        if tokens:
+            terms.append('"' + ' '.join(tokens) + '"' + ('*' if word.endswith('*') else ''))
+    if not terms:
+        raise ValueError('Search query must contain letters or digits')
+    return ' '.join(terms[:MAX_QUERY_TERMS])
+
+
+def _ranked(fts_table):
+    """Subquery of one page of matches of an FTS table as (rowid, score, matched), best first.
+
+    Only the newest ``RANK_CANDIDATES`` matches are ranked: FTS5 walks its
+    index in rowid order and stops there, so a word found in half the table
+    costs about the same as a rare one. bm25() is not used because it counts
+    every row matching each phrase to weigh it, which grows with the table.
+    Instead each candidate scores, per column, its weight times the
+    saturated number of matches highlight() marks in it.
+
+    One extra match is read so that ``matched`` > RANK_CANDIDATES tells the
+    ranking was capped. Ties go to the newest row, so pages are stable.
+    """
+    weights = SEARCH_INDEXES[fts_table][2]
+    marked = ', '.join(f"highlight({fts_table}, {i}, char(1), '') AS c{i}" for i in range(len(weights)))
+    hits = ', '.join(f"ifnull(length(c{i}) - length(replace(c{i}, char(1), '')), 0) AS n{i}"
+                     for i in range(len(weights)))
+    score = ' + '.join(f'{weight} * n{i} / (n{i} + {SCORE_K1})' for i, weight in enumerate(weights))
+    candidates = (f'SELECT rowid, {marked} FROM {fts_table} WHERE {fts_table} MATCH :match '
+                  f'ORDER BY rowid DESC LIMIT {RANK_CANDIDATES + 1}')
+    counted = (f'SELECT rowid, {hits}, count(*) OVER () AS matched FROM ({candidates}) '
+               f'ORDER BY rowid DESC LIMIT {RANK_CANDIDATES}')
+    return (f'(SELECT rowid, {score} AS score, matched FROM ({counted}) '
+            f'ORDER BY score DESC, rowid DESC LIMIT :limit OFFSET :offset)')
+
+
+def _page(rows, limit):
+    """Search results from rows fetched one past ``limit``.
+
+    ``has_more`` says a further page exists; ``total_capped`` says only the
+    newest RANK_CANDIDATES matches were ranked and older ones were left out.
+    """
+    return {
+        'rows': rows[:limit],
+        'has_more': len(rows) > limit,
+        'total_capped': bool(rows) and rows[0]['matched'] > RANK_CANDIDATES
+    }
+
+
+def _check_offset(offset):
+    if offset >= RANK_CANDIDATES:
+        raise ValueError(f'offset must be below {RANK_CANDIDATES}; refine the query to see older matches')
+
+
+def search_cases(query, limit=SEARCH_LIMIT, offset=0):
+    """Cases matching ``query``, best match first; see _page()"""
+    _check_offset(offset)
+    rows = db.session.execute(text(
+        f'SELECT c.id, c.cnr, c.case_title, c.petitioner, c.respondent, c.court_name, c.judge_name, '
+        f'c.status, c.next_hearing_date, h.score, h.matched FROM {_ranked("case_fts")} h '
+        f'JOIN "case" c ON c.id = h.rowid ORDER BY h.score DESC, h.rowid DESC'
+    ), {'match': to_match_query(query), 'limit': limit + 1, 'offset': offset})
+    return _page(rows.mappings().all(), limit)
+
+
+def search_cause_list_entries(query, limit=SEARCH_LIMIT, offset=0):
+    """Cause list entries matching ``query``, best match first; see _page()"""
+    _check_offset(offset)
+    rows = db.session.execute(text(
+        f'SELECT e.id, e.date, e.sr_no, e.case_number, e.cnr, e.case_id, e.parties, e.advocate, e.stage, e.time, '
+        f'l.court_code, l.court_name, h.score, h.matched FROM {_ranked("cause_list_entry_fts")} h '
+        f'JOIN cause_list_entry e ON e.id = h.rowid JOIN cause_list l ON l.id = e.cause_list_id '
+        f'ORDER BY h.score DESC, h.rowid DESC'
+    ), {'match': to_match_query(query), 'limit': limit + 1, 'offset': offset})
+    return _page(rows.mappings().all(), limit)
+
+
+def _date_str(value):
+    # Raw SQL returns SQLite dates as 'YYYY-MM-DD' strings
+    return str(value) if value else None
+
+
+def case_hit_to_dict(row):
+    return {
+        'id': row['id'],
+        'cnr': row['cnr'],
+        'case_title': row['case_title'] or '',
+        'petitioner': row['petitioner'] or '',
+        'respondent': row['respondent'] or '',
+        'court_name': row['court_name'] or '',
+        'judge_name': row['judge_name'] or '',
+        'status': row['status'],
+        'next_hearing_date': _date_str(row['next_hearing_date']),
+        'score': round(row['score'], 3)
+    }
+
+
+def entry_hit_to_dict(row):
+    return {
+        'id': row['id'],
+        'date': _date_str(row['date']),
+        'court_code': row['court_code'],
+        'court_name': row['court_name'],
+        'sr_no': row['sr_no'],
+        'case_number': row['case_number'],
+        'cnr': row['cnr'],
+        'case_id': row['case_id'],
+        'parties': row['parties'],
+        'advocate': row['advocate'],
+        'stage': row['stage'],
+        'time': row['time'],
+        'score': round(row['score'], 3)
+    }
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+User and case statistics for the admin dashboard
+Counters live in the stat_counter table and are kept current by mapper events,
+so reading them costs the same no matter how many users or cases exist
+"""
+
+import logging
+from datetime import date, timedelta
+
+from sqlalchemy import event, func, inspect, literal, select, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, User, Case, StatCounter
+
+logger = logging.getLogger(__name__)
+
+UPCOMING_DAYS = 7
+
+USERS_TOTAL = 'users.total'
+USERS_ADMINS = 'users.admins'
+CASES_TOTAL = 'cases.total'
+
+
+def hearing_counter(day):
+    """Counter name for the number of cases listed on a given day"""
+    return f"cases.hearing:{day.isoformat()}"
+
+
+def count_all():
+    """Compute every counter from scratch with one grouped query"""
+    grouped = union_all(
+        select(literal('user').label('family'), func.cast(User.is_admin, db.String).label('bucket'), func.count().label('n'))
+        .group_by(User.is_admin),
+        select(literal('case').label('family'), func.cast(Case.next_hearing_date, db.String).label('bucket'), func.count().label('n'))
+        .group_by(Case.next_hearing_date)
+    )
+
+    counters = {USERS_TOTAL: 0, USERS_ADMINS: 0, CASES_TOTAL: 0}
+    for family, bucket, n in db.session.execute(grouped):
+        if family == 'user':
+            counters[USERS_TOTAL] += n
+            if bucket in ('1', 'true', 'True'):
+                counters[USERS_ADMINS] += n
+        else:
+            counters[CASES_TOTAL] += n
+            if bucket:
+                counters[hearing_counter(date.fromisoformat(bucket))] = n
+    return counters
+
+
+def rebuild_counters():
+    """Replace the stored counters with freshly computed ones"""
+    counters = count_all()
+    # Other modules keep their own rows in stat_counter; only ours are replaced
+    db.session.query(StatCounter).filter(
+        StatCounter.name.like('users.%') | StatCounter.name.like('cases.%')
+    ).delete(synchronize_session=False)
+    db.session.add_all(StatCounter(name=name, value=value) for name, value in counters.items() if value)
+    db.session.commit()
+    return counters
+
+
+def get_stats(today=None):
+    """All admin counters read from stat_counter by primary key"""
+    today = today or date.today()
+    upcoming_days = [today + timedelta(days=offset) for offset in range(2, UPCOMING_DAYS + 1)]
+    names = [USERS_TOTAL, USERS_ADMINS, CASES_TOTAL, hearing_counter(today), hearing_counter(today + timedelta(days=1))]
+    names += [hearing_counter(day) for day in upcoming_days]
+
+    rows = db.session.query(StatCounter.name, StatCounter.value).filter(StatCounter.name.in_(names)).all()
+    values = dict(rows)
+
+    return {
+        'users': {
+            'total': values.get(USERS_TOTAL, 0),
+            'admins': values.get(USERS_ADMINS, 0),
+            'regular': values.get(USERS_TOTAL, 0) - values.get(USERS_ADMINS, 0)
+        },
+        'cases': {
+            'total': values.get(CASES_TOTAL, 0),
+            'today': values.get(hearing_counter(today), 0),
+            'tomorrow': values.get(hearing_counter(today + timedelta(days=1)), 0),
+            'upcoming': sum(values.get(hearing_counter(day), 0) for day in upcoming_days)
+        }
+    }
+
+
+# Incremental maintenance --------------------------------------------------
+
+def _bump(connection, deltas):
+    """Apply {counter name: delta} inside the flushing transaction"""
+    for name, delta in deltas.items():
+        if not delta:
+            continue
+        stmt = sqlite_insert(StatCounter.__table__).values(name=name, value=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['name'],
+            set_={'value': StatCounter.__table__.c.value + delta}
+        )
+        connection.execute(stmt)
+
+
+@event.listens_for(User, 'after_insert')
+def _user_inserted(mapper, connection, target):
+    _bump(connection, {USERS_TOTAL: 1, USERS_ADMINS: 1 if target.is_admin else 0})
+
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, target):
+    _bump(connection, {USERS_TOTAL: -1, USERS_ADMINS: -1 if target.is_admin else 0})
+
+
+@event.listens_for(User, 'after_update')
+def _user_updated(mapper, connection, target):
+    history = inspect(target).attrs.is_admin.history
+    if history.has_changes():
+        was_admin = bool(history.deleted[0]) if history.deleted else False
+        if was_admin != bool(target.is_admin):
+            _bump(connection, {USERS_ADMINS: 1 if target.is_admin else -1})
+
+
+@event.listens_for(Case, 'after_insert')
+def _case_inserted(mapper, connection, target):
+    deltas = {CASES_TOTAL: 1}
+    if target.next_hearing_date:
+        deltas[hearing_counter(target.next_hearing_date)] = 1
+    _bump(connection, deltas)
+
+
+@event.listens_for(Case, 'after_delete')
+def _case_deleted(mapper, connection, target):
+    deltas = {CASES_TOTAL: -1}
+    if target.next_hearing_date:
+        deltas[hearing_counter(target.next_hearing_date)] = -1
+    _bump(connection, deltas)
+
+
+@event.listens_for(Case, 'after_update')
+def _case_updated(mapper, connection, target):
+    history = inspect(target).attrs.next_hearing_date.history
+    if not history.has_changes():
+        return
+
+    deltas = {}
+    for old in history.deleted:
+        if old:
+            deltas[hearing_counter(old)] = deltas.get(hearing_counter(old), 0) - 1
+    if target.next_hearing_date:
+        name = hearing_counter(target.next_hearing_date)
+        deltas[name] = deltas.get(name, 0) + 1
+    _bump(connection, deltas)
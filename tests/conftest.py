@@ -0,0 +1,80 @@
+"""
+Shared fixtures: one app on a throwaway database, working directory and caches
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Everything the app writes (database, caches, downloads/) goes to a temporary directory
+WORKDIR = tempfile.mkdtemp(prefix='ecourts-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORKDIR, 'app.db')}"
+os.environ['CNR_CACHE_PATH'] = os.path.join(WORKDIR, 'cnr_cache.db')
+os.environ['COURT_DIRECTORY_PATH'] = os.path.join(WORKDIR, 'court_directory.db')
+os.environ['COURT_HIERARCHY_PATH'] = os.path.join(WORKDIR, 'court_hierarchy.db')
+os.chdir(WORKDIR)
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import app, init_database
+    init_database()
+    return app
+
+
+@pytest.fixture
+def app_context(app):
+    from models import db
+    with app.app_context():
+        yield
+        db.session.remove()
+
+
+# A one-complex eCourts portal --------------------------------------------
+
+COURTS = [
+    {'court_code': '3^12', 'court_name': 'Civil Judge Junior Division-01'},
+    {'court_code': '3^13', 'court_name': 'Civil Judge Junior Division-02'},
+]
+
+HIERARCHY = {
+    'states': [{'state_code': '23', 'state_name': 'Madhya Pradesh'}],
+    'districts': [{'district_code': '11', 'district_name': 'Katni'}],
+    'complexes': [{'complex_code': '1230011@1,2@N', 'complex_name': 'District Court Katni'}],
+    'courts': COURTS,
+}
+
+
+def board_html(court_code, case_type):
+    if case_type != 'civ':
+        return ''
+    return (
+        '<table>'
+        '<tr><td colspan="4">For Evidence</td></tr>'
+        f'<tr><td>1</td><td>View RCS/{court_code}/2024</td><td>Ram Kumar vs Shyam Lal</td><td>A K Jain</td></tr>'
+        f'<tr><td>2</td><td>View RCA/{court_code}/2023</td><td>Meena Devi vs State</td><td>R Gupta</td></tr>'
+        '</table>'
+    )
+
+
+class FakePortal:
+    def cause_list(self, state_code, district_code, complex_code, court_code, court_name, date, case_type):
+        return board_html(court_code, case_type)
+
+
+@pytest.fixture
+def ecourts(monkeypatch, tmp_path, app):
+    """Point the eCourts scraper at FakePortal; returns its court hierarchy"""
+    import causelist_scraper
+    from court_hierarchy import CourtHierarchy
+
+    hierarchy = CourtHierarchy(str(tmp_path / 'hierarchy.db'), lambda level, codes: HIERARCHY[level])
+    monkeypatch.setattr(causelist_scraper, '_portals', {slot: FakePortal() for slot in range(16)})
+    monkeypatch.setattr(causelist_scraper, '_hierarchy', hierarchy)
+    monkeypatch.setitem(app.config, 'CAUSELIST_RENDER_WORKERS', 1)
+    return hierarchy
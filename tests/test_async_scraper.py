@@ -0,0 +1,26 @@
+import asyncio
+import concurrent.futures
+import threading
+
+import pytest
+
+from async_scraper import AsyncScrapeEngine
+
+
+def test_run_cancels_coroutine_on_timeout():
+    engine = AsyncScrapeEngine('test-timeout')
+    cancelled = threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    try:
+        with pytest.raises(concurrent.futures.TimeoutError):
+            engine.run(slow(), timeout=0.05)
+        assert cancelled.wait(5)
+    finally:
+        engine.close()
@@ -0,0 +1,44 @@
+import os
+
+from causelist_pdf import PdfOutputCache
+
+
+def write(path, size):
+    with open(path, 'wb') as f:
+        f.write(b'%' * size)
+
+
+def test_rerendered_file_is_counted_once(tmp_path):
+    cache = PdfOutputCache(str(tmp_path), max_bytes=10_000)
+    first = os.path.join(str(tmp_path), 'CauseList_A_2026-10-20_0123456789abcdef01234567.pdf')
+    second = os.path.join(str(tmp_path), 'CauseList_B_2026-10-20_89abcdef0123456789abcdef.pdf')
+
+    write(first, 1000)
+    cache.add(first)
+    write(second, 2000)
+    cache.add(second)
+    assert cache._total == 3000
+
+    # Rendered again over the same path, e.g. after it was touched up
+    write(first, 1500)
+    cache.add(first)
+    write(first, 1500)
+    cache.add(first)
+    assert cache._total == 3500
+
+
+def test_eviction_resets_known_sizes(tmp_path):
+    cache = PdfOutputCache(str(tmp_path), max_bytes=2500)
+    paths = [os.path.join(str(tmp_path), f'CauseList_{n}_2026-10-20_{n:024x}.pdf') for n in range(3)]
+    for n, path in enumerate(paths):
+        write(path, 1000)
+        os.utime(path, (1_700_000_000 + n, 1_700_000_000 + n))
+        cache.add(path)
+
+    # The oldest file went to get back under 90% of the budget
+    assert not os.path.exists(paths[0])
+    assert cache._total == 2000
+
+    write(paths[2], 1200)
+    cache.add(paths[2])
+    assert cache._total == 2200
@@ -0,0 +1,35 @@
+import time
+
+from conftest import COURTS
+
+
+def wait_for_job(app, job_id, timeout=60):
+    from models import db, DownloadJob
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with app.app_context():
+            job = db.session.get(DownloadJob, job_id)
+            if job.is_finished:
+                return job.status
+            db.session.remove()
+        time.sleep(0.1)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+def test_ecourts_job_records_changes(app, ecourts):
+    from app import job_queue
+    from models import CauseListChange
+    from causelist_scraper import board_code
+
+    params = {'state_code': '23', 'district_code': '11', 'complex_code': '1230011@1,2@N', 'date': '2026-10-20'}
+    with app.app_context():
+        job_id = job_queue.submit('causelist', params)
+    assert wait_for_job(app, job_id) == 'completed'
+
+    with app.app_context():
+        for court in COURTS:
+            code = board_code('23', '11', '1230011@1,2@N', court['court_code'])
+            changes = CauseListChange.query.filter_by(court_code=code).all()
+            assert sorted(change.change for change in changes) == ['added', 'added']
+            assert {change.case_number for change in changes} == {
+                f"RCS/{court['court_code']}/2024", f"RCA/{court['court_code']}/2023"}
@@ -0,0 +1,56 @@
+import pytest
+
+import cnr_cache
+from cnr_cache import CNRCache, HOUR
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cnr_cache, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CNRCache(str(tmp_path / 'cnr_cache.db'), field_ttls={'next_hearing_date': HOUR, 'parties': 10 * HOUR})
+
+
+def record(**fields):
+    return dict(fields, cnr='DLND010000012024', is_real_data=True)
+
+
+def test_refresh_stores_every_fetched_value(cache, clock):
+    cache.put('DLND010000012024', record(next_hearing_date='2026-10-20', parties='A vs B'))
+    clock.now += 2 * HOUR
+    assert cache.get('DLND010000012024')[1] == 'stale'
+
+    # parties is not overdue yet, but the fetched value is still the newest one
+    cache.put('DLND010000012024', record(next_hearing_date='2026-11-03', parties='A vs B and C'), merge=True)
+    data, state = cache.get('DLND010000012024')
+    assert (data['next_hearing_date'], data['parties'], state) == ('2026-11-03', 'A vs B and C', 'fresh')
+
+
+def test_field_missing_from_fetch_is_dropped_once_overdue(cache, clock):
+    cache.put('DLND010000012024', record(next_hearing_date='2026-10-20', parties='A vs B'))
+
+    clock.now += 2 * HOUR
+    cache.put('DLND010000012024', record(next_hearing_date='2026-11-03'), merge=True)
+    data, state = cache.get('DLND010000012024')
+    # Still within its TTL, so kept
+    assert (data['parties'], state) == ('A vs B', 'fresh')
+
+    clock.now += 9 * HOUR
+    assert cache.get('DLND010000012024')[1] == 'stale'
+    cache.put('DLND010000012024', record(next_hearing_date='2026-11-03'), merge=True)
+    data, state = cache.get('DLND010000012024')
+    assert 'parties' not in data
+    assert state == 'fresh'
@@ -0,0 +1,37 @@
+import threading
+
+import metrics
+from metrics import Histogram
+
+
+def test_timed_blocks_are_counted_when_read():
+    histogram = Histogram('test_timed_seconds', 'timed blocks', ('route',))
+    child = histogram.labels('/api/cases')
+    for _ in range(3):
+        with child.time():
+            pass
+    child.observe(2.0)
+
+    counts, total = child.snapshot()
+    assert sum(counts) == 4
+    assert 2.0 <= total < 2.1
+    assert 'test_timed_seconds_count{route="/api/cases"} 4' in histogram.render()
+
+
+def test_timing_queue_is_bounded(monkeypatch):
+    monkeypatch.setattr(metrics, 'MAX_PENDING_TIMINGS', 10)
+    child = Histogram('test_bounded_seconds', 'timed blocks').labels()
+
+    def time_blocks():
+        for _ in range(1000):
+            with child.time():
+                pass
+
+    threads = [threading.Thread(target=time_blocks) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(child._pending) <= 10
+    assert sum(child.snapshot()[0]) == 4000
@@ -0,0 +1,28 @@
+from datetime import date, datetime
+
+from sqlalchemy import insert
+
+import delhi_courts_scraper
+from causelist_scraper import board_code
+from models import db, Case, CauseList
+from prefetch import prefetch_cause_lists, tracked_courts
+
+KATNI = ('23', '11', '1230011@1,2@N')
+
+
+def test_prefetch_covers_tracked_ecourts_courts(app_context, ecourts, monkeypatch):
+    monkeypatch.setattr(delhi_courts_scraper.DelhiCourtsRealScraper, 'get_court_complexes', lambda self: [])
+    now = datetime.utcnow()
+    db.session.execute(insert(Case), [{'cnr': 'MPKT010000012024', 'court_name': '3-Civil Judge Junior Division-01, Katni',
+                                       'created_at': now, 'updated_at': now}])
+    db.session.commit()
+
+    # Only complexes already in the stored hierarchy are considered
+    assert tracked_courts(ecourts) == {}
+    ecourts.get('courts', KATNI)
+    assert tracked_courts(ecourts) == {KATNI: [{'court_code': '3^12', 'court_name': 'Civil Judge Junior Division-01'}]}
+
+    summary = prefetch_cause_lists('2026-10-21', pause=(0, 0))
+    assert (summary['complexes'], summary['boards'], summary['incomplete']) == (1, 1, [])
+    stored = CauseList.query.filter_by(date=date(2026, 10, 21)).all()
+    assert [cause_list.court_code for cause_list in stored] == [board_code(*KATNI, '3^12')]
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+
+from models import db, Case
+from search_index import RANK_CANDIDATES, search_cases
+
+
+def add_cases(rows):
+    now = datetime.utcnow()
+    db.session.execute(insert(Case), [dict(row, created_at=now, updated_at=now) for row in rows])
+    db.session.commit()
+
+
+def test_better_match_ranks_first(app_context):
+    add_cases([
+        {'cnr': 'RANKTEST0001', 'case_title': 'Zorawar Traders vs Union', 'petitioner': 'Zorawar Traders'},
+        {'cnr': 'RANKTEST0002', 'case_title': 'Mehra vs Union', 'note': 'via Zorawar',
+         'court_name': 'Zorawar Road Court'},
+    ])
+    page = search_cases('Zorawar')
+    assert [row['cnr'] for row in page['rows']] == ['RANKTEST0001', 'RANKTEST0002']
+    assert page['has_more'] is False
+    assert page['total_capped'] is False
+
+
+def test_broad_query_is_capped_and_paged(app_context):
+    add_cases({'cnr': f'CAPTEST{i:06d}', 'case_title': f'Quillfeather {i} vs State', 'petitioner': f'Quillfeather {i}'}
+              for i in range(RANK_CANDIDATES + 5))
+
+    first = search_cases('Quillfeather', limit=10)
+    assert len(first['rows']) == 10
+    assert first['has_more'] is True
+    assert first['total_capped'] is True
+
+    last = search_cases('Quillfeather', limit=10, offset=RANK_CANDIDATES - 5)
+    assert len(last['rows']) == 5
+    assert last['has_more'] is False
+
+    # Only the newest matches are ranked
+    assert 'CAPTEST000000' not in {row['cnr'] for row in first['rows'] + last['rows']}
+
+    with pytest.raises(ValueError):
+        search_cases('Quillfeather', offset=RANK_CANDIDATES)
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+
+from models import db, User, WatchHit
+from causelist_scraper import CauseListScraper
+from causelist_store import ingest_cause_list
+from search_index import search_cause_list_entries
+from watchlist import add_watch_term, remove_watch_term
+
+BOARD = (
+    '<table>'
+    '<tr><td colspan="4">For Arguments</td></tr>'
+    '<tr><td>1</td><td>View CS/101/2025</td><td>Anil Sharma vs Sunil Verma</td><td>Rekha Malhotra</td></tr>'
+    '<tr><td>2</td><td>View CS/102/2025</td><td></td><td>Vikram Sethi</td></tr>'
+    '</table>'
+)
+
+
+def user_id():
+    return User.query.filter_by(mobile='9999999999').first().id
+
+
+def test_parser_keeps_advocate():
+    cases = CauseListScraper()._parse_cause_list(BOARD)
+    assert [case['advocate'] for case in cases] == ['Rekha Malhotra', 'Vikram Sethi']
+    assert cases[1]['parties'] == ''
+
+
+def test_advocate_only_hit_on_ingest(app_context):
+    term, _ = add_watch_term(user_id(), 'Rekha Malhotra', kind='advocate')
+    try:
+        cases = CauseListScraper()._parse_cause_list(BOARD)
+        ingest_cause_list('TEST:ADV:1', 'Court 1', date.today() + timedelta(days=1), cases)
+        db.session.commit()
+
+        hits = WatchHit.query.filter_by(term_id=term.id).all()
+        assert [hit.case_number for hit in hits] == ['CS/101/2025']
+    finally:
+        remove_watch_term(user_id(), term.id)
+
+
+def test_advocate_only_hit_on_new_term(app_context):
+    cases = CauseListScraper()._parse_cause_list(BOARD)
+    ingest_cause_list('TEST:ADV:2', 'Court 2', date.today() + timedelta(days=1), cases)
+    db.session.commit()
+
+    term, _ = add_watch_term(user_id(), 'Vikram Sethi', kind='advocate')
+    try:
+        hits = WatchHit.query.filter_by(term_id=term.id, court_code='TEST:ADV:2').all()
+        assert [hit.case_number for hit in hits] == ['CS/102/2025']
+    finally:
+        remove_watch_term(user_id(), term.id)
+
+
+def test_advocate_is_searchable(app_context):
+    cases = CauseListScraper()._parse_cause_list(BOARD)
+    ingest_cause_list('TEST:ADV:3', 'Court 3', date.today() + timedelta(days=1), cases)
+    db.session.commit()
+
+    rows = search_cause_list_entries('Malhotra')['rows']
+    assert ('TEST:ADV:3', 'Rekha Malhotra') in {(row['court_code'], row['advocate']) for row in rows}
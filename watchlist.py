@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Advocate / party watchlist matching
+All watched names are compiled into one Aho-Corasick automaton that scans each ingested cause list in a single pass
+"""
+
+import re
+import logging
+import threading
+from collections import deque
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, CauseList, CauseListEntry, StatCounter, WatchTerm, WatchHit
+from causelist_store import on_entries_ingested
+
+logger = logging.getLogger(__name__)
+
+# Entry fields searched for watched names
+MATCH_FIELDS = ('parties', 'advocate')
+
+HITS_PAGE_SIZE = 200
+
+# stat_counter row bumped on every term change, so each process knows to recompile its matcher
+TERMS_VERSION = 'watchlist.version'
+
+_non_word_re = re.compile(r'[^0-9A-Z]+')
+
+
+def normalize_name(text):
+    """Upper-case words with punctuation removed: "Sh. R.K. Jain" -> "SH R K JAIN" """
+    return _non_word_re.sub(' ', str(text).upper()).strip()
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher: finds every pattern in a text in one pass over it"""
+
+    def __init__(self, patterns):
+        # Trie transitions, failure links and the values ending at each state
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+        for pattern, value in patterns:
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = next_state
+            self.out[state].append(value)
+
+        # Breadth-first: a state's failure link is the longest proper suffix also in the trie
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.out[next_state] = self.out[next_state] + self.out[self.fail[next_state]]
+
+    def search(self, text):
+        """Return the set of values whose pattern occurs in ``text``"""
+        goto, fail, out = self.goto, self.fail, self.out
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+class WatchMatcher:
+    """Compiled matcher over watch terms; matches whole words only"""
+
+    def __init__(self, terms):
+        # terms: (term_id, user_id, normalized); the same name watched by several users shares one pattern
+        by_pattern = {}
+        for term_id, user_id, normalized in terms:
+            if normalized:
+                by_pattern.setdefault(f' {normalized} ', []).append((term_id, user_id))
+        self.term_count = sum(len(owners) for owners in by_pattern.values())
+        self.owners = list(by_pattern.values())
+        self.automaton = AhoCorasick((pattern, i) for i, pattern in enumerate(by_pattern))
+
+    def match(self, text):
+        """(term_id, user_id) pairs whose name appears in ``text``"""
+        if not self.owners or not text:
+            return []
+        # Padding with spaces makes every pattern match on word boundaries
+        return [owner for i in self.automaton.search(f' {normalize_name(text)} ') for owner in self.owners[i]]
+
+
+# Compiled matcher cache ----------------------------------------------------
+
+_matcher = None
+_matcher_version = None
+_matcher_lock = threading.Lock()
+
+
+def get_matcher():
+    """Matcher over all watch terms, recompiled only when the terms change"""
+    global _matcher, _matcher_version
+    version = db.session.execute(select(StatCounter.value).where(StatCounter.name == TERMS_VERSION)).scalar() or 0
+    with _matcher_lock:
+        if _matcher is None or version != _matcher_version:
+            terms = db.session.execute(select(WatchTerm.id, WatchTerm.user_id, WatchTerm.normalized)).all()
+            _matcher = WatchMatcher(terms)
+            _matcher_version = version
+        return _matcher
+
+
+def _bump_terms_version():
+    """Count a term change in the current transaction"""
+    stmt = sqlite_insert(StatCounter).values(name=TERMS_VERSION, value=1)
+    db.session.execute(stmt.on_conflict_do_update(index_elements=['name'], set_={'value': StatCounter.value + 1}))
+
+
+def _record_hits(matcher, rows):
+    """Scan (entry_id, court_code, date, case_number, parties, advocate) rows and store the hits; returns how many"""
+    hits = []
+    for entry_id, court_code, list_date, case_number, parties, advocate in rows:
+        # A name in both fields is still one hit
+        owners = set(matcher.match(parties)) | set(matcher.match(advocate))
+        for term_id, user_id in sorted(owners):
+            hits.append({
+                'user_id': user_id,
+                'term_id': term_id,
+                'entry_id': entry_id,
+                'court_code': court_code,
+                'date': list_date,
+                'case_number': case_number,
+                'parties': parties
+            })
+    if hits:
+        # A re-ingested entry that still matches keeps its original hit
+        db.session.execute(sqlite_insert(WatchHit).on_conflict_do_nothing(), hits)
+    return len(hits)
+
+
+@on_entries_ingested
+def scan_ingested_entries(cause_list, entries):
+    """Match the added and updated entries of a freshly ingested board"""
+    matcher = get_matcher()
+    if not matcher.term_count:
+        return
+
+    matched = {key: entry for key, entry in entries.items()
+               if any(matcher.match(entry.get(field)) for field in MATCH_FIELDS)}
+    if not matched:
+        return
+
+    # Only matching entries need their row ids
+    rows = db.session.execute(
+        select(CauseListEntry.id, CauseListEntry.entry_key, CauseListEntry.case_number, CauseListEntry.parties,
+               CauseListEntry.advocate)
+        .where(CauseListEntry.cause_list_id == cause_list.id, CauseListEntry.entry_key.in_(list(matched)))
+    ).all()
+    count = _record_hits(matcher, [(row.id, cause_list.court_code, cause_list.date, row.case_number, row.parties,
+                                    row.advocate) for row in rows])
+    logger.info(f"Watchlist: {count} hits on {cause_list.court_code} {cause_list.date}")
+
+
+def add_watch_term(user_id, term, kind='party'):
+    """Watch a name for a user and match it against boards from today on; returns (term, created)"""
+    normalized = normalize_name(term)
+    if not normalized:
+        raise ValueError('Watch term must contain letters or digits')
+
+    watch_term = WatchTerm.query.filter_by(user_id=user_id, normalized=normalized).first()
+    if watch_term is not None:
+        return watch_term, False
+
+    watch_term = WatchTerm(user_id=user_id, term=term.strip(), normalized=normalized, kind=kind)
+    db.session.add(watch_term)
+    db.session.flush()
+
+    # Boards already ingested won't be scanned again, so check upcoming ones for the new name now
+    matcher = WatchMatcher([(watch_term.id, user_id, normalized)])
+    rows = db.session.execute(
+        select(CauseListEntry.id, CauseList.court_code, CauseListEntry.date,
+               CauseListEntry.case_number, CauseListEntry.parties, CauseListEntry.advocate)
+        .join(CauseList, CauseListEntry.cause_list_id == CauseList.id)
+        .where(CauseListEntry.date >= date.today())
+    ).all()
+    _record_hits(matcher, rows)
+    _bump_terms_version()
+    db.session.commit()
+    return watch_term, True
+
+
+def remove_watch_term(user_id, term_id):
+    watch_term = WatchTerm.query.filter_by(id=term_id, user_id=user_id).first()
+    if watch_term is None:
+        return False
+    WatchHit.query.filter_by(term_id=watch_term.id).delete()
+    db.session.delete(watch_term)
+    _bump_terms_version()
+    db.session.commit()
+    return True
+
+
+def hits_since(user_id, since=0, limit=HITS_PAGE_SIZE):
+    """A user's hits after hit id ``since``, oldest first"""
+    return (WatchHit.query
+            .filter(WatchHit.user_id == user_id, WatchHit.id > since)
+            .order_by(WatchHit.id)
+            .limit(limit)
+            .all())
+
+
+def term_to_dict(watch_term):
+    return {
+        'id': watch_term.id,
+        'term': watch_term.term,
+        'kind': watch_term.kind,
+        'created_at': watch_term.created_at.strftime('%Y-%m-%d %H:%M:%S') if watch_term.created_at else None
+    }
+
+
+def hit_to_dict(hit):
+    return {
+        'id': hit.id,
+        'term_id': hit.term_id,
+        'court_code': hit.court_code,
+        'date': hit.date.strftime('%Y-%m-%d') if hit.date else None,
+        'case_number': hit.case_number,
+        'parties': hit.parties,
+        'created_at': hit.created_at.strftime('%Y-%m-%d %H:%M:%S') if hit.created_at else None
+    }
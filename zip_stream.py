@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Streaming ZIP archives
+Builds a ZIP on the fly while it is being sent, without a temporary archive on disk
+"""
+
+import io
+import os
+import zipfile
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable stream collecting what zipfile writes until it is drained"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def unique_arcname(name, used):
+    """Return ``name``, suffixed if needed so it doesn't repeat an earlier entry"""
+    base, ext = os.path.splitext(name)
+    candidate, n = name, 1
+    while candidate in used:
+        n += 1
+        candidate = f"{base}_{n}{ext}"
+    used.add(candidate)
+    return candidate
+
+
+def iter_zip(entries, chunk_size=CHUNK_SIZE):
+    """Yield a ZIP archive of ``(arcname, path)`` entries in chunks of about ``chunk_size`` bytes.
+
+    Files are stored rather than deflated (PDFs are already compressed), and
+    since the output is unseekable each entry's sizes follow it in a data
+    descriptor. Memory use is bounded by one chunk regardless of archive size.
+    Entries whose file has disappeared are skipped.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for arcname, path in entries:
+            try:
+                source = open(path, 'rb')
+            except OSError as e:
+                logger.warning(f"Skipping {path} in ZIP bundle: {e}")
+                continue
+
+            with source, archive.open(arcname, 'w') as target:
+                while True:
+                    block = source.read(chunk_size)
+                    if not block:
+                        break
+                    target.write(block)
+                    data = sink.drain()
+                    if data:
+                        yield data
+
+            data = sink.drain()
+            if data:
+                yield data
+
+    # Central directory
+    data = sink.drain()
+    if data:
+        yield data